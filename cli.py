@@ -1,5 +1,7 @@
-from lib.cli.app import main_menu
+import sys
+
+from lib.cli.commands import main
 
 if __name__ == '__main__':
-    print('Welcome to Fuel Logistics CLI')
-    main_menu()
+    # no arguments starts the interactive menu; see lib/cli/commands.py for subcommands
+    sys.exit(main())
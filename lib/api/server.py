@@ -0,0 +1,540 @@
+# lib/api/server.py
+"""
+Asyncio HTTP/JSON API over the same models and queries as lib/cli/app.py, so
+several dispatchers can look up trucks and record fuel logs at the same time.
+
+Runs on an async SQLAlchemy engine (aiosqlite) with a connection pool; needs
+pip install "sqlalchemy[asyncio]" aiosqlite. The HTTP layer is a small
+HTTP/1.1 implementation on asyncio streams (keep-alive, JSON bodies, chunked
+responses), so nothing else has to be installed.
+
+    python -m lib.api.server --port 8080 --pool-size 8
+
+Routes (list responses are streamed as a chunked JSON array; ?limit=&after= page them):
+
+    GET    /trucks                       GET    /fuel-logs
+    POST   /trucks                       POST   /fuel-logs
+    GET    /trucks/{id}                  DELETE /fuel-logs/{id}
+    GET    /trucks/by-plate/{plate}      GET    /fuel-logs/vendor/{vendor}
+    DELETE /trucks/{id}                  GET    /fuel-logs/search?q=...&field=vendor&limit=
+    GET    /trucks/{id}/fuel-logs        GET    /fuel-logs/range?start=YYYY-MM-DD&end=YYYY-MM-DD
+    GET    /trucks/{id}/drivers          GET    /reports/efficiency[?truck=id]
+    GET    /drivers                      GET    /reports/spend?by=truck|vendor|location[&month=YYYY-MM]
+    POST   /drivers                      GET    /health
+    GET    /drivers/by-license/{license}
+    DELETE /drivers/{id}
+    POST   /drivers/{id}/assign          body {"truck": id or plate}
+    POST   /drivers/{id}/unassign
+
+Writes check each JSON field's type against its column, then construct the ORM
+models, so the @validates rules apply and a bad value is a 400. SQLite has a single writer, so writes are serialized with an asyncio lock
+inside the server instead of letting transactions fight over the database lock;
+reads run concurrently on the pool.
+"""
+import argparse
+import asyncio
+import json
+import re
+import sys
+from datetime import date, datetime
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from sqlalchemy import Float, Integer, select
+from sqlalchemy.exc import IntegrityError
+
+from lib.db.archive import fuel_logs_source
+from lib.db import queries
+from lib.db.database import DATABASE_URL, PROFILES, make_async_engine
+from lib.db.models import Driver, FuelLog, Truck
+
+STREAM_BATCH = 500
+MAX_BODY = 1 << 20
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Stream:
+    """Handler result for a list response: an async iterator of JSON-able rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+
+class Request:
+    def __init__(self, method, target, headers, body):
+        parts = urlsplit(target)
+        self.method = method
+        self.path = unquote(parts.path)
+        self.query = parse_qs(parts.query)
+        self.headers = headers
+        self.body = body
+
+    def arg(self, name, default=None, type_=str):
+        values = self.query.get(name)
+        if not values:
+            return default
+        try:
+            return type_(values[0])
+        except ValueError:
+            raise HTTPError(400, f"bad value for {name}: {values[0]!r}") from None
+
+    def json(self):
+        try:
+            data = json.loads(self.body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "body must be JSON") from None
+        if not isinstance(data, dict):
+            raise HTTPError(400, "body must be a JSON object")
+        return data
+
+
+def _date(s):
+    return datetime.strptime(s, "%Y-%m-%d").date()
+
+
+def _json_default(v):
+    if isinstance(v, date):
+        return v.isoformat()
+    raise TypeError(f"{type(v).__name__} is not JSON serializable")
+
+
+def _dumps(obj):
+    return json.dumps(obj, default=_json_default, separators=(",", ":"))
+
+
+def as_dict(obj):
+    """Column values of an ORM object, or the fields of a lib/db/rows.py row."""
+    if isinstance(obj, tuple):
+        return obj._asdict()
+    return {c.key: getattr(obj, c.key) for c in obj.__mapper__.column_attrs}
+
+
+def _fields(data, model, allowed, required=()):
+    unknown = set(data) - set(allowed)
+    if unknown:
+        raise HTTPError(400, f"unknown field(s) for {model.__name__}: {', '.join(sorted(unknown))}")
+    missing = [k for k in required if data.get(k) is None]
+    if missing:
+        raise HTTPError(400, f"missing field(s): {', '.join(missing)}")
+    fields = {k: data[k] for k in allowed if k in data}
+    for k, v in fields.items():
+        col = model.__table__.c.get(k)
+        if col is None:  # references such as "truck" are checked by their handler
+            continue
+        if v is None:
+            if not col.nullable:
+                raise HTTPError(400, f"{k} can't be null")
+        elif isinstance(col.type, (Float, Integer)):
+            if isinstance(v, bool) or not isinstance(v, (int, float)):
+                raise HTTPError(400, f"{k} must be a number")
+        elif not isinstance(v, str):
+            raise HTTPError(400, f"{k} must be a string")
+    return fields
+
+
+# ---------- handlers ----------
+# Reads that reuse the sync query layer (and its entity cache) go through
+# session.run_sync; list endpoints stream Core rows straight from the cursor.
+class Api:
+    def __init__(self, engine):
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        self.engine = engine
+        self.sessions = async_sessionmaker(engine, expire_on_commit=False)
+        self.write_lock = asyncio.Lock()
+        self.routes = []
+        for method, pattern, handler in (
+            ("GET", r"/health", self.health),
+            ("GET", r"/trucks", self.list_trucks),
+            ("POST", r"/trucks", self.create_truck),
+            ("GET", r"/trucks/by-plate/(?P<plate>[^/]+)", self.truck_by_plate),
+            ("GET", r"/trucks/(?P<id>\d+)", self.get_truck),
+            ("DELETE", r"/trucks/(?P<id>\d+)", self.delete_truck),
+            ("GET", r"/trucks/(?P<id>\d+)/fuel-logs", self.truck_fuel_logs),
+            ("GET", r"/trucks/(?P<id>\d+)/drivers", self.truck_drivers),
+            ("GET", r"/fuel-logs", self.list_fuel_logs),
+            ("POST", r"/fuel-logs", self.create_fuel_log),
+            ("DELETE", r"/fuel-logs/(?P<id>\d+)", self.delete_fuel_log),
+            ("GET", r"/fuel-logs/vendor/(?P<vendor>[^/]+)", self.fuel_logs_by_vendor),
+            ("GET", r"/fuel-logs/search", self.search_fuel_logs),
+            ("GET", r"/fuel-logs/range", self.fuel_logs_by_date_range),
+            ("GET", r"/drivers", self.list_drivers),
+            ("POST", r"/drivers", self.create_driver),
+            ("GET", r"/drivers/by-license/(?P<license>[^/]+)", self.driver_by_license),
+            ("DELETE", r"/drivers/(?P<id>\d+)", self.delete_driver),
+            ("POST", r"/drivers/(?P<id>\d+)/assign", self.assign_driver),
+            ("POST", r"/drivers/(?P<id>\d+)/unassign", self.unassign_driver),
+            ("GET", r"/reports/efficiency", self.report_efficiency),
+            ("GET", r"/reports/spend", self.report_spend),
+        ):
+            self.routes.append((method, re.compile(pattern + r"/?"), handler))
+
+    def route(self, method, path):
+        allowed = False
+        for m, pattern, handler in self.routes:
+            match = pattern.fullmatch(path)
+            if match:
+                if m == method:
+                    return handler, match.groupdict()
+                allowed = True
+        raise HTTPError(405 if allowed else 404, f"no route for {method} {path}")
+
+    # ---- helpers ----
+    def _page(self, req, model, stmt):
+        after = req.arg("after", type_=int)
+        limit = req.arg("limit", type_=int)
+        if after is not None:
+            stmt = stmt.where(model.id > after)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return stmt
+
+    def _stream(self, session, stmt):
+        async def rows():
+            result = await session.stream(stmt)
+            async for batch in result.mappings().partitions(STREAM_BATCH):
+                for row in batch:
+                    yield dict(row)
+        return Stream(rows())
+
+    async def _get(self, session, model, id_):
+        obj = await session.run_sync(lambda s: model.find_by_id(s, int(id_)))
+        if obj is None:
+            raise HTTPError(404, f"{model.__name__} {id_} not found")
+        return obj
+
+    async def _truck_ref(self, session, ref):
+        """A truck id or plate, like lib/cli/handlers._resolve_truck."""
+        if isinstance(ref, bool) or not isinstance(ref, (int, str)):
+            raise HTTPError(400, "truck must be an id or a plate")
+        if str(ref).isdigit():
+            return await self._get(session, Truck, ref)
+        t = await session.run_sync(lambda s: queries.truck_by_plate(s, str(ref)))
+        if t is None:
+            raise HTTPError(404, f"Truck {ref} not found")
+        return t
+
+    async def _write(self, session, fn):
+        """Run fn(sync_session) and commit (the caller holds the write lock, see _respond)."""
+        try:
+            result = await session.run_sync(fn)
+            await session.commit()
+        except IntegrityError as e:
+            await session.rollback()
+            raise HTTPError(409, str(e.orig)) from None
+        except Exception:
+            await session.rollback()
+            raise
+        return result
+
+    # ---- trucks ----
+    async def health(self, req, session):
+        return {"status": "ok"}
+
+    async def list_trucks(self, req, session):
+        return self._stream(session, self._page(req, Truck, select(Truck.__table__).order_by(Truck.id)))
+
+    async def create_truck(self, req, session):
+        t = Truck(**_fields(req.json(), Truck, ("plate", "capacity_liters", "status"),
+                              required=("plate", "capacity_liters")))
+        await self._write(session, lambda s: s.add(t))
+        return 201, as_dict(t)
+
+    async def get_truck(self, req, session, id):
+        return as_dict(await self._get(session, Truck, id))
+
+    async def truck_by_plate(self, req, session, plate):
+        return as_dict(await self._truck_ref(session, plate))
+
+    async def delete_truck(self, req, session, id):
+        t = await self._get(session, Truck, id)
+        await self._write(session, lambda s: s.delete(t))  # fuel logs cascade like Truck.delete
+        return {"deleted": int(id)}
+
+    async def truck_fuel_logs(self, req, session, id):
+        await self._get(session, Truck, id)
+        stmt = (select(FuelLog.__table__).where(FuelLog.truck_id == int(id))
+                .order_by(FuelLog.date, FuelLog.id))
+        return self._stream(session, stmt)
+
+    async def truck_drivers(self, req, session, id):
+        await self._get(session, Truck, id)
+        drivers = await session.run_sync(lambda s: queries.truck_drivers(s, int(id)))
+        return [as_dict(d) for d in drivers]
+
+    # ---- fuel logs ----
+    async def list_fuel_logs(self, req, session):
+        return self._stream(session, self._page(req, FuelLog, select(FuelLog.__table__).order_by(FuelLog.id)))
+
+    async def create_fuel_log(self, req, session):
+        data = _fields(req.json(), FuelLog, ("truck", "date", "liters", "price_per_liter", "vendor",
+                                             "location", "odometer", "note"),
+                       required=("truck", "liters", "price_per_liter", "vendor", "location"))
+        truck = await self._truck_ref(session, data.pop("truck"))
+        try:
+            data["date"] = _date(data["date"]) if data.get("date") else date.today()
+        except (TypeError, ValueError):
+            raise HTTPError(400, "date must be YYYY-MM-DD") from None
+        log = FuelLog(truck_id=truck.id, **data)
+        await self._write(session, lambda s: s.add(log))
+        return 201, as_dict(log)
+
+    async def delete_fuel_log(self, req, session, id):
+        log = await self._get(session, FuelLog, id)
+        await self._write(session, lambda s: s.delete(log))
+        return {"deleted": int(id)}
+
+    async def fuel_logs_by_vendor(self, req, session, vendor):
+        return await self._search(session, vendor, ("vendor",), req.arg("limit", 1000, int))
+
+    async def search_fuel_logs(self, req, session):
+        q = req.arg("q", "").strip()
+        if not q:
+            raise HTTPError(400, "q is required")
+        fields = tuple(req.query.get("field") or ("vendor", "location", "note"))
+        return await self._search(session, q, fields, req.arg("limit", 100, int))
+
+    async def _search(self, session, terms, fields, limit):
+        from lib.db.search import FIELDS, search_fuel_logs
+
+        if set(fields) - set(FIELDS):
+            raise HTTPError(400, f"field must be one of {', '.join(FIELDS)}")
+        logs = await session.run_sync(lambda s: search_fuel_logs(s, terms, fields=fields, limit=limit))
+        return [as_dict(fl) for fl in logs]
+
+    async def fuel_logs_by_date_range(self, req, session):
+        start, end = req.arg("start", type_=_date), req.arg("end", type_=_date)
+        if start is None or end is None:
+            raise HTTPError(400, "start and end are required (YYYY-MM-DD)")
+        if end < start:
+            raise HTTPError(400, "End date can't be before start date.")
+        # archived years are read from their archive files (lib/db/archive.py)
+        src = await session.run_sync(lambda s: fuel_logs_source(s, start, end))
+        stmt = (select(src).where(src.c.date.between(start, end))
+                .order_by(src.c.date, src.c.id).limit(req.arg("limit", type_=int)))
+        return self._stream(session, stmt)
+
+    # ---- drivers ----
+    async def list_drivers(self, req, session):
+        stmt = (select(Driver.__table__, Truck.plate.label("assigned_truck_plate"))
+                .outerjoin(Truck, Truck.id == Driver.assigned_truck_id).order_by(Driver.id))
+        return self._stream(session, self._page(req, Driver, stmt))
+
+    async def create_driver(self, req, session):
+        d = Driver(**_fields(req.json(), Driver, ("name", "license_number", "phone", "status"),
+                               required=("name", "license_number")))
+        await self._write(session, lambda s: s.add(d))
+        return 201, as_dict(d)
+
+    async def driver_by_license(self, req, session, license):
+        d = await session.run_sync(lambda s: queries.driver_by_license(s, license))
+        if d is None:
+            raise HTTPError(404, f"No driver with license {license}")
+        return as_dict(d)
+
+    async def delete_driver(self, req, session, id):
+        d = await self._get(session, Driver, id)
+        await self._write(session, lambda s: s.delete(d))
+        return {"deleted": int(id)}
+
+    async def assign_driver(self, req, session, id):
+        ref = req.json().get("truck")
+        if ref is None:
+            raise HTTPError(400, "truck (id or plate) is required")
+        d = await self._get(session, Driver, id)
+        t = await self._truck_ref(session, ref)
+
+        def assign(s):
+            d.assigned_truck = t
+        await self._write(session, assign)
+        return as_dict(d)
+
+    async def unassign_driver(self, req, session, id):
+        d = await self._get(session, Driver, id)
+
+        def unassign(s):
+            d.assigned_truck = None
+        await self._write(session, unassign)
+        return as_dict(d)
+
+    # ---- reports ----
+    async def report_efficiency(self, req, session):
+        from lib.db.reports import efficiency_by_fill, fleet_efficiency
+
+        truck = req.arg("truck")
+        if truck is None:
+            rows = await session.run_sync(fleet_efficiency)
+        else:
+            t = await self._truck_ref(session, truck)
+            rows = await session.run_sync(lambda s: efficiency_by_fill(s, truck_id=t.id))
+        return [dict(r._mapping) for r in rows]
+
+    async def report_spend(self, req, session):
+        from lib.db.reports import spend_by_location, spend_by_truck, spend_by_vendor
+
+        by = req.arg("by", "truck")
+        month = req.arg("month")
+        if by == "truck":
+            rows = await session.run_sync(spend_by_truck)
+        elif by in ("vendor", "location"):
+            fetch = spend_by_vendor if by == "vendor" else spend_by_location
+            rows = await session.run_sync(lambda s: fetch(s, month=month))
+        else:
+            raise HTTPError(400, "by must be truck, vendor or location")
+        return [dict(r._mapping) for r in rows]
+
+    # ---------- HTTP ----------
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                req = await self._read_request(reader)
+                if req is None:
+                    break
+                keep_alive = req.headers.get("connection", "").lower() != "close"
+                await self._respond(req, writer)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except HTTPError as e:  # malformed request
+            self._send(writer, e.status, {"error": str(e)}, keep_alive=False)
+        finally:
+            try:
+                await writer.drain()
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, _ = line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "malformed request line") from None
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HTTPError(400, "bad Content-Length") from None
+        if length < 0:
+            raise HTTPError(400, "bad Content-Length")
+        if length > MAX_BODY:
+            raise HTTPError(413, "request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return Request(method.upper(), target, headers, body)
+
+    async def _respond(self, req, writer):
+        try:
+            handler, params = self.route(req.method, req.path)
+            if req.method == "GET":
+                async with self.sessions() as session:
+                    result = await handler(req, session, **params)
+                    if isinstance(result, Stream):
+                        await self._send_stream_or_abort(req, writer, result)
+                        return
+            else:
+                # the whole write request holds the lock, so its transaction never starts
+                # from a snapshot another writer has moved past (SQLITE_BUSY on upgrade)
+                async with self.write_lock, self.sessions() as session:
+                    result = await handler(req, session, **params)
+        except ConnectionError:
+            raise  # the client is gone or a stream was cut short: nothing more to write
+        except HTTPError as e:
+            result = e.status, {"error": str(e)}
+        except ValueError as e:  # model validators
+            result = 400, {"error": str(e)}
+        except Exception as e:
+            print(f"{req.method} {req.path}: {e!r}", file=sys.stderr)
+            result = 500, {"error": "internal error"}
+        status, payload = result if isinstance(result, tuple) else (200, result)
+        self._send(writer, status, payload)
+        await writer.drain()
+
+    @staticmethod
+    def _send(writer, status, payload, keep_alive=True):
+        body = _dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body
+        )
+
+    async def _send_stream_or_abort(self, req, writer, stream):
+        try:
+            await self._send_stream(writer, stream)
+        except ConnectionError:
+            raise
+        except Exception as e:
+            # the 200 and part of the array are already out, so there is no status left to
+            # send; cutting the connection before the last chunk tells the client it failed
+            print(f"{req.method} {req.path}: {e!r}", file=sys.stderr)
+            writer.transport.abort()
+            raise ConnectionAbortedError("response stream failed") from e
+
+    @staticmethod
+    async def _send_stream(writer, stream):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                     b"Transfer-Encoding: chunked\r\n\r\n")
+
+        def chunk(data):
+            writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+        parts, first = [b"["], True
+        async for row in stream.rows:
+            parts.append((b"" if first else b",") + _dumps(row).encode())
+            first = False
+            if len(parts) >= STREAM_BATCH:
+                chunk(b"".join(parts))
+                parts = []
+                await writer.drain()  # back-pressure: don't read ahead of a slow client
+        parts.append(b"]")
+        chunk(b"".join(parts))
+        writer.write(b"0\r\n\r\n")
+
+
+async def serve(host="127.0.0.1", port=8080, url=DATABASE_URL, pool_size=5, max_overflow=10, profile=None):
+    engine = make_async_engine(url, profile=profile, pool_size=pool_size, max_overflow=max_overflow,
+                               connect_args={"timeout": 30})
+    api = Api(engine)
+    server = await asyncio.start_server(api.handle_connection, host, port)
+    print(f"Serving {url} on http://{host}:{port} (pool {pool_size}+{max_overflow})", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await engine.dispose()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fuel Logistics HTTP/JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--db", default=DATABASE_URL, help="database URL (default: $LOGISTIC_DB_URL or the app db)")
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--max-overflow", type=int, default=10)
+    parser.add_argument("--db-profile", choices=sorted(PROFILES), default=None, help="SQLite storage profile")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.db, args.pool_size, args.max_overflow, args.db_profile))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# lib/bench/common.py
+# Shared helpers for the benchmark scripts: build throwaway fleet databases and time things.
+import statistics
+import time
+from pathlib import Path
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from lib.db.database import make_engine
+from lib.db.models import Base, Driver, FuelLog, Truck
+from lib.db import seed
+
+
+def _shape(engine):
+    """(trucks, drivers, fuel logs) in the database, or None if it has no fleet tables."""
+    try:
+        with engine.connect() as conn:
+            return tuple(conn.execute(select(func.count()).select_from(m.__table__)).scalar()
+                         for m in (Truck, Driver, FuelLog))
+    except OperationalError:
+        return None
+
+
+def build_fleet_db(path, trucks=1_000, drivers=500, logs_per_truck=1_000, days=1_095, batch_size=50_000,
+                   profile="safe", reuse=False):
+    """
+    Create a fresh SQLite file at `path` with the schema and a bulk-seeded fleet. With reuse=True
+    an existing file that already has that many trucks, drivers and fuel logs is kept as it is.
+    """
+    path = Path(path)
+    if path.exists():
+        engine = make_engine(f"sqlite:///{path}", profile=profile)
+        if reuse and _shape(engine) == (trucks, drivers, trucks * logs_per_truck):
+            Base.metadata.create_all(engine)  # tables added since the file was seeded
+            return engine
+        engine.dispose()
+        path.unlink()
+    engine = make_engine(f"sqlite:///{path}", profile=profile)
+    Base.metadata.create_all(engine)
+    seed.reset_seed()
+    with Session(engine) as session:
+        seed.seed_bulk(session, n_trucks=trucks, n_drivers=drivers,
+                       logs_per_truck=logs_per_truck, batch_size=batch_size, days=days)
+    return engine
+
+
+def time_call(fn, repeat=5):
+    """Run fn `repeat` times and return (median seconds, last result)."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
@@ -0,0 +1,89 @@
+# lib/bench/indexes.py
+"""
+Compare query plans and latencies for the CLI queries with and without the
+secondary indexes from migration 4b7e2c91d0f3.
+
+    python -m lib.bench.indexes --trucks 1000 --logs-per-truck 1000
+"""
+import argparse
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+from sqlalchemy import func, select
+
+from lib.bench.common import build_fleet_db, time_call
+from lib.db.models import Driver, FuelLog
+
+
+def _queries(today):
+    return {
+        "date range (7 days)": select(FuelLog)
+            .where(FuelLog.date.between(today - timedelta(days=7), today))
+            .order_by(FuelLog.date.asc()),
+        "truck fuel logs": select(FuelLog).where(FuelLog.truck_id == 42),
+        "truck logs by date": select(FuelLog)
+            .where(FuelLog.truck_id == 42, FuelLog.date >= today - timedelta(days=30)),
+        "drivers for truck": select(Driver).where(Driver.assigned_truck_id == 42),
+        "vendor exact": select(FuelLog).where(func.lower(FuelLog.vendor) == "shell"),
+    }
+
+
+def _indexes():
+    return list(FuelLog.__table__.indexes) + list(Driver.__table__.indexes)
+
+
+def _plan(conn, stmt):
+    sql = str(stmt.compile(conn.engine, compile_kwargs={"literal_binds": True}))
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+    return "; ".join(r[-1] for r in rows)
+
+
+def _measure(engine, queries, repeat):
+    results = {}
+    with engine.connect() as conn:
+        for name, stmt in queries.items():
+            secs, rows = time_call(lambda: conn.execute(stmt).all(), repeat=repeat)
+            results[name] = (secs, len(rows), _plan(conn, stmt))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trucks", type=int, default=1_000)
+    parser.add_argument("--logs-per-truck", type=int, default=1_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--db", help="benchmark database path; reused if it already has this fleet size")
+    args = parser.parse_args(argv)
+
+    path = Path(args.db) if args.db else Path(tempfile.gettempdir()) / "logistic_bench_indexes.db"
+    engine = build_fleet_db(path, trucks=args.trucks, logs_per_truck=args.logs_per_truck, reuse=bool(args.db))
+    queries = _queries(date.today())
+
+    # create_all built the indexes; drop them for the "before" run (a reused file
+    # may still be missing them from an interrupted run)
+    with engine.begin() as conn:
+        for ix in _indexes():
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {ix.name}")
+        conn.exec_driver_sql("ANALYZE")
+    before = _measure(engine, queries, args.repeat)
+
+    with engine.begin() as conn:
+        for ix in _indexes():
+            ix.create(conn)
+        conn.exec_driver_sql("ANALYZE")
+    after = _measure(engine, queries, args.repeat)
+
+    print(f"\n{args.trucks * args.logs_per_truck:,} fuel logs, median of {args.repeat} runs\n")
+    for name in queries:
+        b_secs, n, b_plan = before[name]
+        a_secs, _, a_plan = after[name]
+        speedup = b_secs / a_secs if a_secs else float("inf")
+        print(f"{name} ({n} rows): {b_secs * 1000:.2f} ms -> {a_secs * 1000:.2f} ms ({speedup:.1f}x)")
+        print(f"    before: {b_plan}")
+        print(f"    after:  {a_plan}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
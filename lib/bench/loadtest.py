@@ -0,0 +1,204 @@
+# lib/bench/loadtest.py
+"""
+Load-test the HTTP API (lib/api/server.py) with N concurrent keep-alive clients
+and report p50/p99 latency per request type.
+
+By default it seeds a throwaway fleet, starts the server on it in a subprocess
+and stops it afterwards; pass --url to hit a server that is already running.
+
+    python -m lib.bench.loadtest --clients 1,10,50 --requests 200
+    python -m lib.bench.loadtest --url http://127.0.0.1:8080 --clients 20
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+
+# request type -> weight; roughly dispatcher traffic: mostly lookups, some writes
+MIX = {
+    "plate_lookup": 30,
+    "truck_fuel_logs": 20,
+    "truck_drivers": 10,
+    "vendor_search": 10,
+    "date_range_7d": 10,
+    "list_trucks_page": 5,
+    "create_fuel_log": 15,
+}
+
+
+class Client:
+    """One keep-alive HTTP/1.1 connection."""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        data = json.dumps(body).encode() if body is not None else b""
+        self.writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                          f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if headers.get("transfer-encoding") == "chunked":
+            parts = []
+            while True:
+                size = int((await self.reader.readline()).strip(), 16)
+                parts.append(await self.reader.readexactly(size + 2))
+                if size == 0:
+                    break
+            payload = b"".join(p[:-2] for p in parts)
+        else:
+            payload = await self.reader.readexactly(int(headers.get("content-length", 0)))
+        return status, payload
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+
+
+async def _fixtures(client):
+    status, body = await client.request("GET", "/trucks?limit=1000")
+    trucks = json.loads(body)
+    if status != 200 or not trucks:
+        raise RuntimeError("the server has no trucks to test against")
+    status, body = await client.request("GET", "/fuel-logs?limit=1")
+    logs = json.loads(body)
+    return {
+        "trucks": trucks,
+        "vendor": logs[0]["vendor"] if logs else "Shell",
+        "day": logs[0]["date"] if logs else time.strftime("%Y-%m-%d"),
+    }
+
+
+def _request_for(kind, fx, rnd):
+    truck = rnd.choice(fx["trucks"])
+    if kind == "plate_lookup":
+        return "GET", f"/trucks/by-plate/{quote(truck['plate'])}", None
+    if kind == "truck_fuel_logs":
+        return "GET", f"/trucks/{truck['id']}/fuel-logs", None
+    if kind == "truck_drivers":
+        return "GET", f"/trucks/{truck['id']}/drivers", None
+    if kind == "vendor_search":
+        return "GET", f"/fuel-logs/search?q={quote(fx['vendor'].split()[0])}&field=vendor&limit=50", None
+    if kind == "date_range_7d":
+        return "GET", f"/fuel-logs/range?start={fx['start']}&end={fx['day']}", None
+    if kind == "list_trucks_page":
+        return "GET", "/trucks?limit=100", None
+    return "POST", "/fuel-logs", {
+        "truck": truck["id"], "liters": round(rnd.uniform(50, 400), 1),
+        "price_per_liter": round(rnd.uniform(2.8, 4.2), 2), "vendor": "Loadtest", "location": "Bench",
+    }
+
+
+async def run_clients(host, port, clients, requests_per_client, seed=42):
+    setup = Client(host, port)
+    fx = await _fixtures(setup)
+    await setup.close()
+    day = time.strptime(fx["day"], "%Y-%m-%d")
+    fx["start"] = time.strftime("%Y-%m-%d", time.localtime(time.mktime(day) - 7 * 86400))
+
+    kinds, weights = zip(*MIX.items())
+    latencies = {k: [] for k in kinds}
+    errors = {}
+
+    async def worker(n):
+        rnd = random.Random(seed + n)
+        client = Client(host, port)
+        try:
+            for kind in rnd.choices(kinds, weights, k=requests_per_client):
+                method, path, body = _request_for(kind, fx, rnd)
+                started = time.perf_counter()
+                status, _ = await client.request(method, path, body)
+                latencies[kind].append((time.perf_counter() - started) * 1000)
+                if status >= 400:
+                    errors[status] = errors.get(status, 0) + 1
+        finally:
+            await client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(clients)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def _pct(values, p):
+    if not values:
+        return float("nan")
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[p - 1]
+
+
+def report(clients, latencies, errors, elapsed):
+    every = [v for vs in latencies.values() for v in vs]
+    print(f"\n{clients} clients: {len(every)} requests in {elapsed:.2f}s "
+          f"({len(every) / elapsed:,.0f} req/s), errors: {errors or 'none'}")
+    print(f"{'request':20} {'n':>6} {'p50 ms':>9} {'p99 ms':>9}")
+    for kind, vs in latencies.items():
+        print(f"{kind:20} {len(vs):>6} {_pct(vs, 50):>9.2f} {_pct(vs, 99):>9.2f}")
+    print(f"{'all':20} {len(every):>6} {_pct(every, 50):>9.2f} {_pct(every, 99):>9.2f}")
+
+
+def _spawn_server(port, trucks, logs_per_truck, pool_size, profile):
+    from lib.bench.common import build_fleet_db
+
+    path = Path(tempfile.gettempdir()) / "logistic_loadtest.db"
+    build_fleet_db(path, trucks=trucks, drivers=trucks * 2, logs_per_truck=logs_per_truck).dispose()
+    proc = subprocess.Popen([sys.executable, "-m", "lib.api.server", "--db", f"sqlite:///{path}",
+                             "--port", str(port), "--pool-size", str(pool_size), "--db-profile", profile],
+                            stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()  # "Serving ..." once the socket is listening
+    if not line.startswith("Serving"):
+        proc.kill()
+        raise RuntimeError("server did not start")
+    return proc
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default=None, help="existing server (default: start one on a seeded db)")
+    parser.add_argument("--clients", default="1,10,50", help="comma separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="requests per client")
+    parser.add_argument("--port", type=int, default=8765, help="port for the spawned server")
+    parser.add_argument("--pool-size", type=int, default=8, help="pool size of the spawned server")
+    parser.add_argument("--db-profile", default="safe", help="storage profile of the spawned server")
+    parser.add_argument("--trucks", type=int, default=200)
+    parser.add_argument("--logs-per-truck", type=int, default=200)
+    args = parser.parse_args(argv)
+    levels = [int(c) for c in args.clients.split(",") if c.strip()]
+
+    proc = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        host, port = "127.0.0.1", args.port
+        proc = _spawn_server(port, args.trucks, args.logs_per_truck, args.pool_size, args.db_profile)
+    try:
+        for n in levels:
+            latencies, errors, elapsed = asyncio.run(run_clients(host, port, n, args.requests))
+            report(n, latencies, errors, elapsed)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# lib/bench/profiles.py
+"""
+Compare write and read throughput of the SQLite storage profiles in lib/db/database.py.
+
+    python -m lib.bench.profiles --trucks 500 --logs-per-truck 1000
+"""
+import argparse
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, func, select
+
+from lib.bench.common import build_fleet_db, time_call
+from lib.db.database import PROFILES, make_engine
+from lib.db.models import FuelLog
+
+
+def _write_throughput(engine, n_commits, truck_ids):
+    """Bursty writes: one small transaction per fuel log, like the interactive CLI."""
+    table = FuelLog.__table__
+    today = date.today()
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        for i in range(n_commits):
+            conn.execute(table.insert(), {
+                "truck_id": truck_ids[i % len(truck_ids)], "date": today, "liters": 100.0,
+                "price_per_liter": 3.0, "vendor": "Shell", "location": "Depot A", "odometer": 1000.0 + i,
+            })
+            conn.commit()
+    return n_commits / (time.perf_counter() - started)
+
+
+def _read_queries(today):
+    return {
+        "spend per truck": select(FuelLog.truck_id, func.sum(FuelLog.liters * FuelLog.price_per_liter))
+            .group_by(FuelLog.truck_id),
+        "date range scan": select(FuelLog).where(FuelLog.date.between(today - timedelta(days=90), today)),
+        "full table scan": select(func.count(), func.avg(FuelLog.price_per_liter)).where(FuelLog.note.is_(None)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trucks", type=int, default=500)
+    parser.add_argument("--logs-per-truck", type=int, default=1_000)
+    parser.add_argument("--commits", type=int, default=500, help="single-row transactions in the write test")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    path = Path(tempfile.gettempdir()) / "logistic_bench_profiles.db"
+    build_fleet_db(path, trucks=args.trucks, logs_per_truck=args.logs_per_truck).dispose()
+    truck_ids = list(range(1, args.trucks + 1))
+    queries = _read_queries(date.today())
+
+    print(f"\n{args.trucks * args.logs_per_truck:,} fuel logs; reads are the median of {args.repeat} runs\n")
+    for profile in ["sqlite-defaults"] + list(PROFILES):
+        if profile == "sqlite-defaults":
+            engine = create_engine(f"sqlite:///{path}", future=True)  # baseline: no PRAGMAs at all
+        else:
+            engine = make_engine(f"sqlite:///{path}", profile=profile)
+        if PROFILES.get(profile, {}).get("query_only") == "ON":
+            writes = "n/a (read-only)"
+        else:
+            writes = f"{_write_throughput(engine, args.commits, truck_ids):,.0f} commits/sec"
+        print(f"[{profile}] writes: {writes}")
+        with engine.connect() as conn:
+            for name, stmt in queries.items():
+                secs, rows = time_call(lambda: conn.execute(stmt).all(), repeat=args.repeat)
+                print(f"    {name}: {secs * 1000:.1f} ms ({len(rows)} rows)")
+        engine.dispose()
+        # drop back to the rollback journal so every profile starts from the same file state
+        with make_engine(f"sqlite:///{path}", profile="safe").connect() as conn:
+            conn.exec_driver_sql("PRAGMA journal_mode=DELETE")
+
+
+if __name__ == "__main__":
+    main()
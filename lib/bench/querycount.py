@@ -0,0 +1,99 @@
+# lib/bench/querycount.py
+"""
+Count the SQL statements each CLI view issues on a small and a 10x larger fleet.
+A view whose count grows with the number of rows has an N+1 problem; the script
+lists every view and exits with status 1 if any of them grew.
+
+    python -m lib.bench.querycount
+"""
+import contextlib
+import io
+import sys
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from lib.bench.common import build_fleet_db
+from lib.cli import app
+from lib.db.models import Driver, Truck
+
+# view name -> callable(session, ctx); ctx has a busy truck id and a driver license
+VIEWS = {
+    "list_trucks": lambda s, ctx: app.list_trucks(s, page_size=100_000),
+    "list_fuel_logs": lambda s, ctx: app.list_fuel_logs(s, page_size=100_000),
+    "list_drivers": lambda s, ctx: app.list_drivers(s),
+    "find_truck_by_plate": lambda s, ctx: app.show_truck_by_plate(s, ctx["plate"]),
+    "find_driver_by_license": lambda s, ctx: app.show_driver_by_license(s, ctx["license"]),
+    "view_truck_fuel_logs": lambda s, ctx: app.show_truck_fuel_logs(s, ctx["truck_id"]),
+    "view_truck_drivers": lambda s, ctx: app.show_truck_drivers(s, ctx["truck_id"]),
+    "find_fuel_logs_by_vendor": lambda s, ctx: app.show_fuel_logs_by_vendor(s, "shell"),
+    "find_fuel_logs_by_date_range": lambda s, ctx: app.show_fuel_logs_by_date_range(
+        s, date.today() - timedelta(days=365), date.today()),
+    "fleet_efficiency": lambda s, ctx: app.report_fleet_efficiency(s),
+    "spend_by_truck": lambda s, ctx: app.report_spend_by_truck(s),
+}
+
+
+class StatementCounter:
+    """Counts cursor executions on an engine while active."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+def count_views(engine):
+    counts = {}
+    with Session(engine) as session:
+        # the truck with the most drivers, so relationship loads have something to do
+        busiest = session.scalars(select(Driver.assigned_truck_id)
+                                  .where(Driver.assigned_truck_id.isnot(None))).first()
+        truck = session.get(Truck, busiest)
+        ctx = {
+            "truck_id": truck.id,
+            "plate": truck.plate,
+            "license": session.scalars(select(Driver.license_number)).first(),
+        }
+        for name, view in VIEWS.items():
+            session.expunge_all()  # start every view with a cold identity map
+            with StatementCounter(engine) as counter, contextlib.redirect_stdout(io.StringIO()):
+                view(session, ctx)
+            counts[name] = counter.count
+    return counts
+
+
+def main(argv=None):
+    tmp = Path(tempfile.gettempdir())
+    small = count_views(build_fleet_db(tmp / "logistic_querycount_small.db", trucks=5, drivers=20, logs_per_truck=5))
+    large = count_views(build_fleet_db(tmp / "logistic_querycount_large.db", trucks=50, drivers=200, logs_per_truck=50))
+
+    grew = []
+    print(f"\n{'view':32} {'small':>6} {'large':>6}")
+    for name in VIEWS:
+        flag = "" if large[name] <= small[name] else "  <-- grows with rows"
+        if flag:
+            grew.append(name)
+        print(f"{name:32} {small[name]:>6} {large[name]:>6}{flag}")
+    if grew:
+        print(f"\nFAIL: {', '.join(grew)} issue more statements as the data grows.")
+        return 1
+    print("\nOK: statement counts are independent of row counts.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
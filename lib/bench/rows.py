@@ -0,0 +1,89 @@
+# lib/bench/rows.py
+"""
+Per-row cost of reading fuel logs as ORM instances vs the lib/db/rows.py tuples.
+
+CPU: stream every row of the bench fleet (1M logs by default) once per way of
+reading it and report process time per row. Memory: hold the first --hold rows
+in a list and report the traced bytes per row (ORM instances carry their state
+object, attribute dict and identity-map entry).
+
+    python -m lib.bench.rows                  # 1m fleet, built on first use
+    python -m lib.bench.rows --scale 100k --hold 50000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from lib.bench.suite import SCALES, fleet_db
+from lib.db.models import FuelLog
+from lib.db.rows import FuelLogRow, select_rows
+
+CHUNK = 10_000
+
+
+def _orm(session, limit=None):
+    stmt = select(FuelLog).limit(limit).execution_options(yield_per=CHUNK)
+    return session.scalars(stmt)
+
+
+def _rows(session, limit=None):
+    stmt = select_rows(FuelLog).limit(limit).execution_options(yield_per=CHUNK)
+    return map(FuelLogRow._make, session.execute(stmt))
+
+
+def _core(session, limit=None):
+    # plain SQLAlchemy Row objects: the floor for anything built on top of Core
+    return session.execute(select_rows(FuelLog).limit(limit).execution_options(yield_per=CHUNK))
+
+
+READERS = {"orm": _orm, "rows": _rows, "core": _core}
+
+
+def cpu_per_row(engine, reader):
+    with Session(engine) as session:
+        started = time.process_time()
+        n = 0
+        for obj in reader(session):
+            n += 1
+        return (time.process_time() - started) / n * 1e6, n
+
+
+def bytes_per_row(engine, reader, hold):
+    with Session(engine) as session:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            kept = list(reader(session, hold))
+            after = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        return (after - before) / len(kept)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare ORM hydration with row tuples per row.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="1m")
+    parser.add_argument("--hold", type=int, default=100_000, help="rows kept in memory for the bytes/row figure")
+    parser.add_argument("--rebuild", action="store_true", help="re-seed the cached fleet database")
+    args = parser.parse_args(argv)
+
+    engine = fleet_db(args.scale, rebuild=args.rebuild)
+    print(f"{'reader':8} {'rows':>10} {'cpu us/row':>11} {'bytes/row':>10}")
+    results = {}
+    for name, reader in READERS.items():
+        us, n = cpu_per_row(engine, reader)
+        size = bytes_per_row(engine, reader, args.hold)
+        results[name] = (us, size)
+        print(f"{name:8} {n:>10,} {us:>11.2f} {size:>10,.0f}")
+    orm_us, orm_size = results["orm"]
+    rows_us, rows_size = results["rows"]
+    print(f"\nrows vs orm: {orm_us / rows_us:.1f}x less CPU, {orm_size / rows_size:.1f}x less memory per row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# lib/bench/startup.py
+"""
+Track CLI startup cost with `python -X importtime` against a budget.
+
+Each scenario runs cli.py in a fresh interpreter a few times; we report the
+median wall time and the total import time, plus the slowest top-level imports.
+Budgets (milliseconds of import time) live in startup_budget.json next to this
+file; the script exits with status 1 when a scenario goes over budget.
+
+    python -m lib.bench.startup              # check against the budget
+    python -m lib.bench.startup --update     # rewrite the budget from this run (+50% headroom)
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+BUDGET_FILE = Path(__file__).with_name("startup_budget.json")
+
+SCENARIOS = {
+    "help": ["--help"],
+    "trucks list": ["trucks", "list", "--limit", "5"],
+    "fuel-logs add": ["fuel-logs", "add", "--truck", "1", "--liters", "10", "--price", "3",
+                      "--vendor", "Shell", "--location", "Depot A"],
+}
+
+
+def _make_db(path):
+    """A tiny database so command scenarios measure startup, not queries."""
+    from lib.db.database import make_engine
+    from lib.db.models import Base, Truck
+    from sqlalchemy.orm import Session
+
+    if path.exists():
+        path.unlink()
+    engine = make_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        Truck.create(session, plate="T-100-AAA", capacity_liters=8000, status="active")
+    engine.dispose()
+
+
+def parse_importtime(stderr):
+    """Return (total import µs, {top-level module: cumulative µs}) from -X importtime output."""
+    top = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _self_us, cumulative, name = line[len("import time:"):].split("|")
+        if len(name) - len(name.lstrip()) == 1:  # top level: interpreter startup and the script's imports
+            top[name.strip()] = int(cumulative)
+    return sum(top.values()), top
+
+
+def run_scenario(argv, env, repeat):
+    walls, imports, top = [], [], {}
+    for _ in range(repeat):
+        started = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime", "cli.py", *argv],
+                              cwd=ROOT, env=env, capture_output=True, text=True)
+        walls.append(time.perf_counter() - started)
+        if proc.returncode != 0:
+            raise RuntimeError(f"cli.py {' '.join(argv)} failed:\n{proc.stderr[-2000:]}")
+        total, top = parse_importtime(proc.stderr)
+        imports.append(total)
+    return statistics.median(walls) * 1000, statistics.median(imports) / 1000, top
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--update", action="store_true", help="write a new budget from this run")
+    args = parser.parse_args(argv)
+
+    db = Path(tempfile.gettempdir()) / "logistic_bench_startup.db"
+    _make_db(db)
+    env = {**os.environ, "LOGISTIC_DB_URL": f"sqlite:///{db}"}
+
+    budget = json.loads(BUDGET_FILE.read_text()) if BUDGET_FILE.exists() else {}
+    results = {}
+    over = []
+    for name, cli_args in SCENARIOS.items():
+        wall_ms, import_ms, top = run_scenario(cli_args, env, args.repeat)
+        results[name] = import_ms
+        limit = budget.get(name)
+        status = "" if limit is None else (" OVER BUDGET" if import_ms > limit else " ok")
+        if limit is not None and import_ms > limit:
+            over.append(name)
+        print(f"{name}: wall {wall_ms:.0f} ms, imports {import_ms:.0f} ms"
+              + ("" if limit is None else f" (budget {limit} ms)") + status)
+        for mod, us in sorted(top.items(), key=lambda kv: -kv[1])[:3]:
+            print(f"    {mod}: {us / 1000:.0f} ms")
+
+    if args.update:
+        BUDGET_FILE.write_text(json.dumps({k: round(v * 1.5) for k, v in results.items()}, indent=2) + "\n")
+        print(f"Budget written to {BUDGET_FILE}.")
+        return 0
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
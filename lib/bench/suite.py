@@ -0,0 +1,283 @@
+# lib/bench/suite.py
+"""
+Benchmark the CLI operations on synthetic fleets of increasing size.
+
+Each scale is a bulk-seeded SQLite file (fixed seed, so every run sees the same
+data) cached in the temp dir. The operations are the ones lib/cli/app.py runs:
+listings, plate/license lookups, vendor search, date-range search, create,
+delete with cascade and driver assignment. Write operations undo their own
+changes outside the timed part, so a cached database stays reusable.
+
+Results are written as JSON. With a baseline (bench_baseline.json next to this
+file by default) every operation that got slower than --threshold times its
+baseline median is flagged and the script exits with status 1.
+
+    python -m lib.bench.suite                          # 1k and 100k fuel logs
+    python -m lib.bench.suite --scales 1k,100k,10m --out results.json
+    python -m lib.bench.suite --save-baseline          # record this run as the baseline
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import sqlalchemy
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from lib.bench.common import build_fleet_db
+from lib.cli import app
+from lib.db.database import make_engine
+from lib.db.models import Driver, FuelLog, Truck
+
+BASELINE_FILE = Path(__file__).with_name("bench_baseline.json")
+
+# name -> (trucks, drivers, logs per truck)
+SCALES = {
+    "1k": (10, 20, 100),
+    "100k": (100, 200, 1_000),
+    "1m": (1_000, 500, 1_000),
+    "10m": (10_000, 2_000, 1_000),
+}
+
+
+# ---- operations ----
+# Each operation is (setup, run, teardown); only run() is timed. setup returns the
+# state run needs, teardown gets that state and run's result and puts the database
+# back the way it was.
+def _nothing(session, ctx):
+    return None
+
+
+def _read(fn):
+    return _nothing, lambda session, ctx, state: fn(session, ctx), lambda session, ctx, state, result: None
+
+
+def _create_run(session, ctx, state):
+    return Truck.create(session, plate=f"BENCH-{time.perf_counter_ns()}", capacity_liters=500, status="active")
+
+
+def _create_teardown(session, ctx, state, truck):
+    Truck.delete(session, truck.id)
+
+
+def _cascade_setup(session, ctx):
+    # a truck shaped like the seeded ones: a full history of fuel logs and one driver
+    truck = Truck(plate=f"BENCH-{time.perf_counter_ns()}", capacity_liters=500, status="active")
+    session.add(truck)
+    session.flush()
+    today = date.today()
+    session.add_all(FuelLog(truck_id=truck.id, date=today - timedelta(days=i), liters=100, price_per_liter=1.5,
+                            vendor="Bench", location="Bench", odometer=float(10_000 - i))
+                    for i in range(ctx["logs_per_truck"]))
+    session.add(Driver(name="Bench Driver", license_number=f"BENCH-{truck.id}", assigned_truck_id=truck.id))
+    session.commit()
+    truck_id = truck.id
+    session.expunge_all()  # Truck.delete has to load the truck and its logs like the CLI does
+    return truck_id
+
+
+def _cascade_run(session, ctx, truck_id):
+    Truck.delete(session, truck_id)  # what app.delete_truck does
+
+
+def _cascade_teardown(session, ctx, truck_id, result):
+    # the driver survives the truck (only fuel logs cascade); drop it too
+    session.query(Driver).filter(Driver.license_number == f"BENCH-{truck_id}").delete()
+    session.commit()
+
+
+BATCH_ROWS = 100  # fuel logs per batch-write operation
+
+
+def _log_rows(ctx):
+    return [dict(truck_id=ctx["truck_id"], date=ctx["today"], liters=100, price_per_liter=1.5,
+                 vendor="Bench", location="Bench", odometer=float(i)) for i in range(BATCH_ROWS)]
+
+
+def _per_row_run(session, ctx, state):
+    return [FuelLog.create(session, **row).id for row in _log_rows(ctx)]  # commit + refresh per row
+
+
+def _create_many_run(session, ctx, state):
+    logs, _ = FuelLog.create_many(session, _log_rows(ctx))  # one flush, one commit
+    return [log.id for log in logs]
+
+
+def _logs_teardown(session, ctx, state, ids):
+    FuelLog.delete_many(session, ids)
+
+
+def _assign_setup(session, ctx):
+    d = session.get(Driver, ctx["driver_id"])
+    return d.assigned_truck_id
+
+
+def _assign_run(session, ctx, state):
+    # same steps as app.assign_driver_to_truck once the ids are entered
+    d = Driver.find_by_id(session, ctx["driver_id"])
+    t = Truck.find_by_id(session, ctx["other_truck_id"])
+    d.assigned_truck = t
+    session.commit()
+
+
+def _assign_teardown(session, ctx, previous, result):
+    session.get(Driver, ctx["driver_id"]).assigned_truck_id = previous
+    session.commit()
+
+
+OPERATIONS = {
+    "list_trucks": _read(lambda s, ctx: app.list_trucks(s)),
+    "list_fuel_logs_page": _read(lambda s, ctx: app.list_fuel_logs(s, limit=1_000)),
+    "list_drivers": _read(lambda s, ctx: app.list_drivers(s)),
+    "find_truck_by_plate": _read(lambda s, ctx: app.show_truck_by_plate(s, ctx["plate"])),
+    "find_driver_by_license": _read(lambda s, ctx: app.show_driver_by_license(s, ctx["license"])),
+    "view_truck_fuel_logs": _read(lambda s, ctx: app.show_truck_fuel_logs(s, ctx["truck_id"])),
+    "vendor_search": _read(lambda s, ctx: app.show_fuel_logs_by_vendor(s, ctx["vendor"])),
+    "date_range_7d": _read(lambda s, ctx: app.show_fuel_logs_by_date_range(
+        s, ctx["today"] - timedelta(days=7), ctx["today"])),
+    "create_truck": (_nothing, _create_run, _create_teardown),
+    "delete_truck_cascade": (_cascade_setup, _cascade_run, _cascade_teardown),
+    "assign_driver": (_assign_setup, _assign_run, _assign_teardown),
+    "create_logs_x100_per_row": (_nothing, _per_row_run, _logs_teardown),
+    "create_logs_x100_batch": (_nothing, _create_many_run, _logs_teardown),
+}
+
+
+def _context(session, logs_per_truck):
+    truck = session.scalars(select(Truck).order_by(Truck.id)).first()
+    driver = session.scalars(select(Driver).order_by(Driver.id)).first()
+    other = session.scalars(select(Truck.id).where(Truck.id != driver.assigned_truck_id)
+                            .order_by(Truck.id.desc())).first()
+    vendor = session.execute(select(FuelLog.vendor).group_by(FuelLog.vendor)
+                             .order_by(func.count().desc())).scalar()
+    return {
+        "truck_id": truck.id,
+        "plate": truck.plate,
+        "license": driver.license_number,
+        "driver_id": driver.id,
+        "other_truck_id": other,
+        "vendor": vendor,
+        "today": session.execute(select(func.max(FuelLog.date))).scalar(),
+        "logs_per_truck": logs_per_truck,
+    }
+
+
+def fleet_db(scale, rebuild=False):
+    trucks, drivers, logs_per_truck = SCALES[scale]
+    path = Path(tempfile.gettempdir()) / f"logistic_bench_{trucks}x{logs_per_truck}.db"
+    if path.exists() and not rebuild:
+        return make_engine(f"sqlite:///{path}")
+    return build_fleet_db(path, trucks=trucks, drivers=drivers, logs_per_truck=logs_per_truck)
+
+
+def run_scale(engine, logs_per_truck, repeat):
+    results = {}
+    with Session(engine) as session:
+        ctx = _context(session, logs_per_truck)
+        for name, (setup, run, teardown) in OPERATIONS.items():
+            timings = []
+            for _ in range(repeat):
+                session.expunge_all()  # every run starts with a cold identity map
+                state = setup(session, ctx)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    started = time.perf_counter()
+                    result = run(session, ctx, state)
+                    timings.append((time.perf_counter() - started) * 1000)
+                teardown(session, ctx, state, result)
+            results[name] = {
+                "median_ms": round(statistics.median(timings), 3),
+                "min_ms": round(min(timings), 3),
+                "max_ms": round(max(timings), 3),
+                "runs": repeat,
+            }
+    return results
+
+
+def compare(results, baseline, threshold, floor_ms):
+    """Yield (scale, op, baseline ms, current ms) for every regression."""
+    for scale, ops in results.items():
+        for op, r in ops.items():
+            base = baseline.get(scale, {}).get(op)
+            if base is None:
+                continue
+            now, was = r["median_ms"], base["median_ms"]
+            if now > was * threshold and now - was > floor_ms:
+                yield scale, op, was, now
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", default="1k,100k", help=f"comma separated, from {', '.join(SCALES)}")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--rebuild", action="store_true", help="re-seed the cached databases")
+    parser.add_argument("--out", default=None, help="write the results JSON here")
+    parser.add_argument("--baseline", default=str(BASELINE_FILE))
+    parser.add_argument("--save-baseline", action="store_true", help="write this run to --baseline")
+    parser.add_argument("--threshold", type=float, default=1.5,
+                        help="flag operations slower than this multiple of the baseline (default: 1.5)")
+    parser.add_argument("--floor-ms", type=float, default=1.0,
+                        help="ignore slowdowns smaller than this many ms (timer noise)")
+    args = parser.parse_args(argv)
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        parser.error(f"unknown scale(s): {', '.join(unknown)}")
+
+    results = {}
+    for scale in scales:
+        print(f"--- {scale} fuel logs ---")
+        engine = fleet_db(scale, rebuild=args.rebuild)
+        results[scale] = run_scale(engine, SCALES[scale][2], args.repeat)
+        engine.dispose()
+        for op, r in results[scale].items():
+            print(f"{op:24} {r['median_ms']:>10.2f} ms  (min {r['min_ms']:.2f}, max {r['max_ms']:.2f})")
+
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "sqlalchemy": sqlalchemy.__version__,
+            "machine": platform.machine(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nResults written to {args.out}")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        saved = json.loads(baseline_path.read_text()) if baseline_path.exists() else {"results": {}}
+        saved["meta"] = report["meta"]
+        saved["results"].update(results)  # keep scales that were not run this time
+        baseline_path.write_text(json.dumps(saved, indent=2) + "\n")
+        print(f"\nBaseline written to {baseline_path}")
+        return 0
+    if not baseline_path.exists():
+        print("\nNo baseline to compare against (run with --save-baseline).")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text())["results"]
+    regressions = list(compare(results, baseline, args.threshold, args.floor_ms))
+    if regressions:
+        print(f"\nFAIL: slower than {args.threshold}x baseline:")
+        for scale, op, was, now in regressions:
+            print(f"  {scale:6} {op:24} {was:.2f} ms -> {now:.2f} ms")
+        return 1
+    print(f"\nOK: no operation slower than {args.threshold}x baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,29 @@
 from lib.db.database import SessionLocal
 from lib.db.models import Truck, FuelLog, Driver
+from lib.db import queries # read queries with a fixed statement count (no N+1)
+from lib.db.rows import FuelLogRow, iter_rows # plain row tuples for the listings, no ORM instances
+from lib.cli.output import Column, table # buffered/aligned/paged tables, text or --format tsv/json
 from datetime import date, datetime
 
+# reports, rollups, importer, exporter, search and anomalies are imported inside the functions that use them
+# so starting the CLI only pays for the modules a menu or command actually needs
+
+# ---- TABLE COLUMNS ----
+# (header, attribute or function, text format); headers are also the tsv/json keys
+TRUCK_COLUMNS = [Column("id"), Column("plate"), Column("capacity_l", "capacity_liters"), Column("status")]
+FUEL_LOG_COLUMNS = [
+    Column("id"), Column("truck_id"), Column("date"), Column("liters"), Column("price_per_l", "price_per_liter"),
+    Column("vendor"), Column("location"), Column("odometer"), Column("cost", fmt=".2f"),
+]
+DRIVER_COLUMNS = [
+    Column("id"), Column("name"), Column("license", "license_number"), Column("truck", "truck_plate"),
+    Column("status"), Column("phone"),
+]
+
 # ---- LIST ----
-def list_trucks(session):
-    trucks = Truck.get_all(session) #helper from CRUDMixin in models.py
-    if not trucks:
-        print("No trucks found.")
-        return
-    for t in trucks:
-        print(f"[{t.id}] {t.plate} | {t.capacity_liters} L | {t.status}") # display truck info in a readable format
+def list_trucks(session, limit=None, after_id=None, page_size=500):
+    rows = iter_rows(session, Truck, page_size=page_size, after_id=after_id, limit=limit) # streams keyset pages of TruckRows
+    table(rows, TRUCK_COLUMNS, empty="No trucks found.")
 
 # ---- CREATE ----
 def create_truck(session):
@@ -49,7 +63,10 @@ def find_truck_by_plate(session):
     if not plate:
         print("Plate cannot be empty.")
         return
-    t = session.query(Truck).filter(Truck.plate == plate).first()
+    show_truck_by_plate(session, plate)
+
+def show_truck_by_plate(session, plate): # non-interactive half, also used by lib/cli/commands.py
+    t = queries.truck_by_plate(session, plate)
     if t:
         print(f"Found: [{t.id}] {t.plate} | {t.capacity_liters} L | {t.status}")
     else:
@@ -63,24 +80,17 @@ def view_truck_fuel_logs(session):
     except ValueError:
         print("Invalid id (must be a number).")
         return
+    show_truck_fuel_logs(session, id_)
 
+def show_truck_fuel_logs(session, id_):
     truck = Truck.find_by_id(session, id_) #uses helper from CRUDMixin in models.py
     if not truck:
         print("Truck not found.")
         return
 
-    logs = truck.fuel_logs  # uses the relationship
-    if not logs:
-        print(f"No fuel logs for truck {truck.plate}.") # incsase there are no logs
-        return
-
-    print(f"\nFuel logs for {truck.plate}:") # display the fuel logs in a readable format
-    for fl in logs:
-        total = fl.liters * fl.price_per_liter # calculating the total cost of fuel log
-        print(
-            f"[{fl.id}] {fl.date} | {fl.vendor} @ {fl.location} | "
-            f"{fl.liters} L @ {fl.price_per_liter}/L | ODO {fl.odometer} | cost {total:.2f}"
-        )
+    logs = queries.truck_fuel_logs(session, truck.id)  # one query, not the whole relationship
+    table(logs, FUEL_LOG_COLUMNS, title=f"\nFuel logs for {truck.plate}:",
+          empty=f"No fuel logs for truck {truck.plate}.") # incsase there are no logs
 
 
 # ---- MENU ----
@@ -131,18 +141,9 @@ def main_menu():
 
 # ---------- Fuel Logs: LIST + CREATE ----------
 
-def list_fuel_logs(session): #list all fuel logs
-    logs = FuelLog.get_all(session) #helper from CRUDMixin in models.py
-    if not logs:
-      print("No fuel logs.")
-      return
-    for fl in logs:
-        total = fl.liters * fl.price_per_liter # calculating total cost of each fuel log
-        print(
-            f"[{fl.id}] Truck {fl.truck_id} | {fl.date} | " # displays fuel log info in a readable format
-            f"{fl.liters} L @ {fl.price_per_liter}/L | "
-            f"{fl.vendor} ({fl.location}) | ODO {fl.odometer} | cost {total:.2f}"
-        )
+def list_fuel_logs(session, limit=None, after_id=None, page_size=500): #list all fuel logs
+    rows = iter_rows(session, FuelLog, page_size=page_size, after_id=after_id, limit=limit) # streams keyset pages of FuelLogRows
+    table(rows, FUEL_LOG_COLUMNS, empty="No fuel logs.")
 
 def create_fuel_log(session):
     # pick a truck first
@@ -216,26 +217,30 @@ def find_fuel_logs_by_vendor(session):
     if not vendor:
         print("Vendor cannot be empty.")
         return
-    # case-insensitive match
-    logs = (session.query(FuelLog)
-            .filter(FuelLog.vendor.ilike(vendor))  # exact case-insensitive
-            .all())
-    if not logs:
-        # try partial match if exact didn’t find anything
-        logs = (session.query(FuelLog)
-                .filter(FuelLog.vendor.ilike(f"%{vendor}%"))
-                .all())
-    if not logs:
-        print("No logs found for that vendor.")
-        return
-
-    for fl in logs:
-        total = fl.liters * fl.price_per_liter
-        print(
-            f"[{fl.id}] Truck {fl.truck_id} | {fl.date} | "
-            f"{fl.liters} L @ {fl.price_per_liter}/L | "
-            f"{fl.vendor} ({fl.location}) | ODO {fl.odometer} | cost {total:.2f}"
-        )
+    try:
+        show_fuel_logs_by_vendor(session, vendor)
+    except ValueError as e: # nothing searchable in the input
+        print("Error:", e)
+
+def show_fuel_logs_by_vendor(session, vendor, limit=None):
+    show_fuel_log_search(session, vendor, fields=("vendor",), limit=limit) # limit becomes the SQL LIMIT
+
+# *--- FULL-TEXT SEARCH (vendor / location / note) ----
+def search_fuel_logs_text(session):
+    terms = input("Search vendor/location/note: ").strip()
+    if not terms:
+        print("Search text cannot be empty.")
+        return
+    try:
+        show_fuel_log_search(session, terms)
+    except ValueError as e:
+        print("Error:", e)
+
+def show_fuel_log_search(session, terms, fields=("vendor", "location", "note"), limit=100):
+    from lib.db.search import search_fuel_logs
+    # case-insensitive prefix match on every word, best match first (FTS5 index, see lib/db/search.py)
+    logs = search_fuel_logs(session, terms, fields=fields, limit=limit) # ValueError when nothing is searchable
+    table(logs, FUEL_LOG_COLUMNS, empty="No matching fuel logs.")
 
 # *--- FIND FUEL LOGS BY DATE RANGE ----
 def find_fuel_logs_by_date_range(session):
@@ -256,28 +261,61 @@ def find_fuel_logs_by_date_range(session):
     if end < start:
         print("End date can’t be before start date.")
         return
+    show_fuel_logs_by_date_range(session, start, end)
 
-    # query (inclusive range)
-    logs = (session.query(FuelLog)
-            .filter(FuelLog.date.between(start, end))
-            .order_by(FuelLog.date.asc())
-            .all())
+def show_fuel_logs_by_date_range(session, start, end):
+    from sqlalchemy import select
+    from lib.db.archive import fuel_logs_source
 
-    if not logs:
-        print("No fuel logs in that date range.")
-        return
+    # query (inclusive range); archived years come from their archive files
+    src = fuel_logs_source(session, start, end)
+    stmt = (select(src).where(src.c.date.between(start, end)).order_by(src.c.date, src.c.id)
+            .execution_options(yield_per=1000)) # streamed to the table, not fetched up front
+    logs = map(FuelLogRow._make, session.execute(stmt))
+    table(logs, FUEL_LOG_COLUMNS, title=f"\nFuel logs from {start} to {end}:",
+          empty="No fuel logs in that date range.")
 
-    print(f"\nFuel logs from {start} to {end}:")
-    for fl in logs:
-        total = fl.liters * fl.price_per_liter
-        print(
-            f"[{fl.id}] {fl.date} | Truck {fl.truck_id} | "
-            f"{fl.liters} L @ {fl.price_per_liter}/L | "
-            f"{fl.vendor} ({fl.location}) | ODO {fl.odometer} | cost {total:.2f}"
-        )
 
 
 
+# *--- BULK IMPORT FROM FILE ----
+def import_fuel_logs_file(session):
+    path = input("CSV/NDJSON file to import: ").strip()
+    if not path:
+        print("Path cannot be empty.")
+        return
+    try:
+        from lib.db.importer import import_fuel_logs
+        stats = import_fuel_logs(session, path) # streams the file in chunks, see lib/db/importer.py
+    except (OSError, ValueError) as e:
+        print("Error:", e)
+        return
+    print(f"Read {stats['read']} rows, imported {stats['imported']}, rejected {stats['rejected']}.")
+    if stats["rejects_path"]:
+        print(f"Rejected rows written to {stats['rejects_path']}.")
+
+# *--- EXPORT TO FILE ----
+def export_fuel_logs_file(session):
+    path = input("Export to (.csv/.ndjson/.parquet, add .gz to compress): ").strip()
+    if not path:
+        print("Path cannot be empty.")
+        return
+    start_s = input("Start date (YYYY-MM-DD, blank for all): ").strip()
+    end_s = input("End date   (YYYY-MM-DD, blank for all): ").strip()
+    try:
+        start = datetime.strptime(start_s, "%Y-%m-%d").date() if start_s else None
+        end = datetime.strptime(end_s, "%Y-%m-%d").date() if end_s else None
+    except ValueError:
+        print("Dates must be in format YYYY-MM-DD (e.g., 2025-08-27).")
+        return
+    try:
+        from lib.db.exporter import export
+        n = export(session, path, start=start, end=end) # streams rows to disk, see lib/db/exporter.py
+    except (OSError, ValueError, RuntimeError) as e:
+        print("Error:", e)
+        return
+    print(f"Exported {n} fuel logs to {path}.")
+
 
 def fuel_logs_menu(session):
     while True:
@@ -287,6 +325,9 @@ def fuel_logs_menu(session):
         print("3) Delete") 
         print("4) Find by vendor")
         print("5) Find by date range") 
+        print("6) Import from CSV/NDJSON")
+        print("7) Export to file")
+        print("8) Search vendor/location/note")
         print("0) Back")
         c = input("Choose: ").strip()
         if c == "1":
@@ -299,6 +340,12 @@ def fuel_logs_menu(session):
             find_fuel_logs_by_vendor(session)
         elif c == "5":                    
             find_fuel_logs_by_date_range(session)
+        elif c == "6":
+            import_fuel_logs_file(session)
+        elif c == "7":
+            export_fuel_logs_file(session)
+        elif c == "8":
+            search_fuel_logs_text(session)
         elif c == "0":
             break
         else:
@@ -330,13 +377,8 @@ def main_menu():
 # ---------------- Drivers ----------------
 
 def list_drivers(session):
-    drivers = session.query(Driver).all() # gets all drivers from database
-    if not drivers:
-        print("No drivers found.")
-        return
-    for d in drivers:
-        truck_info = f"Truck {d.assigned_truck.plate}" if getattr(d, "assigned_truck", None) else "Unassigned" # checks if driver is assigned to a truck and displays accordingly
-        print(f"[{d.id}] {d.name} | Lic: {d.license_number} | {truck_info} | Status: {d.status} | Phone: {d.phone or '-'}") # display driver info in a readable format
+    drivers = queries.drivers_with_trucks(session) # gets all drivers with their truck's plate in one query
+    table(drivers, DRIVER_COLUMNS, empty="No drivers found.") # unassigned drivers show "-" as truck
 
 def create_driver(session):
     name = input("Driver name: ").strip()
@@ -366,7 +408,10 @@ def find_driver_by_license(session): #find a driver by license number
     if not lic:
         print("License cannot be empty.") #this is for ensuring a driver license is provided
         return
-    d = session.query(Driver).filter(Driver.license_number == lic).first() 
+    show_driver_by_license(session, lic)
+
+def show_driver_by_license(session, lic):
+    d = queries.driver_by_license(session, lic)
     if d:
         truck_info = f"Truck {d.assigned_truck.plate}" if getattr(d, "assigned_truck", None) else "Unassigned" # checks if driver is assigned to a truck and displays accordingly
         print(f"Found: [{d.id}] {d.name} | Lic: {d.license_number} | {truck_info} | Status: {d.status}") # display driver info in a readable format
@@ -434,16 +479,52 @@ def view_truck_drivers(session): # view all drivers assigned to a specific truck
     except ValueError:
         print("Invalid truck id.")
         return
-    t = Truck.find_by_id(session, tid)
+    show_truck_drivers(session, tid)
+
+def show_truck_drivers(session, tid):
+    t = Truck.find_by_id(session, tid) # entity cache, then the db
     if not t:
         print("Truck not found.")
         return
-    if not getattr(t, "drivers", []):
-        print(f"No drivers assigned to {t.plate}.")
+    drivers = queries.truck_drivers(session, t.id)
+    columns = [c for c in DRIVER_COLUMNS if c.header != "truck"]
+    table(drivers, columns, title=f"\nDrivers for {t.plate}:", empty=f"No drivers assigned to {t.plate}.")
+
+# *--- BULK ASSIGNMENT ----
+def rebalance_drivers(session):
+    try:
+        n = int(input("At most how many drivers per truck? [1]: ").strip() or "1")
+        plan = show_assignment_plan(session, n)
+    except ValueError as e:
+        print("Error:", e)
+        return
+    if not plan.changes:
+        return
+    if input("Apply these changes? (y/N): ").strip().lower() != "y":
+        print("Nothing changed.")
         return
-    print(f"\nDrivers for {t.plate}:")
-    for d in t.drivers:
-        print(f"[{d.id}] {d.name} | Lic: {d.license_number} | Status: {d.status} | Phone: {d.phone or '-'}")
+    apply_assignment_plan(session, plan)
+
+def show_assignment_plan(session, max_per_truck):
+    import sys
+    from lib.cli import output
+    from lib.db.assign import plan_assignments, summary
+    plan = plan_assignments(session, max_per_truck) # balanced plan in memory, see lib/db/assign.py
+    columns = [Column("driver_id"), Column("name"), Column("from", "old_plate"), Column("to", "new_plate"),
+               Column("reason")]
+    table(plan.changes, columns, title="\nPlanned changes:", empty="Assignments already follow the rules.")
+    print(summary(plan), file=sys.stdout if output.settings["format"] == "text" else sys.stderr) # keep tsv/json clean
+    return plan
+
+def apply_assignment_plan(session, plan):
+    from lib.db.assign import apply_plan
+    try:
+        n = apply_plan(session, plan) # one UPDATE per batch of drivers
+        print(f"Updated {n} drivers.")
+    except Exception as e:
+        session.rollback()
+        print("Error:", e)
+
 # ---- Drivers Menu ----
 def drivers_menu(session):
     while True:
@@ -455,6 +536,7 @@ def drivers_menu(session):
         print("5) Assign to truck")
         print("6) Unassign from truck")
         print("7) View drivers for a truck")
+        print("8) Rebalance drivers across active trucks")
         print("0) Back")
         c = input("Choose: ").strip()
         if c == "1":
@@ -471,6 +553,131 @@ def drivers_menu(session):
             unassign_driver(session)
         elif c == "7":
             view_truck_drivers(session)
+        elif c == "8":
+            rebalance_drivers(session)
+        elif c == "0":
+            break
+        else:
+            print("Invalid option.")
+
+# ---------------- Reports ----------------
+
+def report_fleet_efficiency(session, workers=1):
+    if workers > 1: # split by truck id range over worker processes, see lib/db/parallel.py
+        from lib.db.parallel import run_report
+        rows = run_report(session, "fleet_efficiency", workers=workers)
+    else:
+        from lib.db.reports import fleet_efficiency
+        rows = fleet_efficiency(session) # computed in SQL, see lib/db/reports.py
+    columns = [
+        Column("truck_id"), Column("plate"), Column("fills"), Column("km", "distance", ".1f"),
+        Column("liters", fmt=".1f"), Column("spend", fmt=".2f"), Column("km_per_l", "km_per_liter", ".2f"),
+        Column("cost_per_km", fmt=".3f"),
+    ] # trucks without a previous odometer have no distance ("-")
+    table(rows, columns, title="\nFleet fuel efficiency:", empty="No fuel logs.")
+
+def report_truck_efficiency(session):
+    list_trucks(session)
+    try:
+        tid = int(input("Truck id: ").strip())
+    except ValueError:
+        print("Invalid truck id.")
+        return
+    show_truck_efficiency(session, tid)
+
+def show_truck_efficiency(session, tid):
+    from lib.db.reports import efficiency_by_fill
+    rows = efficiency_by_fill(session, truck_id=tid)
+    columns = [
+        Column("id"), Column("date"), Column("odometer"), Column("km", "distance", ".1f"), Column("liters"),
+        Column("km_per_l", "km_per_liter", ".2f"), Column("cost_per_km", fmt=".3f"),
+        Column("rolling_km_per_l", "rolling_km_per_liter", ".2f"),
+    ]
+    table(rows, columns, title=f"\nEfficiency per fill for truck {tid} (rolling = last 3 fills):",
+          empty="No fuel logs for that truck.")
+
+def report_spend_by_truck(session, workers=1):
+    if workers > 1:
+        from lib.db.parallel import run_report
+        rows = run_report(session, "spend_by_truck", workers=workers)
+    else:
+        from lib.db.reports import spend_by_truck
+        rows = spend_by_truck(session) # reads the spend_truck_daily rollup
+    columns = [Column("truck_id"), Column("plate"), Column("fills"), Column("liters", fmt=".1f"),
+               Column("spend", fmt=".2f")]
+    table(rows, columns, title="\nSpend per truck:", empty="No spend recorded.")
+
+def report_monthly_spend(session, by):
+    month = input("Month (YYYY-MM, blank for all): ").strip() or None
+    show_monthly_spend(session, by, month)
+
+def show_monthly_spend(session, by, month=None): # by is "vendor" or "location"
+    from lib.db.reports import spend_by_vendor, spend_by_location
+    fetch = spend_by_vendor if by == "vendor" else spend_by_location
+    rows = fetch(session, month=month)
+    columns = [Column("month"), Column(by, lambda r: r[0]), Column("fills"), Column("liters", fmt=".1f"),
+               Column("spend", fmt=".2f")]
+    table(rows, columns, title=f"\nSpend per {by} by month:", empty="No spend recorded.")
+
+def rebuild_spend_rollups(session):
+    try:
+        run_rollup_rebuild(session)
+    except Exception as e:
+        print("Error:", e)
+
+def run_rollup_rebuild(session): # non-interactive half: errors propagate to the command/batch runner
+    from lib.db.rollups import rebuild_rollups
+    rebuild_rollups(session)
+    print("Spend rollups rebuilt.")
+
+def scan_anomalies(session, full=False, workers=1):
+    try:
+        run_anomaly_scan(session, full=full, workers=workers)
+    except RuntimeError as e: # numpy missing
+        print("Error:", e)
+
+def run_anomaly_scan(session, full=False, workers=1):
+    from lib.db.anomalies import RULES, scan
+    result = scan(session, full=full, workers=workers) # only logs added since the last scan unless full
+    found = ", ".join(f"{r} {result[r]}" for r in RULES)
+    print(f"Scanned {result['scanned']} fuel logs: {found}.")
+
+def show_anomalies(session, rule=None, truck_id=None, limit=50):
+    from lib.db.anomalies import list_anomalies
+    rows = list_anomalies(session, rule=rule, truck_id=truck_id, limit=limit)
+    columns = [Column("fuel_log_id"), Column("date"), Column("plate"), Column("vendor"), Column("rule"),
+               Column("detail")]
+    table(rows, columns, empty="No anomalies recorded.")
+
+def reports_menu(session):
+    while True:
+        print("\n-- Reports --")
+        print("1) Fleet fuel efficiency")
+        print("2) Efficiency per fill for a truck")
+        print("3) Spend per truck")
+        print("4) Spend per vendor by month")
+        print("5) Spend per location by month")
+        print("6) Rebuild spend rollups")
+        print("7) Scan new fuel logs for anomalies")
+        print("8) List anomalies")
+        print("0) Back")
+        c = input("Choose: ").strip()
+        if c == "1":
+            report_fleet_efficiency(session)
+        elif c == "2":
+            report_truck_efficiency(session)
+        elif c == "3":
+            report_spend_by_truck(session)
+        elif c == "4":
+            report_monthly_spend(session, "vendor")
+        elif c == "5":
+            report_monthly_spend(session, "location")
+        elif c == "6":
+            rebuild_spend_rollups(session)
+        elif c == "7":
+            scan_anomalies(session)
+        elif c == "8":
+            show_anomalies(session)
         elif c == "0":
             break
         else:
@@ -485,6 +692,7 @@ def main_menu():
             print("1) Trucks")
             print("2) Fuel Logs")
             print("3) Drivers")     # ← add
+            print("4) Reports")
             print("0) Exit")
             choice = input("Choose: ").strip()
             if choice == "1":
@@ -493,6 +701,8 @@ def main_menu():
                 fuel_logs_menu(session)
             elif choice == "3":      # ← add
                 drivers_menu(session)
+            elif choice == "4":
+                reports_menu(session)
             elif choice == "0":
                 print("Goodbye!")
                 break
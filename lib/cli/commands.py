@@ -0,0 +1,301 @@
+# lib/cli/commands.py
+"""
+Non-interactive command mode for cli.py.
+
+    python cli.py trucks list --limit 20
+    python cli.py fuel-logs add --truck T-123-ABC --liters 250 --price 3.1 --vendor Shell --location "Depot A"
+    python cli.py drivers assign 7 3
+    python cli.py batch commands.txt        # or "-" for stdin
+    python cli.py --format tsv fuel-logs range 2025-01-01 2025-01-31 > january.tsv
+
+Listings and reports are written by lib/cli/output.py: aligned text by
+default, or --format tsv/json; every listing takes --limit, and --pager sends
+text tables through $PAGER (the interactive menu always pages on a terminal).
+
+A batch file has one command per line (same syntax, without "python cli.py");
+blank lines and lines starting with # are skipped. The whole batch runs in one
+process and one session and is committed once at the end. Each command runs in
+a SAVEPOINT, so with --keep-going a failing command is rolled back on its own
+and the rest of the batch still commits; without it the first failure rolls
+back the entire batch. A command that fails (including "not found") counts as a
+failure. Commands that can't share the batch's transaction are refused:
+fuel-logs archive (one transaction per year) and anything with --workers > 1
+(worker processes only see committed rows).
+"""
+import argparse
+import shlex
+import sys
+from datetime import datetime
+
+# Only light modules are imported here so `--help` and argument errors stay fast;
+# SQLAlchemy, the models and app.py load with lib.cli.handlers when a command runs.
+from lib.db.database import PROFILES, DEFAULT_PROFILE
+from lib.cli import output
+
+
+def _date(s):
+    try:
+        return datetime.strptime(s, "%Y-%m-%d").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError("dates must be in format YYYY-MM-DD") from None
+
+
+# ---------- parser ----------
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Fuel Logistics CLI (no command = interactive menu)")
+    parser.add_argument("--db-profile", choices=sorted(PROFILES), default=None,
+                        help=f"SQLite storage profile (default: $LOGISTIC_DB_PROFILE or {DEFAULT_PROFILE})")
+    parser.add_argument("--profile-sql", action="store_true",
+                        help="time every SQL statement and print a summary to stderr on exit")
+    parser.add_argument("--slow-ms", type=float, default=100.0,
+                        help="with --profile-sql, log statements slower than this (default: 100)")
+    parser.add_argument("--slow-query-log", default=None, metavar="PATH",
+                        help="with --profile-sql, write slow statements here instead of stderr")
+    parser.add_argument("--format", choices=output.FORMATS, default="text",
+                        help="listing/report output: aligned text, tab-separated or a JSON array")
+    parser.add_argument("--pager", action="store_true",
+                        help="send text tables through $PAGER when stdout is a terminal (single commands only)")
+    groups = parser.add_subparsers(dest="group", metavar="COMMAND")
+
+    def command(sub, name, handler, help_):
+        # handlers are referenced by name and resolved in run_command
+        p = sub.add_parser(name, help=help_)
+        p.set_defaults(handler=handler)
+        return p
+
+    def listing(p):
+        p.add_argument("--limit", type=int, default=None, help="show at most this many rows")
+        return p
+
+    def paging(p):
+        listing(p)
+        p.add_argument("--after", type=int, default=None, help="start after this id")
+
+    def workers(p):
+        p.add_argument("--workers", type=int, default=1,
+                       help="worker processes, one truck id range each (fleet-wide runs only)")
+
+    # trucks
+    sub = groups.add_parser("trucks", help="manage trucks").add_subparsers(dest="action", required=True)
+    paging(command(sub, "list", "trucks_list", "list trucks"))
+    p = command(sub, "add", "trucks_add", "create a truck")
+    p.add_argument("--plate", required=True)
+    p.add_argument("--capacity", type=float, required=True, help="capacity in liters")
+    p.add_argument("--status", default="active")
+    command(sub, "delete", "trucks_delete", "delete a truck").add_argument("id", type=int)
+    command(sub, "retire", "trucks_retire", "mark trucks retired and unassign their drivers").add_argument(
+        "ids", type=int, nargs="+")
+    command(sub, "purge", "trucks_purge", "delete retired trucks with their fuel logs").add_argument(
+        "ids", type=int, nargs="*", help="only these trucks (default: every retired truck)")
+    command(sub, "find", "trucks_find", "find a truck by plate").add_argument("plate")
+    listing(command(sub, "logs", "trucks_logs", "fuel logs of a truck")).add_argument("id", type=int)
+
+    # fuel logs
+    sub = groups.add_parser("fuel-logs", help="manage fuel logs").add_subparsers(dest="action", required=True)
+    paging(command(sub, "list", "fuel_logs_list", "list fuel logs"))
+    p = command(sub, "add", "fuel_logs_add", "record a fuel purchase")
+    p.add_argument("--truck", required=True, help="truck id or plate")
+    p.add_argument("--liters", type=float, required=True)
+    p.add_argument("--price", type=float, required=True, help="price per liter")
+    p.add_argument("--vendor", required=True)
+    p.add_argument("--location", required=True)
+    p.add_argument("--odometer", type=float, default=0.0)
+    p.add_argument("--note", default=None)
+    p.add_argument("--date", type=_date, default=None, help="YYYY-MM-DD (default: today)")
+    command(sub, "delete", "fuel_logs_delete", "delete a fuel log").add_argument("id", type=int)
+    listing(command(sub, "vendor", "fuel_logs_vendor", "find fuel logs by vendor")).add_argument("vendor")
+    p = command(sub, "search", "fuel_logs_search", "full-text prefix search over vendor/location/note")
+    p.add_argument("terms", nargs="+")
+    p.add_argument("--field", action="append", choices=["vendor", "location", "note"],
+                   help="limit to these fields (repeatable)")
+    p.add_argument("--limit", type=int, default=100)
+    p = listing(command(sub, "range", "fuel_logs_range", "find fuel logs in a date range"))
+    p.add_argument("start", type=_date)
+    p.add_argument("end", type=_date)
+    p = command(sub, "import", "fuel_logs_import", "bulk import a CSV/NDJSON file (commits per chunk)")
+    p.add_argument("path")
+    p.add_argument("--rejects", default=None)
+    p.add_argument("--chunk-size", type=int, default=5_000)
+    p = command(sub, "export", "fuel_logs_export", "stream rows to .csv/.ndjson/.parquet[.gz]")
+    p.add_argument("path")
+    p.add_argument("--table", choices=["fuel_logs", "trucks", "drivers"], default="fuel_logs")
+    p.add_argument("--start", type=_date)
+    p.add_argument("--end", type=_date)
+    p.add_argument("--truck", help="truck id or plate")
+    p.add_argument("--vendor")
+    p = command(sub, "archive", "fuel_logs_archive", "move logs dated before a day into the archive file")
+    p.add_argument("--before", type=_date, required=True)
+    p.add_argument("--vacuum", action="store_true", help="VACUUM the main database afterwards")
+
+    # drivers
+    sub = groups.add_parser("drivers", help="manage drivers").add_subparsers(dest="action", required=True)
+    listing(command(sub, "list", "drivers_list", "list drivers"))
+    p = command(sub, "add", "drivers_add", "create a driver")
+    p.add_argument("--name", required=True)
+    p.add_argument("--license", required=True)
+    p.add_argument("--phone", default=None)
+    p.add_argument("--status", default="active")
+    command(sub, "delete", "drivers_delete", "delete a driver").add_argument("id", type=int)
+    command(sub, "find", "drivers_find", "find a driver by license").add_argument("license")
+    p = command(sub, "assign", "drivers_assign", "assign a driver to a truck")
+    p.add_argument("driver_id", type=int)
+    p.add_argument("truck", help="truck id or plate")
+    command(sub, "unassign", "drivers_unassign", "unassign a driver").add_argument("driver_id", type=int)
+    listing(command(sub, "for-truck", "drivers_for_truck", "drivers of a truck")).add_argument("truck")
+    p = listing(command(sub, "rebalance", "drivers_rebalance",
+                        "plan a balanced assignment of active drivers to active trucks"))
+    p.add_argument("--max-per-truck", type=int, default=1)
+    p.add_argument("--apply", action="store_true", help="write the plan (default: only show it)")
+
+    # reports
+    sub = groups.add_parser("reports", help="fleet reports").add_subparsers(dest="action", required=True)
+    p = listing(command(sub, "efficiency", "reports_efficiency", "fuel efficiency (fleet, or per fill with --truck)"))
+    p.add_argument("--truck", default=None, help="truck id or plate")
+    workers(p)
+    p = listing(command(sub, "spend", "reports_spend", "spend from the rollup tables"))
+    p.add_argument("--by", choices=["truck", "vendor", "location"], default="truck")
+    p.add_argument("--month", default=None, help="YYYY-MM (vendor/location only)")
+    workers(p)
+    command(sub, "rebuild-rollups", "reports_rebuild_rollups", "recompute the spend rollups")
+
+    # anomalies
+    sub = groups.add_parser("anomalies", help="fuel-log anomaly scan").add_subparsers(dest="action", required=True)
+    p = command(sub, "scan", "anomalies_scan", "scan logs added since the last scan")
+    p.add_argument("--full", action="store_true", help="clear findings and rescan everything")
+    workers(p)
+    p = command(sub, "list", "anomalies_list", "list recorded anomalies, newest first")
+    p.add_argument("--rule", choices=["overfill", "odometer_regression", "price_outlier"])
+    p.add_argument("--truck", default=None, help="truck id or plate")
+    p.add_argument("--limit", type=int, default=50)
+
+    # batch
+    p = groups.add_parser("batch", help="run many commands in one process and one transaction")
+    p.add_argument("file", nargs="?", default="-", help="command file, or - for stdin (default)")
+    p.add_argument("--keep-going", action="store_true",
+                   help="roll back only the failing command and continue")
+    return parser
+
+
+# ---------- execution ----------
+def enable_sql_profiling(slow_ms, slow_log_path=None):
+    """Instrument the app engine and dump the summary when the process exits."""
+    import atexit
+    from lib.db import instrument
+    from lib.db.database import get_engine
+
+    profiler = instrument.install(get_engine(), slow_ms=slow_ms, slow_log_path=slow_log_path)
+
+    def dump():
+        from lib.db.cache import entity_cache
+        print(profiler.summary(), file=sys.stderr)
+        print("\nentity cache:", ", ".join(f"{k} {v}" for k, v in entity_cache.stats().items()), file=sys.stderr)
+
+    atexit.register(dump)
+    return profiler
+
+
+def run_command(session, args):
+    """Run one parsed command; the caller owns the transaction."""
+    from lib.cli import handlers
+    session.info["deferred"] = True  # CRUDMixin writes leave the commit to the caller (see models.deferred)
+    output.configure(limit=getattr(args, "limit", None))
+    getattr(handlers, args.handler)(session, args)
+
+
+def _not_batchable(args):
+    """Why this command can't run inside a batch transaction, or None."""
+    if args.handler == "fuel_logs_archive":
+        return "fuel-logs archive commits once per year and can't run inside a batch"
+    if getattr(args, "workers", 1) > 1:
+        return "--workers can't be used inside a batch (worker processes don't see its uncommitted rows)"
+    return None
+
+
+def run_batch(session, parser, lines, keep_going=False):
+    """
+    Run every command in `lines` inside one transaction.
+    Returns the number of failed commands (the batch is rolled back if any
+    failed and keep_going is off).
+    """
+    failures = 0
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            args = parser.parse_args(shlex.split(line))
+        except SystemExit:  # argparse already printed the usage error
+            args = None
+        except ValueError as e:  # unbalanced quotes
+            print(f"line {lineno}: {e}", file=sys.stderr)
+            args = None
+        if args is not None and getattr(args, "group", None) in (None, "batch"):
+            print(f"line {lineno}: expected a command", file=sys.stderr)
+            args = None
+        elif args is not None and _not_batchable(args):
+            print(f"line {lineno}: {_not_batchable(args)}", file=sys.stderr)
+            args = None
+        if args is None:
+            failures += 1
+            if not keep_going:
+                break
+            continue
+
+        savepoint = session.begin_nested()
+        try:
+            run_command(session, args)
+            savepoint.commit()
+        except Exception as e:
+            savepoint.rollback()
+            failures += 1
+            print(f"line {lineno}: {e}", file=sys.stderr)
+            if not keep_going:
+                break
+
+    if failures and not keep_going:
+        session.rollback()
+        print("Batch rolled back.", file=sys.stderr)
+    else:
+        session.commit()
+    return failures
+
+
+def main(argv=None, session_factory=None):
+    """Entry point for `python cli.py <command>`; returns a process exit code."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.db_profile:
+        from lib.db.database import set_profile
+        set_profile(args.db_profile)
+    if args.profile_sql:
+        enable_sql_profiling(args.slow_ms, args.slow_query_log)
+    # one pager per table, so not for batches
+    output.configure(format=args.format, pager=args.group is None or (args.pager and args.group != "batch"))
+    if args.group is None:
+        from lib.cli.app import main_menu
+        print("Welcome to Fuel Logistics CLI")
+        main_menu()
+        return 0
+
+    if session_factory is None:
+        from lib.db.database import SessionLocal
+        session_factory = SessionLocal
+    session = session_factory()
+    try:
+        if args.group == "batch":
+            if args.file == "-":
+                failures = run_batch(session, parser, sys.stdin, keep_going=args.keep_going)
+            else:
+                with open(args.file, encoding="utf-8") as f:
+                    failures = run_batch(session, parser, f, keep_going=args.keep_going)
+            return 1 if failures else 0
+        try:
+            run_command(session, args)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print("Error:", e, file=sys.stderr)
+            return 1
+        return 0
+    finally:
+        session.close()
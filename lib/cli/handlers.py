@@ -0,0 +1,195 @@
+# lib/cli/handlers.py
+# Implementations of the subcommands defined in lib/cli/commands.py.
+# Write handlers only flush; the caller (single command or batch) owns the commit.
+from datetime import date
+
+from lib.cli import app
+from lib.db import queries
+from lib.db.models import Driver, FuelLog, Truck
+
+
+class CommandError(Exception):
+    """A command could not be carried out (bad id, unknown plate, ...)."""
+
+
+def _get(session, model, id_, label):
+    obj = model.find_by_id(session, id_)
+    if not obj:
+        raise CommandError(f"{label} {id_} not found.")
+    return obj
+
+
+def _resolve_truck(session, ref):
+    """Accept a truck id or a plate."""
+    if str(ref).isdigit():
+        return _get(session, Truck, int(ref), "Truck")
+    t = queries.truck_by_plate(session, str(ref))
+    if not t:
+        raise CommandError(f"Truck {ref} not found.")
+    return t
+
+
+# ---------- trucks ----------
+def _fetch_limit(args):
+    # output.table() applies --limit; one more row from the source lets it tell the listing was cut
+    return None if args.limit is None else args.limit + 1
+
+def trucks_list(session, args):
+    app.list_trucks(session, limit=_fetch_limit(args), after_id=args.after)
+
+def trucks_add(session, args):
+    t = Truck(plate=args.plate, capacity_liters=args.capacity, status=args.status)
+    session.add(t)
+    session.flush()  # assigns the id; the dispatcher commits
+    print(f"Created truck {t.plate} (id={t.id})")
+
+def trucks_delete(session, args):
+    session.delete(_get(session, Truck, args.id, "Truck"))
+    session.flush()
+    print("Deleted.")
+
+def trucks_retire(session, args):
+    n = Truck.retire_many(session, args.ids)
+    print(f"Retired {n} trucks.")
+
+def trucks_purge(session, args):
+    trucks, logs = Truck.purge_retired(session, args.ids or None)
+    print(f"Purged {trucks} retired trucks and {logs} fuel logs.")
+
+def trucks_find(session, args):
+    if not queries.truck_by_plate(session, args.plate):  # cached, so showing it below costs no query
+        raise CommandError(f"No truck with plate {args.plate}.")
+    app.show_truck_by_plate(session, args.plate)
+
+def trucks_logs(session, args):
+    _get(session, Truck, args.id, "Truck")
+    app.show_truck_fuel_logs(session, args.id)
+
+
+# ---------- fuel logs ----------
+def fuel_logs_list(session, args):
+    app.list_fuel_logs(session, limit=_fetch_limit(args), after_id=args.after)
+
+def fuel_logs_add(session, args):
+    truck = _resolve_truck(session, args.truck)
+    log = FuelLog(
+        truck_id=truck.id,
+        date=args.date or date.today(),
+        liters=args.liters,
+        price_per_liter=args.price,
+        vendor=args.vendor,
+        location=args.location,
+        odometer=args.odometer,
+        note=args.note,
+    )
+    session.add(log)
+    session.flush()
+    print(f"Fuel log #{log.id} created for {truck.plate}.")
+
+def fuel_logs_delete(session, args):
+    session.delete(_get(session, FuelLog, args.id, "Fuel log"))
+    session.flush()
+    print("Deleted.")
+
+def fuel_logs_vendor(session, args):
+    app.show_fuel_logs_by_vendor(session, args.vendor, limit=_fetch_limit(args))
+
+def fuel_logs_search(session, args):
+    fields = tuple(args.field) if args.field else ("vendor", "location", "note")
+    app.show_fuel_log_search(session, " ".join(args.terms), fields=fields, limit=args.limit)
+
+def fuel_logs_range(session, args):
+    if args.end < args.start:
+        raise CommandError("End date can’t be before start date.")
+    app.show_fuel_logs_by_date_range(session, args.start, args.end)
+
+def fuel_logs_import(session, args):
+    from lib.db.importer import import_fuel_logs
+    stats = import_fuel_logs(session, args.path, rejects_path=args.rejects, chunk_size=args.chunk_size)
+    print(f"Read {stats['read']} rows, imported {stats['imported']}, rejected {stats['rejected']}.")
+    if stats["rejects_path"]:
+        print(f"Rejected rows written to {stats['rejects_path']}.")
+
+def fuel_logs_export(session, args):
+    from lib.db.exporter import export
+    n = export(session, args.path, table=args.table, start=args.start, end=args.end,
+               truck=args.truck, vendor=args.vendor)
+    print(f"Exported {n} {args.table} rows to {args.path}.")
+
+def fuel_logs_archive(session, args):
+    from lib.db.archive import archive_before
+    moved = archive_before(session, args.before, vacuum=args.vacuum)
+    years = ", ".join(f"{y}: {n}" for y, n in moved.items()) or "nothing to move"
+    print(f"Archived {sum(moved.values())} fuel logs dated before {args.before} ({years}).")
+
+
+# ---------- drivers ----------
+def drivers_list(session, args):
+    app.list_drivers(session)
+
+def drivers_add(session, args):
+    d = Driver(name=args.name, license_number=args.license, phone=args.phone, status=args.status)
+    session.add(d)
+    session.flush()
+    print(f"Created driver {d.name} (id={d.id})")
+
+def drivers_delete(session, args):
+    session.delete(_get(session, Driver, args.id, "Driver"))
+    session.flush()
+    print("Deleted.")
+
+def drivers_find(session, args):
+    if not queries.driver_by_license(session, args.license):
+        raise CommandError(f"No driver with license {args.license}.")
+    app.show_driver_by_license(session, args.license)
+
+def drivers_assign(session, args):
+    d = _get(session, Driver, args.driver_id, "Driver")
+    t = _resolve_truck(session, args.truck)
+    d.assigned_truck = t
+    session.flush()
+    print(f"Driver {d.name} assigned to {t.plate}.")
+
+def drivers_unassign(session, args):
+    d = _get(session, Driver, args.driver_id, "Driver")
+    d.assigned_truck = None
+    session.flush()
+    print(f"Driver {d.name} is now unassigned.")
+
+def drivers_for_truck(session, args):
+    app.show_truck_drivers(session, _resolve_truck(session, args.truck).id)
+
+def drivers_rebalance(session, args):
+    try:
+        plan = app.show_assignment_plan(session, args.max_per_truck)
+    except ValueError as e:
+        raise CommandError(str(e)) from None
+    if args.apply and plan.changes:
+        from lib.db.assign import apply_plan
+        print(f"Updated {apply_plan(session, plan)} drivers.")
+
+
+# ---------- reports ----------
+def reports_efficiency(session, args):
+    if args.truck is not None:
+        app.show_truck_efficiency(session, _resolve_truck(session, args.truck).id)
+    else:
+        app.report_fleet_efficiency(session, workers=args.workers)
+
+def reports_spend(session, args):
+    if args.by == "truck":
+        app.report_spend_by_truck(session, workers=args.workers)
+    else:
+        app.show_monthly_spend(session, args.by, args.month)
+
+def reports_rebuild_rollups(session, args):
+    app.run_rollup_rebuild(session)
+
+
+# ---------- anomalies ----------
+def anomalies_scan(session, args):
+    app.run_anomaly_scan(session, full=args.full, workers=args.workers)
+
+def anomalies_list(session, args):
+    truck_id = _resolve_truck(session, args.truck).id if args.truck is not None else None
+    app.show_anomalies(session, rule=args.rule, truck_id=truck_id, limit=args.limit)
@@ -0,0 +1,207 @@
+# lib/cli/output.py
+"""
+Table output for the listing and report views in lib/cli/app.py.
+
+    table(iter_rows(session, Truck), TRUCK_COLUMNS, empty="No trucks found.")
+
+`rows` can be any iterable, the keyset generators from lib/db/rows.py
+included; it is consumed one row at a time and never held in full. Formats:
+
+  text  columns aligned to the widest value among the first SAMPLE rows (a wider
+        value further down just pushes its line out), numbers right-aligned
+  tsv   a header line, then tab-separated raw values (tabs/newlines escaped)
+  json  one JSON array, written an element at a time
+
+Lines are joined and written about FLUSH_BYTES at a time instead of one
+write per row. With the pager on and stdout a terminal, text tables go
+through $PAGER (default "less -FRX", which exits at once if the table fits
+on the screen); quitting the pager stops reading rows.
+
+configure() sets the format, row limit and pager for every table after it;
+lib/cli/commands.py calls it from --format, --limit and --pager.
+"""
+import itertools
+import json
+import os
+import shlex
+import subprocess
+import sys
+from datetime import date, datetime
+from typing import Callable, NamedTuple, Optional, Union
+
+FORMATS = ("text", "tsv", "json")
+SAMPLE = 200  # rows looked at to size the text columns
+FLUSH_BYTES = 64 * 1024
+
+settings = {"format": "text", "limit": None, "pager": False}
+
+
+def configure(**changes):
+    """Update `settings` (format, limit, pager) for the tables that follow."""
+    unknown = set(changes) - set(settings)
+    if unknown:
+        raise TypeError(f"unknown output settings: {', '.join(sorted(unknown))}")
+    if changes.get("format", "text") not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    settings.update(changes)
+
+
+class Column(NamedTuple):
+    header: str
+    get: Union[str, Callable, None] = None  # attribute name or function of the row (default: the header)
+    fmt: Optional[str] = None  # format spec for text output, e.g. ".2f"
+
+    def value(self, row):
+        if callable(self.get):
+            return self.get(row)
+        return getattr(row, self.get or self.header)
+
+    def text(self, value):
+        if value is None:
+            return "-"
+        return format(value, self.fmt) if self.fmt else str(value)
+
+
+class _Writer:
+    """Collects lines and writes them to the stream in blocks."""
+
+    def __init__(self, stream):
+        self.stream, self.lines, self.size = stream, [], 0
+
+    def line(self, s):
+        self.lines.append(s)
+        self.size += len(s) + 1
+        if self.size >= FLUSH_BYTES:
+            self.flush()
+
+    def flush(self):
+        if self.lines:
+            self.stream.write("\n".join(self.lines) + "\n")
+            self.lines, self.size = [], 0
+        self.stream.flush()
+
+
+class _Limited:
+    """Iterate at most `limit` rows and remember whether there were more."""
+
+    def __init__(self, rows, limit):
+        self.rows, self.limit, self.truncated = iter(rows), limit, False
+
+    def __iter__(self):
+        if self.limit is None:
+            yield from self.rows
+            return
+        for n, row in enumerate(self.rows):
+            if n == self.limit:
+                self.truncated = True
+                return
+            yield row
+
+
+def _open_pager():
+    try:
+        cmd = shlex.split(os.environ.get("PAGER") or "less -FRX")
+        return subprocess.Popen(cmd, stdin=subprocess.PIPE, text=True, encoding="utf-8")
+    except (OSError, ValueError):
+        return None  # no pager available, write to stdout
+
+
+# ---- formats ----
+def _write_text(out, rows, sample, columns, title):
+    cells = [[c.text(c.value(r)) for c in columns] for r in sample]
+    widths = [max([len(c.header)] + [len(line[i]) for line in cells]) for i, c in enumerate(columns)]
+    right = [all(isinstance(v, (int, float)) for v in (c.value(r) for r in sample) if v is not None)
+             for c in columns]
+
+    def render(values):
+        return "  ".join(v.rjust(w) if r else v.ljust(w) for v, w, r in zip(values, widths, right)).rstrip()
+
+    if title:
+        out.line(title)
+    out.line(render([c.header for c in columns]))
+    out.line(render(["-" * w for w in widths]))
+    for line in cells:
+        out.line(render(line))
+    n = len(cells)
+    for row in rows:
+        out.line(render([c.text(c.value(row)) for c in columns]))
+        n += 1
+    return n
+
+
+def _tsv(value):
+    if value is None:
+        return ""
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+def _write_tsv(out, rows, columns):
+    out.line("\t".join(c.header for c in columns))
+    n = 0
+    for row in rows:
+        out.line("\t".join(_tsv(c.value(row)) for c in columns))
+        n += 1
+    return n
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def _write_json(out, rows, columns):
+    n = 0
+    for row in rows:
+        record = json.dumps({c.header: c.value(row) for c in columns}, default=_json_default)
+        out.line(("[" if n == 0 else ",") + record)
+        n += 1
+    out.line("[]" if n == 0 else "]")
+    return n
+
+
+# ---- entry point ----
+def table(rows, columns, title=None, empty=None):
+    """
+    Write `rows` in the configured format and return how many were written.
+    In text mode `title` goes above the table and `empty` replaces it when there are no rows.
+    """
+    fmt, limit = settings["format"], settings["limit"]
+    limited = _Limited(rows, limit)
+    rows = iter(limited)
+    if fmt != "text":
+        out = _Writer(sys.stdout)
+        try:
+            return (_write_tsv if fmt == "tsv" else _write_json)(out, rows, columns)
+        finally:
+            out.flush()
+
+    sample = list(itertools.islice(rows, SAMPLE))
+    if not sample:
+        if empty:
+            print(empty)
+        return 0
+
+    pager = None
+    if settings["pager"] and sys.stdout.isatty():
+        sys.stdout.flush()  # anything printed before the table shows up first
+        pager = _open_pager()
+    out = _Writer(pager.stdin if pager else sys.stdout)
+    n = 0
+    try:
+        n = _write_text(out, rows, sample, columns, title)
+        if limited.truncated:
+            out.line(f"(first {n} rows; raise --limit to see more)")
+        out.flush()
+    except (BrokenPipeError, KeyboardInterrupt):
+        if not pager:
+            raise
+        # the pager was closed early; stop reading rows
+    finally:
+        if pager:
+            try:
+                pager.stdin.close()
+            except BrokenPipeError:
+                pass
+            pager.wait()
+    return n
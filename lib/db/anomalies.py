@@ -0,0 +1,316 @@
+# lib/db/anomalies.py
+"""
+Fleet-wide fuel-log anomaly scan, vectorized with NumPy.
+
+Rules:
+  overfill             liters > the truck's capacity_liters
+  odometer_regression  odometer lower than the truck's previous fill (by date, then id)
+  price_outlier        price_per_liter more than PRICE_Z standard deviations from the
+                       vendor's mean price (vendors with at least PRICE_MIN_SAMPLES logs)
+
+Fuel-log columns are streamed in (truck_id, date, id) order and loaded into NumPy
+arrays one chunk at a time, so memory depends on the chunk size only. The scan is
+incremental: anomaly_scan_state keeps the highest fuel log id already scanned and
+the next run only looks at newer rows. Each row is streamed with the odometer of
+the truck's fill just before it by (date, id) (LAG on a full scan, one lookup on
+the (truck_id, date) index per new row otherwise), so a back-dated log is compared
+with the fill it actually follows. The scanned fill that now follows a back-dated
+log is re-checked for odometer_regression too, so an incremental scan records the
+same odometer findings as a full one. anomaly_vendor_stats keeps running price sums
+per vendor, so only the new rows are aggregated; triggers on fuel_logs keep them in
+step with later edits and deletes. Findings go to fuel_log_anomalies.
+
+NumPy is an optional dependency (pip install numpy).
+
+    python -m lib.db.anomalies            # scan new logs
+    python -m lib.db.anomalies --full     # forget previous findings and rescan everything
+    python -m lib.db.anomalies --check    # scan, then compare with a full scan (read-only)
+"""
+import argparse
+import time
+from datetime import date
+
+from sqlalchemy import and_, delete, func, insert, or_, select, text
+from sqlalchemy.orm import aliased
+
+from lib.db.models import (
+    AnomalyScanState, AnomalyVendorStats, FuelLog, FuelLogAnomaly, Truck, _commit, _rollback,
+)
+
+RULES = ("overfill", "odometer_regression", "price_outlier")
+PRICE_Z = 3.0
+PRICE_MIN_SAMPLES = 10
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise RuntimeError("The anomaly scan needs numpy (pip install numpy).") from None
+    return np
+
+
+def _state(session):
+    state = session.get(AnomalyScanState, 1)
+    if state is None:
+        state = AnomalyScanState(id=1, last_fuel_log_id=0)
+        session.add(state)
+    return state
+
+
+def _lookup(np, pairs, size, fill):
+    """Dense array indexed by truck id, built from (truck_id, value) pairs."""
+    arr = np.full(size, fill, dtype=np.float64)
+    if pairs:
+        ids, values = zip(*pairs)
+        arr[np.asarray(ids, dtype=np.int64)] = np.asarray(values, dtype=np.float64)
+    return arr
+
+
+def _add_vendor_stats(session, watermark, high):
+    """Add the prices of the logs with watermark < id <= high to the running vendor sums."""
+    session.execute(text(
+        "INSERT INTO anomaly_vendor_stats (vendor, fills, price_sum, price_sq_sum) "
+        "SELECT lower(vendor), count(*), total(price_per_liter), total(price_per_liter * price_per_liter) "
+        "FROM fuel_logs WHERE id > :watermark AND id <= :high GROUP BY lower(vendor) "
+        "ON CONFLICT (vendor) DO UPDATE SET fills = fills + excluded.fills, "
+        "price_sum = price_sum + excluded.price_sum, price_sq_sum = price_sq_sum + excluded.price_sq_sum"
+    ), {"watermark": watermark, "high": high})
+
+
+def _vendor_stats(session):
+    """lower(vendor) -> (mean price, std dev, count), from the running sums."""
+    stats = {}
+    for v, n, total, total_sq in session.execute(
+        select(AnomalyVendorStats.vendor, AnomalyVendorStats.fills,
+               AnomalyVendorStats.price_sum, AnomalyVendorStats.price_sq_sum)
+    ):
+        mean = total / n
+        var = max(total_sq / n - mean * mean, 0.0) * n / (n - 1) if n > 1 else 0.0
+        stats[v] = (mean, var ** 0.5, n)
+    return stats
+
+
+def _after(a, b):
+    """a comes after b in a truck's (date, id) order."""
+    return or_(a.date > b.date, and_(a.date == b.date, a.id > b.id))
+
+
+def _previous_odometer(watermark, high):
+    """The odometer of each row's previous fill by (date, id), as a column of the scan query."""
+    if not watermark:
+        return func.lag(FuelLog.odometer).over(partition_by=FuelLog.truck_id, order_by=(FuelLog.date, FuelLog.id))
+    p = aliased(FuelLog)
+    return (
+        select(p.odometer)
+        .where(p.truck_id == FuelLog.truck_id, p.id <= high, _after(FuelLog, p))
+        .order_by(p.date.desc(), p.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def _rechecks(watermark, high, trucks=None):
+    """
+    Ids of already scanned rows whose previous fill is now a new row (they follow a
+    back-dated log): one index lookup per new row for its next fill by (date, id).
+    """
+    new, s = aliased(FuelLog), aliased(FuelLog)
+    following = (
+        select(s.id)
+        .where(s.truck_id == new.truck_id, s.id <= high, _after(s, new))
+        .order_by(s.date, s.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    stmt = select(following.label("id")).where(new.id > watermark, new.id <= high)
+    if trucks is not None:
+        stmt = stmt.where(new.truck_id.between(*trucks))
+    nxt = stmt.subquery()
+    return select(nxt.c.id).where(nxt.c.id <= watermark)
+
+
+def scan_chunk(np, rows, capacity, vendor_stats):
+    """
+    Apply every rule to one chunk of (id, truck_id, liters, price, odometer, previous odometer,
+    lower(vendor)) rows. Returns (fuel_log_id, truck_id, rule, detail) in row order, then rule
+    order, so the output doesn't depend on where chunks are cut.
+    """
+    ids, trucks, liters, price, odo, prev, vendors = (list(c) for c in zip(*rows))
+    ids = np.asarray(ids, dtype=np.int64)
+    trucks = np.asarray(trucks, dtype=np.int64)
+    liters = np.asarray(liters, dtype=np.float64)
+    price = np.asarray(price, dtype=np.float64)
+    odo = np.asarray(odo, dtype=np.float64)
+    prev = np.asarray(prev, dtype=np.float64)  # None (first fill) becomes NaN
+    findings = []  # (row position, rule position, finding)
+
+    # overfill
+    cap = capacity[trucks]
+    findings += [(p, 0, (ids[p], trucks[p], "overfill", f"{liters[p]} L > capacity {cap[p]} L"))
+                 for p in np.flatnonzero(liters > cap)]
+
+    # odometer regression against the truck's previous fill by (date, id)
+    hit = odo < prev  # NaN (no previous reading) compares False
+    findings += [(p, 1, (ids[p], trucks[p], "odometer_regression", f"odometer {odo[p]} < previous {prev[p]}"))
+                 for p in np.flatnonzero(hit)]
+
+    # price outliers against the vendor's mean/std
+    uniq, inv = np.unique(np.asarray(vendors, dtype=object), return_inverse=True)
+    stats = np.array([vendor_stats.get(v, (np.nan, np.nan, 0)) for v in uniq], dtype=np.float64)
+    mean, std, n = stats[inv, 0], stats[inv, 1], stats[inv, 2]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.abs(price - mean) / std
+    hit = (n >= PRICE_MIN_SAMPLES) & (std > 0) & (z > PRICE_Z)
+    findings += [(p, 2, (ids[p], trucks[p], "price_outlier",
+                         f"price {price[p]} vs vendor mean {mean[p]:.2f} (z={z[p]:.1f})"))
+                 for p in np.flatnonzero(hit)]
+    findings.sort(key=lambda f: (f[0], f[1]))
+    return [f for _, _, f in findings]
+
+
+def find_anomalies(session, watermark, high, vendor_stats, chunk_size=100_000, trucks=None):
+    """
+    Yield (rows scanned, findings) per chunk for the logs with watermark < id <= high,
+    optionally only for the trucks in the inclusive id range `trucks`. Already scanned
+    rows that follow a back-dated new log (_rechecks) are streamed as well, for their
+    odometer_regression finding only. Read-only.
+    """
+    np = _numpy()
+    size = (session.execute(select(func.max(Truck.id))).scalar() or 0) + 1
+    capacity = _lookup(np, session.execute(select(Truck.id, Truck.capacity_liters)).all(), size, np.inf)
+
+    rows_in = FuelLog.id > watermark
+    if watermark:
+        rows_in = or_(rows_in, FuelLog.id.in_(_rechecks(watermark, high, trucks)))
+    stmt = (
+        select(FuelLog.id, FuelLog.truck_id, FuelLog.liters, FuelLog.price_per_liter,
+               FuelLog.odometer, _previous_odometer(watermark, high), func.lower(FuelLog.vendor))
+        .where(rows_in, FuelLog.id <= high)
+        .order_by(FuelLog.truck_id, FuelLog.date, FuelLog.id)
+    )
+    if trucks is not None:
+        stmt = stmt.where(FuelLog.truck_id.between(*trucks))
+    conn = session.connection().execution_options(stream_results=True, yield_per=chunk_size)
+    for rows in conn.execute(stmt).partitions():
+        findings = scan_chunk(np, rows, capacity, vendor_stats)
+        yield (sum(1 for r in rows if r[0] > watermark),
+               [f for f in findings if f[0] > watermark or f[2] == "odometer_regression"])
+
+
+def scan(session, full=False, chunk_size=100_000, workers=1):
+    """
+    Scan fuel logs added since the last scan (or all of them with full=True).
+    With workers > 1 the detection runs in worker processes, one truck id range
+    each (lib/db/parallel.py); findings are written here either way.
+    Returns a dict with the number of rows scanned and findings per rule.
+    """
+    _numpy()
+    try:
+        state = _state(session)
+        if full:
+            session.execute(delete(FuelLogAnomaly))
+            session.execute(delete(AnomalyVendorStats))
+            state.last_fuel_log_id = 0
+        watermark = state.last_fuel_log_id
+        high = session.execute(select(func.max(FuelLog.id))).scalar() or 0
+        _add_vendor_stats(session, watermark, high)
+        vendor_stats = _vendor_stats(session)
+        if watermark:  # re-checked below against the back-dated log they now follow
+            session.execute(delete(FuelLogAnomaly).where(
+                FuelLogAnomaly.rule == "odometer_regression",
+                FuelLogAnomaly.fuel_log_id.in_(_rechecks(watermark, high)),
+            ))
+
+        if workers > 1:
+            from lib.db.parallel import parallel_anomalies
+            chunks = parallel_anomalies(session, watermark, high, vendor_stats, workers, chunk_size)
+        else:
+            chunks = find_anomalies(session, watermark, high, vendor_stats, chunk_size)
+        counts = dict.fromkeys(RULES, 0)
+        scanned = 0
+        today = date.today()
+        for n, findings in chunks:
+            scanned += n
+            if findings:
+                session.execute(
+                    insert(FuelLogAnomaly).prefix_with("OR IGNORE"),
+                    [{"fuel_log_id": int(i), "truck_id": int(t), "rule": r, "detail": d, "detected_on": today}
+                     for i, t, r, d in findings],
+                )
+            for _, _, r, _ in findings:
+                counts[r] += 1
+
+        state.last_fuel_log_id = max(high, watermark)
+        state.scanned_on = today
+        _commit(session)
+    except Exception:
+        _rollback(session)
+        raise
+    return {"scanned": scanned, **counts}
+
+
+def list_anomalies(session, rule=None, truck_id=None, limit=100):
+    """Newest findings first, with the fuel log fields needed to review them."""
+    stmt = (
+        select(FuelLogAnomaly.fuel_log_id, FuelLogAnomaly.truck_id, Truck.plate, FuelLogAnomaly.rule,
+               FuelLogAnomaly.detail, FuelLog.date, FuelLog.vendor)
+        .join(FuelLog, FuelLog.id == FuelLogAnomaly.fuel_log_id)
+        .join(Truck, Truck.id == FuelLogAnomaly.truck_id)
+        .order_by(FuelLogAnomaly.id.desc())
+    )
+    if rule:
+        stmt = stmt.where(FuelLogAnomaly.rule == rule)
+    if truck_id is not None:
+        stmt = stmt.where(FuelLogAnomaly.truck_id == truck_id)
+    if limit:
+        stmt = stmt.limit(limit)
+    return session.execute(stmt).all()
+
+
+def compare_with_full_scan(session, chunk_size=100_000):
+    """
+    Recorded overfill and odometer_regression findings that a full scan would not make,
+    and full-scan findings that are missing, as two sets of (fuel_log_id, rule). Read-only.
+    price_outlier is left out: each scan judges its rows by the vendor prices known then.
+    """
+    high = _state(session).last_fuel_log_id
+    recorded = {tuple(r) for r in session.execute(
+        select(FuelLogAnomaly.fuel_log_id, FuelLogAnomaly.rule)
+        .where(FuelLogAnomaly.rule != "price_outlier", FuelLogAnomaly.fuel_log_id <= high)
+    )}
+    full = {(int(i), r) for _, findings in find_anomalies(session, 0, high, {}, chunk_size)
+            for i, _, r, _ in findings}
+    return recorded - full, full - recorded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scan fuel logs for anomalies.")
+    parser.add_argument("--full", action="store_true", help="clear findings and rescan every log")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (split by truck id range)")
+    parser.add_argument("--check", action="store_true",
+                        help="after scanning, compare the recorded findings with a full scan")
+    args = parser.parse_args(argv)
+
+    from lib.db.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        started = time.perf_counter()
+        result = scan(session, full=args.full, chunk_size=args.chunk_size, workers=args.workers)
+        elapsed = time.perf_counter() - started
+        found = ", ".join(f"{r} {result[r]}" for r in RULES)
+        print(f"Scanned {result['scanned']} fuel logs in {elapsed:.2f}s: {found}.")
+        if args.check:
+            extra, missing = compare_with_full_scan(session, chunk_size=args.chunk_size)
+            print(f"full scan: {'identical' if not (extra or missing) else 'DIFFERENT'} "
+                  f"({len(extra)} extra, {len(missing)} missing, price_outlier not compared)")
+            return 0 if not (extra or missing) else 1
+    finally:
+        session.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,304 @@
+# lib/db/archive.py
+"""
+Move old fuel logs out of the hot table into an archive SQLite file, and route
+reads over the hot table plus the archive when they need it.
+
+archive_before(session, cutoff) moves every log dated before `cutoff` into
+archive/fuel_logs.db next to the main database (LOGISTIC_ARCHIVE_DIR overrides
+the directory), one transaction per year, and records each year's date span in
+the fuel_log_archives catalog. The archive file is ATTACHed on demand, so the
+hot database stays small and plain.
+
+Deleting a truck (Truck.delete, session.delete, Truck.purge_retired) also runs
+purge_trucks(), since the database cascade only reaches the hot table: the
+trucks' archived logs and findings are deleted, their spend is taken out of
+the rollups and the catalog years are recounted, in the same transaction.
+
+What the fuel_logs triggers do when rows are archived:
+  * spend rollups: archived spend stays in them. The delete trigger subtracts
+    the rows, so the archiver adds the same amounts back first; spend reports
+    keep covering all history, and rebuild_rollups reads the archives too.
+  * anomaly findings: copied into the archive file before the delete trigger
+    drops them from the hot table.
+  * full-text index: archived rows leave it; search covers the hot table only.
+fuel_logs.id is AUTOINCREMENT, so an archived id is never handed out again to
+a new log, even once every log above it has been deleted; the archiver copies
+with plain INSERTs, so a clash would fail instead of overwriting history. The
+newest log is still never archived, so SQLite's sequence always has a hot row
+above the archive to start from.
+
+fuel_logs_source(session, start, end) is the router: a selectable with the
+fuel_logs columns that is the hot table UNION ALL the archive, filtered to
+[start, end], when some archived year overlaps the range (just the hot table
+when none does). show_fuel_logs_by_date_range, the efficiency reports and the
+API use it.
+
+Every year lives in the one file, so a query attaches one database however
+much history it spans.
+
+    python -m lib.db.archive --before 2024-01-01 [--vacuum]
+    python -m lib.db.archive --list
+"""
+import argparse
+import os
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+from sqlalchemy import (
+    Column, Index, MetaData, Table, column, delete, func, select, table, text, union_all, update,
+)
+from sqlalchemy.orm import Session
+
+from lib.db.models import FuelLog, FuelLogAnomaly, FuelLogArchive, rollup_add_sql, rollup_sub_sql
+
+ARCHIVE_ENV_VAR = "LOGISTIC_ARCHIVE_DIR"
+ARCHIVE_FILE = "fuel_logs.db"
+SCHEMA = "archive"  # what the archive file is ATTACHed as
+LOG_COLUMNS = [c.name for c in FuelLog.__table__.columns]
+ANOMALY_COLUMNS = [c.name for c in FuelLogAnomaly.__table__.columns if c.name != "id"]
+
+
+def _main_dir(bind):
+    engine = bind.get_bind() if isinstance(bind, Session) else bind.engine
+    database = engine.url.database
+    if database in (None, "", ":memory:"):
+        raise RuntimeError("Archiving needs a file-backed SQLite database.")
+    return Path(database).resolve().parent
+
+
+def archive_dir(session):
+    return Path(os.environ.get(ARCHIVE_ENV_VAR) or _main_dir(session) / "archive")
+
+
+def attach(session, path):
+    """ATTACH the archive file on the session's connection (once per pooled connection); returns its schema."""
+    return _attach(session.connection(), path)
+
+
+def _attach(conn, path):
+    if conn.info.get("archive") != str(path):
+        if "archive" in conn.info:  # the catalog now points somewhere else
+            conn.exec_driver_sql(f"DETACH DATABASE {SCHEMA}")
+            del conn.info["archive"]
+        conn.exec_driver_sql(f"ATTACH DATABASE ? AS {SCHEMA}", (str(path),))
+        conn.info["archive"] = str(path)
+    return SCHEMA
+
+
+def _archive_log_table():
+    # lightweight table() clause: enough to SELECT from archive.fuel_logs
+    return table("fuel_logs", *[column(c.name, c.type) for c in FuelLog.__table__.columns], schema=SCHEMA)
+
+
+def _create_archive_tables(session, schema):
+    """Same columns as the hot tables, without foreign keys, triggers or FTS."""
+    md = MetaData()
+    logs = Table("fuel_logs", md, *[Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable)
+                                    for c in FuelLog.__table__.columns], schema=schema)
+    Index("ix_fuel_logs_truck_id_date", logs.c.truck_id, logs.c.date)
+    Index("ix_fuel_logs_date", logs.c.date)
+    Table("fuel_log_anomalies", md, *[Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable)
+                                      for c in FuelLogAnomaly.__table__.columns], schema=schema)
+    md.create_all(session.connection(), checkfirst=True)
+
+
+# ---------- router ----------
+def _overlapping(session, start=None, end=None):
+    stmt = select(FuelLogArchive).order_by(FuelLogArchive.year)
+    if start is not None:
+        stmt = stmt.where(FuelLogArchive.last_day >= start)
+    if end is not None:
+        stmt = stmt.where(FuelLogArchive.first_day <= end)
+    return session.scalars(stmt).all()
+
+
+def fuel_logs_source(session, start=None, end=None):
+    """
+    Selectable with fuel_logs' columns covering [start, end] (either may be None):
+    the hot table UNION ALL the archive when some archived year overlaps, both filtered to the range.
+    """
+    archives = _overlapping(session, start, end)
+    if not archives:
+        return FuelLog.__table__
+    attach(session, _main_dir(session) / archives[0].path)  # every catalog row points at the archive file
+    parts = []
+    for src in (FuelLog.__table__, _archive_log_table()):
+        stmt = select(*[src.c[name] for name in LOG_COLUMNS])
+        if start is not None:
+            stmt = stmt.where(src.c.date >= start)
+        if end is not None:
+            stmt = stmt.where(src.c.date <= end)
+        parts.append(stmt)
+    return union_all(*parts).subquery("fuel_logs_all")
+
+
+def source_sql(session):
+    """fuel_logs_source() over all history as SQL text, for the raw-SQL rollup rebuild."""
+    src = fuel_logs_source(session)
+    if src is FuelLog.__table__:
+        return "fuel_logs"
+    return f"({src.element.compile(dialect=session.get_bind().dialect)})"
+
+
+# ---------- archiving ----------
+def _copy_rows(session, schema, source, where="1", params=None):
+    """Copy fuel logs matching `where` (alias src) and their findings from `source` into `schema`."""
+    # plain INSERTs: fuel log ids are never reused (AUTOINCREMENT), so a clash means something
+    # is wrong and must fail rather than replace an archived row; findings get new ids here
+    cols = ", ".join(LOG_COLUMNS)
+    session.execute(text(
+        f"INSERT INTO {schema}.fuel_logs ({cols}) "
+        f"SELECT {cols} FROM {source}.fuel_logs AS src WHERE {where}"), params or {})
+    finding_cols = ", ".join(ANOMALY_COLUMNS)
+    session.execute(text(
+        f"INSERT INTO {schema}.fuel_log_anomalies ({finding_cols}) "
+        f"SELECT {', '.join('a.' + c for c in ANOMALY_COLUMNS)} FROM {source}.fuel_log_anomalies AS a "
+        f"JOIN {source}.fuel_logs AS src ON src.id = a.fuel_log_id WHERE {where}"), params or {})
+
+
+def archive_before(session, cutoff, vacuum=False):
+    """
+    Move fuel logs dated before `cutoff` into the archive file.
+    Returns {year: rows moved}.
+
+    Commits once per year on `session`, so it refuses to start inside a transaction
+    whose changes those commits would take along (or lose on an error).
+    """
+    if session.in_transaction():
+        raise RuntimeError("Archiving commits once per year; commit or roll back the session first.")
+    moved = {}
+    base = _main_dir(session)
+    folder = archive_dir(session)
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / ARCHIVE_FILE
+    try:
+        max_id = session.execute(select(func.max(FuelLog.id))).scalar()
+        years = session.execute(
+            select(func.distinct(func.strftime("%Y", FuelLog.date)))
+            .where(FuelLog.date < cutoff, FuelLog.id < max_id)
+        ).scalars().all() if max_id is not None else []
+        session.rollback()  # end our read transaction; each year gets its own
+
+        for year in sorted(int(y) for y in years):
+            lo, hi = date(year, 1, 1), min(cutoff, date(year + 1, 1, 1))
+            schema = attach(session, path)
+            _create_archive_tables(session, schema)
+
+            params = {"lo": lo.isoformat(), "hi": hi.isoformat(), "max_id": max_id}
+            where = "src.date >= :lo AND src.date < :hi AND src.id < :max_id"
+            _copy_rows(session, schema, "main", where, params)
+            for stmt in rollup_add_sql("main.fuel_logs", where):  # cancels what the delete trigger subtracts
+                session.execute(text(stmt), params)
+            n = session.execute(text(f"DELETE FROM main.fuel_logs AS src WHERE {where}"), params).rowcount
+            span = {"lo": lo.isoformat(), "next": date(year + 1, 1, 1).isoformat()}
+            first_day, last_day, rows = session.execute(text(
+                f"SELECT min(date), max(date), count(*) FROM {schema}.fuel_logs "
+                "WHERE date >= :lo AND date < :next"), span).one()
+
+            entry = session.get(FuelLogArchive, year) or FuelLogArchive(year=year)
+            entry.path = os.path.relpath(path, base)
+            entry.first_day = date.fromisoformat(first_day)
+            entry.last_day = date.fromisoformat(last_day)
+            entry.rows = rows
+            entry.archived_on = date.today()
+            session.add(entry)
+            session.commit()
+            moved[year] = n
+    except Exception:
+        session.rollback()
+        raise
+
+    if vacuum and moved:
+        # VACUUM can't run inside a transaction; use a plain DBAPI connection
+        raw = session.get_bind().raw_connection()
+        try:
+            raw.driver_connection.execute("VACUUM")
+        finally:
+            raw.close()
+    return moved
+
+
+# ---------- purging ----------
+def purge_trucks(conn, truck_ids):
+    """
+    Delete the archived fuel logs and findings of these trucks and take their spend out of
+    the rollups, in the transaction open on `conn`. Catalog years are recounted, and
+    dropped once empty. Returns archived logs deleted.
+    """
+    truck_ids = list(truck_ids)
+    catalog = FuelLogArchive.__table__
+    path = conn.execute(select(catalog.c.path).limit(1)).scalar() if truck_ids else None
+    if path is None:
+        return 0
+    schema = _attach(conn, _main_dir(conn) / path)
+    n = 0
+    years = set()
+    for i in range(0, len(truck_ids), 10_000):
+        where = f"src.truck_id IN ({', '.join(str(int(t)) for t in truck_ids[i:i + 10_000])})"
+        years.update(conn.execute(text(
+            f"SELECT DISTINCT strftime('%Y', date) FROM {schema}.fuel_logs AS src WHERE {where}")).scalars())
+        for stmt in rollup_sub_sql(f"{schema}.fuel_logs", where):
+            conn.execute(text(stmt))
+        conn.execute(text(
+            f"DELETE FROM {schema}.fuel_log_anomalies WHERE fuel_log_id IN "
+            f"(SELECT id FROM {schema}.fuel_logs AS src WHERE {where})"))
+        n += conn.execute(text(f"DELETE FROM {schema}.fuel_logs AS src WHERE {where}")).rowcount
+    for year in years:
+        span = {"lo": f"{year}-01-01", "next": f"{int(year) + 1}-01-01"}
+        first_day, last_day, rows = conn.execute(text(
+            f"SELECT min(date), max(date), count(*) FROM {schema}.fuel_logs "
+            "WHERE date >= :lo AND date < :next"), span).one()
+        if rows:
+            conn.execute(update(catalog).where(catalog.c.year == int(year)).values(
+                first_day=date.fromisoformat(first_day), last_day=date.fromisoformat(last_day), rows=rows))
+        else:
+            conn.execute(delete(catalog).where(catalog.c.year == int(year)))
+    return n
+
+
+def clear_archive(conn):
+    """Empty the archive file and the catalog in the transaction open on `conn` (lib/db/seed.py's clear_all)."""
+    catalog = FuelLogArchive.__table__
+    path = conn.execute(select(catalog.c.path).limit(1)).scalar()
+    if path is None:
+        return
+    schema = _attach(conn, _main_dir(conn) / path)
+    conn.execute(text(f"DELETE FROM {schema}.fuel_log_anomalies"))
+    conn.execute(text(f"DELETE FROM {schema}.fuel_logs"))
+    conn.execute(delete(catalog))
+
+
+def list_archives(session):
+    return session.scalars(select(FuelLogArchive).order_by(FuelLogArchive.year)).all()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive old fuel logs into an archive SQLite file.")
+    parser.add_argument("--before", type=lambda s: datetime.strptime(s, "%Y-%m-%d").date(),
+                        help="archive logs dated before this day (YYYY-MM-DD)")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM the main database afterwards")
+    parser.add_argument("--list", action="store_true", help="show the archive catalog")
+    args = parser.parse_args(argv)
+    if not args.before and not args.list:
+        parser.error("give --before DATE or --list")
+
+    from lib.db.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        if args.before:
+            started = time.perf_counter()
+            moved = archive_before(session, args.before, vacuum=args.vacuum)
+            total = sum(moved.values())
+            years = ", ".join(f"{y}: {n}" for y, n in moved.items()) or "nothing to move"
+            print(f"Archived {total} fuel logs in {time.perf_counter() - started:.2f}s ({years}).")
+        if args.list:
+            for a in list_archives(session):
+                print(f"{a.year} | {a.first_day} .. {a.last_day} | {a.rows} logs | {a.path}")
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# lib/db/assign.py
+"""
+Bulk driver-to-truck assignment: plan a balanced assignment in memory, show
+what would change, then write it with set-based UPDATEs.
+
+Rules:
+  * only active drivers are assigned, and only to active trucks;
+  * at most `max_per_truck` drivers per truck;
+  * existing assignments are kept where they already fit the rules (a truck
+    holding more than the maximum keeps its lowest driver ids);
+  * everyone else (unassigned, on a truck that isn't active, or over a
+    truck's maximum) goes to the least loaded active truck, ties to the lowest
+    truck id, until every truck is full;
+  * drivers who aren't active lose their truck.
+
+plan_assignments() reads ids and statuses with two selects and plans with a
+heap of (load, truck id): O((drivers + trucks) log trucks). apply_plan() writes
+the changes BATCH_SIZE drivers at a time with one
+
+    UPDATE drivers SET assigned_truck_id = plan.column2
+    FROM (VALUES (?, ?), ...) AS plan WHERE drivers.id = plan.column1
+
+per batch (SQLite looks each driver up by its rowid; a CASE id WHEN ... END
+would compare every row with every WHEN), and commits once. UPDATE ... FROM
+needs SQLite 3.33; with an older library each batch is an executemany of
+UPDATE drivers SET assigned_truck_id = ? WHERE id = ?, which also finds the
+rows by rowid. The statements are sent as plain SQL because compiling a VALUES
+construct with thousands of rows costs more than running it, so the entity
+cache and the session's loaded drivers/trucks are invalidated by hand.
+
+    python -m lib.db.assign --max-per-truck 2          # show the plan
+    python -m lib.db.assign --max-per-truck 2 --apply  # and write it
+"""
+import argparse
+import heapq
+import sqlite3
+import time
+from typing import NamedTuple, Optional
+
+from sqlalchemy import select
+
+from lib.db.cache import entity_cache
+from lib.db.models import Driver, Truck, _commit
+
+BATCH_SIZE = 10_000  # two bound parameters per driver, under SQLite's limit of 32766
+UPDATE_FROM = sqlite3.sqlite_version_info >= (3, 33, 0)
+
+
+class Change(NamedTuple):
+    driver_id: int
+    name: str
+    old_truck_id: Optional[int]
+    old_plate: Optional[str]
+    new_truck_id: Optional[int]
+    new_plate: Optional[str]
+    reason: str
+
+
+class Plan(NamedTuple):
+    changes: list  # Change rows, by driver id
+    kept: int  # drivers left on their truck
+    waiting: int  # active drivers still unassigned because every active truck is full
+    trucks: int  # active trucks
+    max_per_truck: int
+
+
+def plan_assignments(session, max_per_truck=1):
+    """Balanced plan for the current drivers and trucks; nothing is written."""
+    if max_per_truck < 1:
+        raise ValueError("max_per_truck must be at least 1")
+    trucks = session.execute(select(Truck.id, Truck.plate, Truck.status)).all()
+    plates = {t.id: t.plate for t in trucks}
+    active = {t.id for t in trucks if t.status == "active"}
+    drivers = session.execute(
+        select(Driver.id, Driver.name, Driver.status, Driver.assigned_truck_id).order_by(Driver.id)
+    ).all()
+
+    load = dict.fromkeys(active, 0)
+    placed = {}  # driver id -> truck id (None: unassign)
+    reasons = {}
+    pool = []  # active drivers needing a truck, by id
+    kept = 0
+    for d in drivers:  # by id, so the lowest ids keep their seats on an overfull truck
+        current = d.assigned_truck_id
+        if d.status != "active":
+            if current is not None:
+                placed[d.id], reasons[d.id] = None, f"driver {d.status}"
+            continue
+        if current in active and load[current] < max_per_truck:
+            load[current] += 1
+            kept += 1
+            continue
+        if current is not None:
+            reasons[d.id] = "truck full" if current in active else "truck not active"
+        pool.append(d)
+
+    # least loaded truck first; a truck leaves the heap once it is full
+    heap = [(n, tid) for tid, n in load.items() if n < max_per_truck]
+    heapq.heapify(heap)
+    waiting = 0
+    for d in pool:
+        if not heap:
+            waiting += 1
+            if d.assigned_truck_id is not None:
+                placed[d.id] = None  # displaced and nowhere to go
+            continue
+        n, tid = heapq.heappop(heap)
+        placed[d.id] = tid
+        reasons.setdefault(d.id, "unassigned")
+        if n + 1 < max_per_truck:
+            heapq.heappush(heap, (n + 1, tid))
+
+    by_id = {d.id: d for d in drivers}
+    changes = []
+    for did in sorted(placed):
+        d, new = by_id[did], placed[did]
+        if new == d.assigned_truck_id:
+            continue
+        changes.append(Change(did, d.name, d.assigned_truck_id, plates.get(d.assigned_truck_id),
+                              new, plates.get(new), reasons[did]))
+    return Plan(changes, kept, waiting, len(active), max_per_truck)
+
+
+def apply_plan(session, plan, batch_size=BATCH_SIZE):
+    """Write the plan's changes with one set-based UPDATE per batch; returns drivers updated."""
+    changes = plan.changes
+    conn = session.connection()
+    n = 0
+    for i in range(0, len(changes), batch_size):
+        batch = changes[i:i + batch_size]
+        if not UPDATE_FROM:
+            n += conn.exec_driver_sql("UPDATE drivers SET assigned_truck_id = ? WHERE id = ?",
+                                      [(c.new_truck_id, c.driver_id) for c in batch]).rowcount
+            continue
+        sql = ("UPDATE drivers SET assigned_truck_id = plan.column2 "
+               f"FROM (VALUES {', '.join(['(?, ?)'] * len(batch))}) AS plan WHERE drivers.id = plan.column1")
+        n += conn.exec_driver_sql(sql, tuple(v for c in batch for v in (c.driver_id, c.new_truck_id))).rowcount
+
+    # the ORM didn't see that UPDATE: forget cached drivers and reload assignments on next access
+    changed = {c.driver_id for c in changes}
+    for did in changed:
+        entity_cache.invalidate(session, Driver, did)
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, Driver) and obj.id in changed:
+            session.expire(obj, ["assigned_truck_id", "assigned_truck"])
+        elif isinstance(obj, Truck):
+            session.expire(obj, ["drivers"])
+    _commit(session)
+    return n
+
+
+def summary(plan):
+    moved = sum(1 for c in plan.changes if c.old_truck_id is not None and c.new_truck_id is not None)
+    assigned = sum(1 for c in plan.changes if c.old_truck_id is None)
+    unassigned = sum(1 for c in plan.changes if c.new_truck_id is None)
+    return (f"{plan.trucks} active trucks, at most {plan.max_per_truck} drivers each: "
+            f"{plan.kept} kept, {assigned} assigned, {moved} moved, {unassigned} unassigned, "
+            f"{plan.waiting} active drivers without a truck.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plan (and apply) a balanced driver-to-truck assignment.")
+    parser.add_argument("--max-per-truck", type=int, default=1)
+    parser.add_argument("--apply", action="store_true", help="write the plan (default: only show it)")
+    args = parser.parse_args(argv)
+
+    from lib.db.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        started = time.perf_counter()
+        plan = plan_assignments(session, args.max_per_truck)
+        planned = time.perf_counter()
+        for c in plan.changes:
+            print(f"[{c.driver_id}] {c.name}: {c.old_plate or '-'} -> {c.new_plate or '-'} ({c.reason})")
+        print(summary(plan))
+        print(f"planned in {(planned - started) * 1000:.1f} ms")
+        if args.apply and plan.changes:
+            started = time.perf_counter()
+            n = apply_plan(session, plan)
+            print(f"updated {n} drivers in {(time.perf_counter() - started) * 1000:.1f} ms")
+    finally:
+        session.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,188 @@
+# lib/db/cache.py
+"""
+Bounded LRU cache for Truck and Driver lookups by id and natural key (plate,
+license number), so repeated resolves in create_fuel_log, assign_driver_to_truck,
+batch files and imports skip the database.
+
+Entries are the committed column values of a row, keyed by engine so sessions
+on different databases never share entries. A hit returns the instance
+already in the session's identity map if there is one, otherwise the values are
+turned back into a persistent instance with session.merge(load=False), which
+issues no SQL.
+
+Keeping it correct:
+  * read-through: a miss loads the row normally and stores it;
+  * write-through: CRUDMixin.create stores the row it just committed;
+  * every flush drops the entries of inserted/updated/deleted cached rows, and
+    ORM bulk UPDATE/DELETE statements on a cached model drop that model's entries;
+  * deleting a row whose relationships are left to ON DELETE CASCADE / SET NULL
+    (passive_deletes) drops the entries of the cached model on the other side,
+    since the database changes those rows behind the ORM's back;
+  * rows touched by a transaction that is rolled back are dropped again, in case
+    they were re-cached from uncommitted data in between.
+
+Changes made by other processes, or by raw SQL that bypasses the ORM, are not
+seen; call entity_cache.clear() after those.
+"""
+from collections import OrderedDict
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+DEFAULT_SIZE = 4096
+
+
+def _bind_key(session):
+    # the engine itself, not its URL: two in-memory databases share "sqlite://"
+    bind = session.get_bind()
+    return getattr(bind, "engine", bind)
+
+
+class EntityCache:
+    def __init__(self, maxsize=DEFAULT_SIZE):
+        self.maxsize = maxsize
+        self._rows = OrderedDict()  # (engine, model, id) -> {column: value}
+        self._keys = {}             # (engine, model, attr, value) -> id
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    # ---- lookups ----
+    def get(self, session, model, attr, value, load):
+        """
+        Instance of `model` whose `attr` equals `value`, from the cache or from
+        load() (a function returning the instance or None) on a miss.
+        """
+        db = _bind_key(session)
+        id_ = value if attr == "id" else self._keys.get((db, model, attr, value))
+        row = self._rows.get((db, model, id_)) if id_ is not None else None
+        if row is None:
+            self.misses += 1
+            obj = load()
+            if obj is not None:
+                self.put(session, obj)
+            return obj
+        self.hits += 1
+        self._rows.move_to_end((db, model, id_))
+        return self._attach(session, model, row)
+
+    @staticmethod
+    def _attach(session, model, row):
+        # an instance already in the session wins, like session.get(); merging over
+        # it would overwrite unflushed changes
+        key = model.__mapper__.identity_key_from_primary_key([row["id"]])
+        existing = session.identity_map.get(key)
+        if existing is not None:
+            return existing
+        obj = model.__mapper__.class_manager.new_instance()
+        for k, v in row.items():
+            set_committed_value(obj, k, v)  # bypasses the validators; the values came from the db
+        make_transient_to_detached(obj)
+        return session.merge(obj, load=False)
+
+    # ---- writes ----
+    def put(self, session, obj):
+        state = inspect(obj)
+        if state.modified or not state.has_identity:
+            return  # only committed, unmodified rows
+        model = type(obj)
+        row = {a.key: state.dict[a.key] for a in state.mapper.column_attrs if a.key in state.dict}
+        if len(row) < len(state.mapper.column_attrs):
+            return  # expired or deferred columns; don't trigger loads from here
+        db = _bind_key(session)
+        self._drop(db, model, row["id"])
+        self._rows[(db, model, row["id"])] = row
+        for attr in model.__cache_keys__:
+            self._keys[(db, model, attr, row[attr])] = row["id"]
+        while len(self._rows) > self.maxsize:
+            (db_, model_, id_), _ = self._rows.popitem(last=False)
+            self._drop_keys(db_, model_, id_, _)
+            self.evictions += 1
+
+    def invalidate(self, session, model, id_):
+        if self._drop(_bind_key(session), model, id_):
+            self.invalidations += 1
+
+    def invalidate_model(self, session, model):
+        db = _bind_key(session)
+        for key in [k for k in self._rows if k[0] == db and k[1] is model]:
+            self._drop(*key)
+            self.invalidations += 1
+
+    def _drop(self, db, model, id_):
+        row = self._rows.pop((db, model, id_), None)
+        if row is not None:
+            self._drop_keys(db, model, id_, row)
+        return row is not None
+
+    def _drop_keys(self, db, model, id_, row):
+        for attr in model.__cache_keys__:
+            if self._keys.get((db, model, attr, row[attr])) == id_:
+                del self._keys[(db, model, attr, row[attr])]
+
+    def clear(self):
+        self._rows.clear()
+        self._keys.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._rows),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+entity_cache = EntityCache()
+
+
+# ---- invalidation hooks ----
+def _cached(obj):
+    return getattr(type(obj), "__cache_keys__", None) is not None
+
+
+def _passive_dependents(mapper):
+    """Cached models the database updates or deletes when a `mapper` row is deleted."""
+    return {rel.mapper.class_ for rel in mapper.relationships
+            if rel.passive_deletes and getattr(rel.mapper.class_, "__cache_keys__", None) is not None}
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    touched = session.info.setdefault("cache_touched", set())
+    for model in {m for obj in session.deleted for m in _passive_dependents(inspect(obj).mapper)}:
+        entity_cache.invalidate_model(session, model)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if _cached(obj):
+            state = inspect(obj)
+            id_ = state.identity[0] if state.identity else state.dict.get("id")  # new rows: id set by the flush
+            if id_ is not None:
+                entity_cache.invalidate(session, type(obj), id_)
+                touched.add((type(obj), id_))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bulk_writes(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is None:
+            return
+        if getattr(mapper.class_, "__cache_keys__", None) is not None:
+            entity_cache.invalidate_model(orm_execute_state.session, mapper.class_)
+        if orm_execute_state.is_delete:
+            for model in _passive_dependents(mapper):
+                entity_cache.invalidate_model(orm_execute_state.session, model)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    session.info.pop("cache_touched", None)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _after_rollback(session, previous_transaction):
+    for model, id_ in session.info.pop("cache_touched", ()):
+        entity_cache.invalidate(session, model, id_)
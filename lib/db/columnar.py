@@ -0,0 +1,295 @@
+# lib/db/columnar.py
+"""
+Fuel logs held in memory as NumPy column arrays, for interactive analysis
+without hydrating FuelLog objects.
+
+Columns: id, truck_id, day (days since 1970-01-01), liters, price, odometer,
+and vendor / location as int32 codes into the `vendors` / `locations` lists.
+Filters are boolean masks and group-bys are np.bincount over the codes.
+
+    cols = FuelLogColumns.load("/tmp/fuel_cols")   # or FuelLogColumns()
+    cols.refresh(session)                          # only rows newer than the watermark
+    cols.save("/tmp/fuel_cols")
+    cols.spend_by_truck(start=date(2025, 1, 1))
+
+refresh() reads logs with an id above the watermark (the highest id loaded)
+and appends them. It also compares a count/sum fingerprint of the rows at or
+below the watermark with the arrays (sums of id, truck_id, day, liters, price
+and odometer): if rows were deleted (or archived away by something other than
+lib/db/archive.py) they are dropped by id, and if the numbers still disagree
+(an edited log) everything is reloaded. Edits that only change a vendor or
+location string, or move a float column by less than the comparison tolerance,
+are not noticed; call reload() after those.
+Archived logs are included, read through lib/db/archive.py's router.
+
+save() writes one .npy file per column plus meta.json; load(mmap=True) maps
+them read-only, so a saved cache opens instantly and pages in as it's used.
+
+NumPy is an optional dependency (pip install numpy).
+
+    python -m lib.db.columnar --persist /tmp/fuel_cols --check
+"""
+import argparse
+import json
+import os
+import time
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import cast, func, select, Integer
+
+from lib.db.archive import fuel_logs_source
+
+EPOCH = date(1970, 1, 1).toordinal()
+NUMERIC = {"id": "int64", "truck_id": "int64", "day": "int32", "liters": "float64",
+           "price": "float64", "odometer": "float64"}
+CODED = ("vendor", "location")
+# fingerprint sums, besides the count: integer columns compare exactly, floats with a tolerance
+EXACT = ("id", "truck_id", "day")
+SUMMED = ("liters", "price", "odometer")
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise RuntimeError("The columnar cache needs numpy (pip install numpy).") from None
+    return np
+
+
+def epoch_day(d):
+    return d.toordinal() - EPOCH
+
+
+class FuelLogColumns:
+    def __init__(self):
+        np = self.np = _numpy()
+        self.columns = {name: np.empty(0, dtype=dtype) for name, dtype in NUMERIC.items()}
+        self.columns.update({name: np.empty(0, dtype=np.int32) for name in CODED})
+        self.vendors, self.locations = [], []
+        self._codes = {"vendor": {}, "location": {}}
+        self.watermark = 0
+
+    def __len__(self):
+        return len(self.columns["id"])
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__["columns"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    # ---- loading ----
+    def reload(self, session, chunk_size=100_000):
+        self.__init__()
+        return self.refresh(session, chunk_size)
+
+    def refresh(self, session, chunk_size=100_000):
+        """Bring the arrays up to date; returns {"added", "removed", "reloaded"}."""
+        np = self.np
+        src = fuel_logs_source(session)
+        stats = {"added": 0, "removed": 0, "reloaded": False}
+
+        if self.watermark:
+            if not self._matches(session, src):
+                ids = np.fromiter(session.execute(select(src.c.id).where(src.c.id <= self.watermark)).scalars(),
+                                  dtype=np.int64)
+                keep = np.isin(self.columns["id"], ids, assume_unique=True)
+                stats["removed"] = int(len(keep) - keep.sum())
+                self._take(keep)
+                if not self._matches(session, src):
+                    self.reload(session, chunk_size)
+                    return {"added": len(self), "removed": stats["removed"], "reloaded": True}
+
+        stmt = (select(src.c.id, src.c.truck_id,
+                       cast(func.julianday(src.c.date) - 2440587.5, Integer),
+                       src.c.liters, src.c.price_per_liter, src.c.odometer, src.c.vendor, src.c.location)
+                .where(src.c.id > self.watermark).order_by(src.c.id)
+                .execution_options(yield_per=chunk_size))
+        parts = []
+        for rows in session.execute(stmt).partitions():
+            ids, trucks, days, liters, price, odo, vendors, locations = zip(*rows)
+            parts.append({
+                "id": np.array(ids, dtype=np.int64), "truck_id": np.array(trucks, dtype=np.int64),
+                "day": np.array(days, dtype=np.int32), "liters": np.array(liters, dtype=np.float64),
+                "price": np.array(price, dtype=np.float64), "odometer": np.array(odo, dtype=np.float64),
+                "vendor": self._encode("vendor", vendors), "location": self._encode("location", locations),
+            })
+        if parts:
+            for name in self.columns:
+                self.columns[name] = np.concatenate([self.columns[name]] + [p[name] for p in parts])
+            self.watermark = int(self.columns["id"][-1])
+            stats["added"] = sum(len(p["id"]) for p in parts)
+        return stats
+
+    def _encode(self, name, values):
+        codes, labels = self._codes[name], self.vendors if name == "vendor" else self.locations
+        out = self.np.empty(len(values), dtype=self.np.int32)
+        for i, v in enumerate(values):
+            c = codes.get(v)
+            if c is None:
+                c = codes[v] = len(labels)
+                labels.append(v)
+            out[i] = c
+        return out
+
+    def _take(self, keep):
+        for name in self.columns:
+            self.columns[name] = self.columns[name][keep]
+
+    def _matches(self, session, src):
+        """Do count and column sums of the rows up to the watermark agree with the arrays?"""
+        day = cast(func.julianday(src.c.date) - 2440587.5, Integer)
+        count, *sums = session.execute(
+            select(func.count(), func.coalesce(func.sum(src.c.id), 0), func.coalesce(func.sum(src.c.truck_id), 0),
+                   func.coalesce(func.sum(day), 0), func.total(src.c.liters),
+                   func.total(src.c.price_per_liter), func.total(src.c.odometer))
+            .where(src.c.id <= self.watermark)
+        ).one()
+        exact, summed = sums[:len(EXACT)], sums[len(EXACT):]
+        c = self.columns
+        if count != len(self) or exact != [int(c[name].sum(dtype=self.np.int64)) for name in EXACT]:
+            return False
+        # float sums are compared with a tolerance: SQLite and NumPy add in different orders
+        own = [c[name].sum() for name in SUMMED]
+        return all(abs(a - b) <= 1e-9 * max(1.0, abs(a)) for a, b in zip(summed, own))
+
+    # ---- persistence ----
+    def save(self, path):
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        # meta.json goes first and comes back last: a directory without it (an interrupted save) isn't loaded
+        (path / "meta.json").unlink(missing_ok=True)
+        for name, arr in self.columns.items():
+            tmp = path / f"{name}.tmp.npy"
+            self.np.save(tmp, arr)
+            os.replace(tmp, path / f"{name}.npy")  # never truncate a file that may still be mapped
+        meta = {"watermark": self.watermark, "rows": len(self), "vendors": self.vendors, "locations": self.locations}
+        (path / "meta.json").write_text(json.dumps(meta))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Columns saved by save(), memory-mapped read-only by default; an empty cache if there are none."""
+        cols = cls()
+        path = Path(path)
+        if not (path / "meta.json").exists():
+            return cols
+        meta = json.loads((path / "meta.json").read_text())
+        for name in cols.columns:
+            cols.columns[name] = cols.np.load(path / f"{name}.npy", mmap_mode="r" if mmap else None)
+        if any(len(a) != meta["rows"] for a in cols.columns.values()):
+            return cls()  # files from different saves; start over
+        cols.watermark = meta["watermark"]
+        cols.vendors, cols.locations = meta["vendors"], meta["locations"]
+        cols._codes = {"vendor": {v: i for i, v in enumerate(cols.vendors)},
+                       "location": {v: i for i, v in enumerate(cols.locations)}}
+        return cols
+
+    # ---- vectorized queries ----
+    def mask(self, start=None, end=None, truck_id=None, vendor=None, location=None):
+        """Boolean row mask; dates are inclusive, vendor/location match exactly."""
+        np, c = self.np, self.columns
+        m = np.ones(len(self), dtype=bool)
+        if start is not None:
+            m &= c["day"] >= epoch_day(start)
+        if end is not None:
+            m &= c["day"] <= epoch_day(end)
+        if truck_id is not None:
+            m &= c["truck_id"] == truck_id
+        for name, value in (("vendor", vendor), ("location", location)):
+            if value is not None:
+                m &= c[name] == self._codes[name].get(value, -1)
+        return m
+
+    def group(self, key, m=None):
+        """
+        (keys, fills, liters, spend) summed per distinct value of `key` (a column name or an
+        array with one value per row) among the rows in mask `m`; keys are sorted ascending.
+        """
+        np, c = self.np, self.columns
+        m = slice(None) if m is None else m
+        key = c[key] if isinstance(key, str) else key
+        keys, inv = np.unique(key[m], return_inverse=True)
+        liters = c["liters"][m]
+        fills = np.bincount(inv, minlength=len(keys))
+        return (keys, fills, np.bincount(inv, liters, len(keys)),
+                np.bincount(inv, liters * c["price"][m], len(keys)))
+
+    def months(self):
+        """Month of every row, counted from 1970-01 (0)."""
+        return self.columns["day"].astype("datetime64[D]").astype("datetime64[M]").astype(self.np.int32)
+
+    def spend_by_truck(self, start=None, end=None):
+        """(truck_id, fills, liters, spend) per truck, biggest spend first, like reports.spend_by_truck."""
+        keys, fills, liters, spend = self.group("truck_id", self.mask(start, end))
+        order = self.np.lexsort((keys, -spend))
+        return [(int(keys[i]), int(fills[i]), float(liters[i]), float(spend[i])) for i in order]
+
+    def _monthly(self, name, labels, month=None):
+        np = self.np
+        month_idx = self.months()
+        # one combined key per (label, month) pair
+        combined = self.columns[name].astype(np.int64) * 100_000 + month_idx
+        m = None
+        if month is not None:
+            year, mon = map(int, month.split("-"))
+            m = month_idx == (year - 1970) * 12 + mon - 1
+        keys, fills, liters, spend = self.group(combined, m)
+        codes, months = keys // 100_000, keys % 100_000
+        rows = [(labels[int(codes[i])], f"{1970 + int(months[i]) // 12}-{int(months[i]) % 12 + 1:02d}",
+                 int(fills[i]), float(liters[i]), float(spend[i])) for i in range(len(keys))]
+        rows.sort(key=lambda r: r[4], reverse=True)
+        rows.sort(key=lambda r: r[1], reverse=True)
+        return rows
+
+    def spend_by_vendor(self, month=None):
+        """(vendor, month, fills, liters, spend), newest month first, like reports.spend_by_vendor."""
+        return self._monthly("vendor", self.vendors, month)
+
+    def spend_by_location(self, month=None):
+        """(location, month, fills, liters, spend), newest month first, like reports.spend_by_location."""
+        return self._monthly("location", self.locations, month)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or refresh the columnar fuel-log cache.")
+    parser.add_argument("--persist", default=None, help="directory for the .npy files (loaded, refreshed, saved)")
+    parser.add_argument("--no-mmap", action="store_true", help="read saved columns into memory instead of mapping")
+    parser.add_argument("--check", action="store_true", help="compare spend per truck with the rollup report")
+    args = parser.parse_args(argv)
+
+    from lib.db.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        started = time.perf_counter()
+        cols = FuelLogColumns.load(args.persist, mmap=not args.no_mmap) if args.persist else FuelLogColumns()
+        loaded = time.perf_counter()
+        stats = cols.refresh(session)
+        refreshed = time.perf_counter()
+        if args.persist and (stats["added"] or stats["removed"] or stats["reloaded"]):
+            cols.save(args.persist)
+        print(f"{len(cols)} fuel logs in columns (load {loaded - started:.2f}s, refresh {refreshed - loaded:.2f}s: "
+              f"{stats['added']} added, {stats['removed']} removed{', full reload' if stats['reloaded'] else ''})")
+
+        started = time.perf_counter()
+        rows = cols.spend_by_truck()
+        print(f"spend by truck over {len(rows)} trucks in {(time.perf_counter() - started) * 1000:.1f} ms")
+        if args.check:
+            from lib.db.reports import spend_by_truck
+
+            started = time.perf_counter()
+            sql = spend_by_truck(session)
+            sql_ms = (time.perf_counter() - started) * 1000
+            same = len(sql) == len(rows) and all(
+                r.truck_id == t and r.fills == f and abs(r.spend - s) <= 1e-6 * max(1.0, abs(s))
+                for r, (t, f, _, s) in zip(sql, rows))
+            print(f"rollup report: {sql_ms:.1f} ms, output {'identical' if same else 'DIFFERENT'}")
+            return 0 if same else 1
+    finally:
+        session.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,10 +1,151 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import os
 from pathlib import Path
 
+# SQLAlchemy is imported inside the functions below and the engine is only built
+# on first use, so importing this module (e.g. for PROFILES) costs next to nothing.
+
 # Database setup - SQLite for simplicity
 BASE_DIR = Path(__file__).resolve().parent
-DATABASE_URL = f"sqlite:///{BASE_DIR / 'my_database.db'}"
+DATABASE_URL = os.environ.get("LOGISTIC_DB_URL", f"sqlite:///{BASE_DIR / 'my_database.db'}")
+
+# Storage profiles: PRAGMAs applied to every new SQLite connection.
+# safe               - WAL with full fsync on commit; durable, still faster than the rollback journal
+# fast               - WAL with synchronous=NORMAL (may lose the last commits on power loss), big cache + mmap
+# readonly-analytics - refuses writes; large cache/mmap and in-memory temp tables for reporting
+PROFILES = {
+    "safe": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16000,  # negative = KiB, so ~16 MB
+        "temp_store": "DEFAULT",
+        "mmap_size": 0,
+    },
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "temp_store": "MEMORY",
+        "mmap_size": 268435456,  # 256 MB
+    },
+    "readonly-analytics": {
+        "query_only": "ON",
+        "cache_size": -256000,
+        "temp_store": "MEMORY",
+        "mmap_size": 1073741824,  # 1 GB
+    },
+}
+DEFAULT_PROFILE = "safe"
+PROFILE_ENV_VAR = "LOGISTIC_DB_PROFILE"
+
+
+def _check_profile(name):
+    if name not in PROFILES:
+        raise ValueError(f"Unknown storage profile {name!r}; choose one of {sorted(PROFILES)}.")
+    return name
+
+
+_active_profile = _check_profile(os.environ.get(PROFILE_ENV_VAR, DEFAULT_PROFILE))
+
+
+def apply_profile(dbapi_connection, name):
+    """Run the PRAGMAs of profile `name` on a raw sqlite3 connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma, value in PROFILES[name].items():
+            cursor.execute(f"PRAGMA {pragma}={value}")
+    finally:
+        cursor.close()
+
+
+def make_engine(url=DATABASE_URL, profile=None, **kwargs):
+    """
+    Create an engine whose connections get a storage profile.
+    With profile=None the connection follows the active profile (see set_profile).
+    """
+    from sqlalchemy import create_engine
+
+    if profile is not None:
+        _check_profile(profile)
+    eng = create_engine(url, echo=False, future=True, **kwargs)
+    _setup_connections(eng, profile)
+    return eng
+
+
+def make_async_engine(url=DATABASE_URL, profile=None, **kwargs):
+    """
+    Async engine on aiosqlite (pip install "sqlalchemy[asyncio]" aiosqlite) with the same profile and
+    transaction handling as make_engine; used by lib/api/server.py.
+    """
+    try:
+        import aiosqlite  # noqa: F401
+        import greenlet  # noqa: F401
+    except ImportError:
+        raise RuntimeError('The async engine needs aiosqlite and greenlet '
+                           '(pip install "sqlalchemy[asyncio]" aiosqlite).') from None
+    from sqlalchemy.engine import make_url
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    if profile is not None:
+        _check_profile(profile)
+    url = make_url(url).set(drivername="sqlite+aiosqlite")
+    eng = create_async_engine(url, echo=False, **kwargs)
+    _setup_connections(eng.sync_engine, profile)
+    return eng
+
+
+def _setup_connections(eng, profile):
+    from sqlalchemy import event
+
+    @event.listens_for(eng, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        # stop pysqlite from managing transactions itself so SAVEPOINTs behave (see _on_begin)
+        dbapi_connection.isolation_level = None
+        # enforce foreign keys: deleting a truck cascades to its fuel logs in the database
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+        apply_profile(dbapi_connection, profile or _active_profile)
+
+    @event.listens_for(eng, "begin")
+    def _on_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+
+def set_profile(name):
+    """Switch the app engine to another profile; pooled connections are reopened with it."""
+    global _active_profile
+    _active_profile = _check_profile(name)
+    if _engine is not None:
+        _engine.dispose()
+
+
+def get_profile():
+    return _active_profile
+
+
+_engine = None
+_sessionmaker = None
+
+
+def get_engine():
+    """The app engine, created on first use."""
+    global _engine
+    if _engine is None:
+        _engine = make_engine(DATABASE_URL)
+    return _engine
+
+
+def SessionLocal(**kwargs):
+    """Open a session on the app engine (same settings as the old module-level sessionmaker)."""
+    global _sessionmaker
+    if _sessionmaker is None:
+        from sqlalchemy.orm import sessionmaker
+        _sessionmaker = sessionmaker(bind=get_engine(), autoflush=False, autocommit=False, future=True)
+    return _sessionmaker(**kwargs)
+
 
-engine = create_engine(DATABASE_URL, echo=False, future=True)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+def __getattr__(name):
+    # keeps `from lib.db.database import engine` working without building it at import time
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,178 @@
+# lib/db/exporter.py
+"""
+Streaming export of fuel logs, trucks and drivers to CSV, NDJSON or Parquet.
+
+Rows come from a streaming cursor in fixed-size partitions and are written
+straight to the output file, so memory stays bounded by the partition size.
+Output is gzip-compressed when the path ends in .gz or gzip=True. Fuel logs
+are read through lib/db/archive.py's router, so archived history is exported too.
+Parquet needs the optional pyarrow package.
+
+    python -m lib.db.exporter fuel_logs logs-2025-08.csv.gz --start 2025-08-01 --end 2025-08-31
+"""
+import argparse
+import csv
+import gzip
+import json
+import time
+from datetime import datetime
+
+from sqlalchemy import Date, Float, Integer, func, select
+
+from lib.db.archive import fuel_logs_source
+from lib.db.models import Driver, FuelLog, Truck
+
+TABLES = {"fuel_logs": FuelLog, "trucks": Truck, "drivers": Driver}
+FORMATS = ("csv", "ndjson", "parquet")
+
+
+def detect_format(path):
+    name = str(path).lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    for fmt, suffixes in (("csv", (".csv",)), ("ndjson", (".ndjson", ".jsonl")), ("parquet", (".parquet",))):
+        if name.endswith(suffixes):
+            return fmt
+    raise ValueError(f"Cannot tell the format of {path}; use .csv, .ndjson or .parquet.")
+
+
+def build_query(session, table="fuel_logs", start=None, end=None, truck=None, vendor=None):
+    """SELECT for `table` in id order with the optional fuel-log filters applied."""
+    src = fuel_logs_source(session, start, end) if table == "fuel_logs" else TABLES[table].__table__
+    stmt = select(*[src.c[c.name] for c in TABLES[table].__table__.columns]).order_by(src.c.id)
+    if table == "fuel_logs":
+        if start is not None:
+            stmt = stmt.where(src.c.date >= start)
+        if end is not None:
+            stmt = stmt.where(src.c.date <= end)
+        if vendor:
+            stmt = stmt.where(func.lower(src.c.vendor) == vendor.strip().lower())
+    if truck is not None:
+        truck_col = src.c[{"fuel_logs": "truck_id", "trucks": "id", "drivers": "assigned_truck_id"}[table]]
+        if str(truck).strip().isdigit():
+            stmt = stmt.where(truck_col == int(truck))
+        else:
+            plate_id = select(Truck.id).where(Truck.plate == str(truck).strip().upper()).scalar_subquery()
+            stmt = stmt.where(truck_col == plate_id)
+    return stmt
+
+
+def _open(path, binary, compress):
+    opener = (lambda p, m, **kw: gzip.open(p, m, compresslevel=6, **kw)) if compress else open
+    if binary:
+        return opener(path, "wb")
+    return opener(path, "wt", newline="", encoding="utf-8")
+
+
+def _write_csv(f, columns, partitions):
+    w = csv.writer(f)
+    w.writerow(columns)
+    n = 0
+    for rows in partitions:
+        w.writerows(rows)
+        n += len(rows)
+    return n
+
+
+def _write_ndjson(f, columns, partitions):
+    n = 0
+    for rows in partitions:
+        f.write("".join(json.dumps(dict(zip(columns, r)), default=str) + "\n" for r in rows))
+        n += len(rows)
+    return n
+
+
+def _arrow_schema(pa, table):
+    types = {Integer: pa.int64(), Float: pa.float64(), Date: pa.date32()}
+    return pa.schema([
+        (c.name, next((t for k, t in types.items() if isinstance(c.type, k)), pa.string()))
+        for c in TABLES[table].__table__.columns
+    ])
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow).") from None
+    return pa, pq
+
+
+def _write_parquet(f, columns, partitions, table):
+    pa, pq = _pyarrow()
+    schema = _arrow_schema(pa, table)
+    n = 0
+    with pq.ParquetWriter(f, schema, compression="snappy") as writer:
+        for rows in partitions:
+            # one row group per partition, built column-wise
+            arrays = [pa.array([r[i] for r in rows], type=schema.field(i).type) for i in range(len(columns))]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            n += len(rows)
+    return n
+
+
+def export(session, path, table="fuel_logs", fmt=None, gzip_output=None, batch_size=10_000, **filters):
+    """
+    Stream `table` into `path`. Filters (fuel_logs): start, end, truck (id or plate), vendor.
+    Returns the number of rows written.
+    """
+    fmt = fmt or detect_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; choose one of {FORMATS}.")
+    if table not in TABLES:
+        raise ValueError(f"Unknown table {table!r}; choose one of {sorted(TABLES)}.")
+    if fmt == "parquet":
+        _pyarrow()  # a missing pyarrow fails here, before the output file is created
+    compress = str(path).lower().endswith(".gz") if gzip_output is None else gzip_output
+    stmt = build_query(session, table, **filters)
+    columns = [c.name for c in stmt.selected_columns]
+
+    # Core result on the session's connection: no ORM row processing on the way out
+    conn = session.connection().execution_options(stream_results=True, yield_per=batch_size)
+    result = conn.execute(stmt)
+    partitions = result.partitions()
+    try:
+        with _open(path, binary=(fmt == "parquet"), compress=compress) as f:
+            if fmt == "csv":
+                return _write_csv(f, columns, partitions)
+            if fmt == "ndjson":
+                return _write_ndjson(f, columns, partitions)
+            return _write_parquet(f, columns, partitions, table)
+    finally:
+        result.close()
+
+
+def _date(s):
+    return datetime.strptime(s, "%Y-%m-%d").date()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream fuel logs, trucks or drivers to a file.")
+    parser.add_argument("table", choices=sorted(TABLES))
+    parser.add_argument("path", help="output file; .csv, .ndjson or .parquet, optionally + .gz")
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    parser.add_argument("--gzip", action="store_true", default=None, help="compress even without a .gz suffix")
+    parser.add_argument("--start", type=_date, help="first date (YYYY-MM-DD), fuel_logs only")
+    parser.add_argument("--end", type=_date, help="last date (YYYY-MM-DD), fuel_logs only")
+    parser.add_argument("--truck", help="truck id or plate")
+    parser.add_argument("--vendor", help="vendor name (case-insensitive), fuel_logs only")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args(argv)
+
+    from lib.db.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        started = time.perf_counter()
+        n = export(session, args.path, table=args.table, fmt=args.format, gzip_output=args.gzip,
+                   batch_size=args.batch_size, start=args.start, end=args.end,
+                   truck=args.truck, vendor=args.vendor)
+        elapsed = time.perf_counter() - started
+        print(f"Exported {n} {args.table} rows to {args.path} in {elapsed:.2f}s.")
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
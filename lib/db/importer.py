@@ -0,0 +1,244 @@
+# lib/db/importer.py
+"""
+Streaming bulk import of fuel logs from CSV or NDJSON.
+
+Rows are read lazily and processed one chunk at a time: each chunk is validated
+column by column with the same rules as the FuelLog validators, truck plates are
+resolved with one query per chunk, valid rows are batch-inserted and rejected
+rows are written to a side file with the reason. Memory use depends on the chunk
+size, not the file size.
+
+Expected columns: plate (or truck_id), date (YYYY-MM-DD, blank = today), liters,
+price_per_liter, vendor, location, odometer (blank = 0), note.
+
+    python -m lib.db.importer receipts.csv --rejects receipts.rejects.csv
+"""
+import argparse
+import csv
+import json
+import time
+from datetime import date, datetime
+from itertools import islice
+from pathlib import Path
+
+from sqlalchemy import select
+
+from lib.db.models import FuelLog, Truck, _commit, _rollback, check_nonempty, check_odometer, check_positive
+
+FIELDS = ["plate", "truck_id", "date", "liters", "price_per_liter", "vendor", "location", "odometer", "note"]
+
+def _text(v):
+    # NDJSON can carry numbers where text is expected; those are fine as text, objects/lists are not
+    if v is None:
+        return ""
+    if isinstance(v, (dict, list)):
+        raise ValueError("expected text")
+    return str(v).strip()
+
+
+def _nonempty_text(k, v):
+    return check_nonempty(k, _text(v))
+
+
+# column -> rule, matching FuelLog._positive / _nonempty / _odo
+RULES = {
+    "liters": check_positive,
+    "price_per_liter": check_positive,
+    "vendor": _nonempty_text,
+    "location": _nonempty_text,
+    "odometer": check_odometer,
+}
+DEFAULTS = {"odometer": 0.0}  # same default as FuelLog.odometer
+
+
+def detect_format(path):
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        return "csv"
+    if suffix in (".ndjson", ".jsonl", ".json"):
+        return "ndjson"
+    raise ValueError(f"Cannot tell the format of {path}; use .csv or .ndjson.")
+
+
+def read_rows(f, fmt):
+    """Yield one dict per input record without reading the whole file."""
+    if fmt == "csv":
+        yield from csv.DictReader(f)
+    else:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    obj = json.loads(line)
+                except ValueError as e:
+                    obj = {"_error": f"invalid JSON: {e}", "_raw": line}
+                if not isinstance(obj, dict):
+                    obj = {"_error": "expected a JSON object", "_raw": line}
+                yield obj
+
+
+def chunked(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _parse_date(v):
+    if v in (None, ""):
+        return date.today()
+    return datetime.strptime(str(v).strip(), "%Y-%m-%d").date()
+
+
+def validate_chunk(rows):
+    """
+    Validate a chunk column by column.
+    Returns (values, errors): values maps column -> list of cleaned values,
+    errors maps row index -> first reason the row was rejected.
+    """
+    errors = {i: r["_error"] for i, r in enumerate(rows) if "_error" in r}
+    values = {}
+
+    def column(name, fn):
+        out = []
+        for i, r in enumerate(rows):
+            if i in errors:
+                out.append(None)
+                continue
+            try:
+                out.append(fn(r.get(name)))
+            except (AttributeError, TypeError, ValueError) as e:
+                errors[i] = f"{name}: {e}"
+                out.append(None)
+        values[name] = out
+
+    for name, rule in RULES.items():
+        column(name, lambda v, rule=rule, name=name: rule(name, DEFAULTS.get(name, v) if v in (None, "") else v))
+    column("date", _parse_date)
+    column("note", lambda v: _text(v) or None)
+    column("plate", lambda v: _text(v).upper())
+    values["truck_id"] = [r.get("truck_id") for r in rows]
+    return values, errors
+
+
+def resolve_trucks(session, values, errors):
+    """Fill values['truck_id'] from plates with one query per chunk."""
+    plates = {p for i, p in enumerate(values["plate"]) if p and i not in errors}
+    ids = {int(t) for i, t in enumerate(values["truck_id"]) if t not in (None, "") and i not in errors
+           and str(t).strip().isdigit()}
+    by_plate = dict(session.execute(select(Truck.plate, Truck.id).where(Truck.plate.in_(plates)))
+                    .all()) if plates else {}
+    known_ids = set(session.scalars(select(Truck.id).where(Truck.id.in_(ids))).all()) if ids else set()
+
+    resolved = []
+    for i, (plate, tid) in enumerate(zip(values["plate"], values["truck_id"])):
+        if i in errors:
+            resolved.append(None)
+        elif plate:
+            if plate in by_plate:
+                resolved.append(by_plate[plate])
+            else:
+                errors[i] = f"unknown truck plate {plate}"
+                resolved.append(None)
+        elif tid not in (None, "") and str(tid).strip().isdigit() and int(tid) in known_ids:
+            resolved.append(int(tid))
+        else:
+            errors[i] = "unknown truck" if tid not in (None, "") else "plate or truck_id is required"
+            resolved.append(None)
+    values["truck_id"] = resolved
+
+
+class _RejectWriter:
+    """Lazily opened side file that receives rejected rows plus a reason."""
+
+    def __init__(self, path, fmt):
+        self.path, self.fmt = path, fmt
+        self._f = self._csv = None
+
+    def write(self, row, reason):
+        if self._f is None:
+            self._f = open(self.path, "w", newline="", encoding="utf-8")
+            if self.fmt == "csv":
+                self._csv = csv.DictWriter(self._f, fieldnames=FIELDS + ["reason"], extrasaction="ignore")
+                self._csv.writeheader()
+        if self.fmt == "csv":
+            self._csv.writerow({**row, "reason": reason})
+        else:
+            rec = {"raw": row["_raw"]} if "_raw" in row else dict(row)
+            self._f.write(json.dumps({**rec, "reason": reason}, default=str) + "\n")
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+
+
+def import_fuel_logs(session, path, fmt=None, rejects_path=None, chunk_size=5_000):
+    """
+    Stream `path` into fuel_logs. Each chunk is committed on its own, unless the caller
+    owns the transaction (models.deferred, batch files), which then commits once.
+    Returns a dict with read/imported/rejected counts and the rejects file (if any).
+    """
+    fmt = fmt or detect_format(path)
+    if rejects_path is None:
+        p = Path(path)
+        rejects_path = p.with_name(f"{p.stem}.rejects{p.suffix}")
+    rejects = _RejectWriter(rejects_path, fmt)
+    table = FuelLog.__table__
+    stats = {"read": 0, "imported": 0, "rejected": 0, "rejects_path": None}
+
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            for rows in chunked(read_rows(f, fmt), chunk_size):
+                values, errors = validate_chunk(rows)
+                resolve_trucks(session, values, errors)
+                batch = [
+                    {col: values[col][i] for col in
+                     ("truck_id", "date", "liters", "price_per_liter", "vendor", "location", "odometer", "note")}
+                    for i in range(len(rows)) if i not in errors
+                ]
+                if batch:
+                    session.execute(table.insert(), batch)
+                _commit(session)
+                for i in sorted(errors):
+                    rejects.write(rows[i], errors[i])
+                stats["read"] += len(rows)
+                stats["imported"] += len(batch)
+                stats["rejected"] += len(errors)
+    except Exception:
+        _rollback(session)
+        raise
+    finally:
+        rejects.close()
+    if stats["rejected"]:
+        stats["rejects_path"] = str(rejects_path)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import fuel logs from CSV or NDJSON.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="default: from the file extension")
+    parser.add_argument("--rejects", help="where to write rejected rows (default: <name>.rejects.<ext>)")
+    parser.add_argument("--chunk-size", type=int, default=5_000)
+    args = parser.parse_args(argv)
+
+    from lib.db.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        started = time.perf_counter()
+        stats = import_fuel_logs(session, args.path, fmt=args.format,
+                                 rejects_path=args.rejects, chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - started
+        print(f"Read {stats['read']} rows, imported {stats['imported']}, rejected {stats['rejected']} "
+              f"in {elapsed:.2f}s.")
+        if stats["rejects_path"]:
+            print(f"Rejected rows written to {stats['rejects_path']}.")
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
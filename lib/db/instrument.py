@@ -0,0 +1,130 @@
+# lib/db/instrument.py
+"""
+SQL instrumentation hooked into SQLAlchemy's before/after_cursor_execute events.
+
+For every statement it records latency (count, total, max and a log-scale
+histogram), affected row counts where the driver reports them (INSERT/UPDATE/
+DELETE; SQLite reports -1 for SELECT), and which CLI command issued it. The
+command is the outermost non-menu function from lib/cli/app.py or
+lib/cli/handlers.py on the call stack, so interactive menu actions and
+subcommands are both attributed without extra bookkeeping.
+
+Statements slower than `slow_ms` are written to the "logistic.slow_sql" logger,
+which install() can point at a file.
+
+    python cli.py --profile-sql --slow-ms 50 --slow-query-log slow.log trucks list
+"""
+import logging
+import sys
+import time
+
+# histogram bucket upper bounds in milliseconds
+BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, float("inf"))
+COMMAND_MODULES = ("lib.cli.app", "lib.cli.handlers")
+
+slow_log = logging.getLogger("logistic.slow_sql")
+
+
+class StatementStats:
+    __slots__ = ("count", "total_ms", "max_ms", "rows", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.histogram = [0] * len(BUCKETS_MS)
+
+    def add(self, ms, rows):
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        if rows > 0:
+            self.rows += rows
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.histogram[i] += 1
+                break
+
+
+def current_command():
+    """Outermost CLI function (not a *_menu loop) on the stack, or '-' outside the CLI."""
+    frame = sys._getframe(1)
+    command = "-"
+    while frame is not None:
+        name = frame.f_code.co_name
+        if frame.f_globals.get("__name__") in COMMAND_MODULES and not name.endswith("menu"):
+            command = name
+        frame = frame.f_back
+    return command
+
+
+class QueryProfiler:
+    def __init__(self, slow_ms=100.0):
+        self.slow_ms = slow_ms
+        self.statements = {}  # normalized SQL -> StatementStats
+        self.commands = {}    # command -> StatementStats
+        self._engines = []
+
+    # ---- event handlers ----
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+        rows = cursor.rowcount if cursor.rowcount is not None else -1
+        key = " ".join(statement.split())
+        command = current_command()
+        self.statements.setdefault(key, StatementStats()).add(ms, rows)
+        self.commands.setdefault(command, StatementStats()).add(ms, rows)
+        if ms >= self.slow_ms:
+            params = repr(parameters)
+            slow_log.warning("%.1f ms [%s] %s | params=%s", ms, command, key,
+                             params if len(params) <= 300 else params[:300] + "...")
+
+    # ---- wiring ----
+    def attach(self, engine):
+        from sqlalchemy import event
+
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+        self._engines.append(engine)
+        return self
+
+    def detach(self):
+        from sqlalchemy import event
+
+        for engine in self._engines:
+            event.remove(engine, "before_cursor_execute", self._before)
+            event.remove(engine, "after_cursor_execute", self._after)
+        self._engines = []
+
+    # ---- reporting ----
+    def summary(self, top=15):
+        lines = []
+        total = sum(s.count for s in self.statements.values())
+        total_ms = sum(s.total_ms for s in self.statements.values())
+        lines.append(f"SQL profile: {total} statements, {total_ms:.1f} ms total")
+        lines.append("")
+        lines.append(f"{'command':32} {'stmts':>7} {'total ms':>10} {'max ms':>9}")
+        for name, s in sorted(self.commands.items(), key=lambda kv: -kv[1].total_ms):
+            lines.append(f"{name:32} {s.count:>7} {s.total_ms:>10.1f} {s.max_ms:>9.1f}")
+        lines.append("")
+        labels = [f"<={b:g}" if b != float("inf") else f">{BUCKETS_MS[-2]:g}" for b in BUCKETS_MS]
+        lines.append(f"top {top} statements by total time (histogram buckets in ms: {' '.join(labels)})")
+        for sql, s in sorted(self.statements.items(), key=lambda kv: -kv[1].total_ms)[:top]:
+            rows = f" rows={s.rows}" if s.rows else ""
+            lines.append(f"  {s.count:>6}x {s.total_ms:>9.1f} ms (mean {s.total_ms / s.count:.2f}, "
+                         f"max {s.max_ms:.2f}){rows} hist={s.histogram}")
+            lines.append(f"      {sql if len(sql) <= 160 else sql[:160] + '...'}")
+        return "\n".join(lines)
+
+
+def install(engine, slow_ms=100.0, slow_log_path=None):
+    """Attach a QueryProfiler to `engine`; slow statements go to slow_log_path (default: stderr)."""
+    handler = logging.FileHandler(slow_log_path, encoding="utf-8") if slow_log_path else logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s slow-sql %(message)s"))
+    slow_log.addHandler(handler)
+    slow_log.setLevel(logging.WARNING)
+    slow_log.propagate = False
+    return QueryProfiler(slow_ms=slow_ms).attach(engine)
@@ -25,6 +25,13 @@ if config.config_file_name is not None:
 from lib.db import models  # Import your Base where models are defined
 target_metadata =models.Base.metadata
 
+
+def include_name(name, type_, parent_names):
+    # the FTS5 virtual table and its shadow tables are managed by hand, not by autogenerate
+    if type_ == "table" and name and name.startswith("fuel_logs_fts"):
+        return False
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -47,6 +54,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -70,7 +78,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_name=include_name,
         )
 
         with context.begin_transaction():
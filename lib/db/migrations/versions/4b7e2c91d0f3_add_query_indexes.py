@@ -0,0 +1,33 @@
+"""add query indexes
+
+Revision ID: 4b7e2c91d0f3
+Revises: 3302894ff3bb
+Create Date: 2026-10-17 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e2c91d0f3'
+down_revision: Union[str, None] = '3302894ff3bb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_fuel_logs_truck_id_date', 'fuel_logs', ['truck_id', 'date'], unique=False)
+    op.create_index('ix_fuel_logs_date', 'fuel_logs', ['date'], unique=False)
+    # expression index so case-insensitive vendor lookups can seek instead of scan
+    op.create_index('ix_fuel_logs_vendor_lower', 'fuel_logs', [sa.text('lower(vendor)')], unique=False)
+    op.create_index('ix_drivers_assigned_truck_id', 'drivers', ['assigned_truck_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_drivers_assigned_truck_id', table_name='drivers')
+    op.drop_index('ix_fuel_logs_vendor_lower', table_name='fuel_logs')
+    op.drop_index('ix_fuel_logs_date', table_name='fuel_logs')
+    op.drop_index('ix_fuel_logs_truck_id_date', table_name='fuel_logs')
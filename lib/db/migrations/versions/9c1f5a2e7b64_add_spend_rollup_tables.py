@@ -0,0 +1,90 @@
+"""add spend rollup tables
+
+Revision ID: 9c1f5a2e7b64
+Revises: 4b7e2c91d0f3
+Create Date: 2026-10-17 11:03:27.540118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c1f5a2e7b64'
+down_revision: Union[str, None] = '4b7e2c91d0f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copies of lib.db.models.rollup_trigger_ddl() / rollup_rebuild_sql() at this revision.
+TRIGGERS = [
+    (
+        'CREATE TRIGGER IF NOT EXISTS fuel_logs_rollup_ai AFTER INSERT ON fuel_logs BEGIN INSERT INTO spend_truck_daily (truck_id, day, liters, spend, fills) VALUES (NEW.truck_id, NEW.date, NEW.liters, NEW.liters * NEW.price_per_liter, 1) ON CONFLICT (truck_id, day) DO UPDATE SET liters = liters + excluded.liters, spend = spend + excluded.spend, fills = fills + 1; '
+        'INSERT INTO spend_vendor_monthly (vendor, month, liters, spend, fills) VALUES (NEW.vendor, substr(NEW.date, 1, 7), NEW.liters, NEW.liters * NEW.price_per_liter, 1) ON CONFLICT (vendor, month) DO UPDATE SET liters = liters + excluded.liters, spend = spend + excluded.spend, fills = fills + 1; '
+        'INSERT INTO spend_location_monthly (location, month, liters, spend, fills) VALUES (NEW.location, substr(NEW.date, 1, 7), NEW.liters, NEW.liters * NEW.price_per_liter, 1) ON CONFLICT (location, month) DO UPDATE SET liters = liters + excluded.liters, spend = spend + excluded.spend, fills = fills + 1; '
+        'END'
+    ),
+    (
+        'CREATE TRIGGER IF NOT EXISTS fuel_logs_rollup_ad AFTER DELETE ON fuel_logs BEGIN UPDATE spend_truck_daily SET liters = liters - OLD.liters, spend = spend - OLD.liters * OLD.price_per_liter, fills = fills - 1 WHERE truck_id = OLD.truck_id AND day = OLD.date; '
+        'DELETE FROM spend_truck_daily WHERE truck_id = OLD.truck_id AND day = OLD.date AND fills <= 0; '
+        'UPDATE spend_vendor_monthly SET liters = liters - OLD.liters, spend = spend - OLD.liters * OLD.price_per_liter, fills = fills - 1 WHERE vendor = OLD.vendor AND month = substr(OLD.date, 1, 7); '
+        'DELETE FROM spend_vendor_monthly WHERE vendor = OLD.vendor AND month = substr(OLD.date, 1, 7) AND fills <= 0; '
+        'UPDATE spend_location_monthly SET liters = liters - OLD.liters, spend = spend - OLD.liters * OLD.price_per_liter, fills = fills - 1 WHERE location = OLD.location AND month = substr(OLD.date, 1, 7); '
+        'DELETE FROM spend_location_monthly WHERE location = OLD.location AND month = substr(OLD.date, 1, 7) AND fills <= 0; '
+        'END'
+    ),
+    (
+        'CREATE TRIGGER IF NOT EXISTS fuel_logs_rollup_au AFTER UPDATE OF truck_id, date, liters, price_per_liter, vendor, location ON fuel_logs BEGIN UPDATE spend_truck_daily SET liters = liters - OLD.liters, spend = spend - OLD.liters * OLD.price_per_liter, fills = fills - 1 WHERE truck_id = OLD.truck_id AND day = OLD.date; '
+        'DELETE FROM spend_truck_daily WHERE truck_id = OLD.truck_id AND day = OLD.date AND fills <= 0; '
+        'UPDATE spend_vendor_monthly SET liters = liters - OLD.liters, spend = spend - OLD.liters * OLD.price_per_liter, fills = fills - 1 WHERE vendor = OLD.vendor AND month = substr(OLD.date, 1, 7); '
+        'DELETE FROM spend_vendor_monthly WHERE vendor = OLD.vendor AND month = substr(OLD.date, 1, 7) AND fills <= 0; '
+        'UPDATE spend_location_monthly SET liters = liters - OLD.liters, spend = spend - OLD.liters * OLD.price_per_liter, fills = fills - 1 WHERE location = OLD.location AND month = substr(OLD.date, 1, 7); '
+        'DELETE FROM spend_location_monthly WHERE location = OLD.location AND month = substr(OLD.date, 1, 7) AND fills <= 0; '
+        'INSERT INTO spend_truck_daily (truck_id, day, liters, spend, fills) VALUES (NEW.truck_id, NEW.date, NEW.liters, NEW.liters * NEW.price_per_liter, 1) ON CONFLICT (truck_id, day) DO UPDATE SET liters = liters + excluded.liters, spend = spend + excluded.spend, fills = fills + 1; '
+        'INSERT INTO spend_vendor_monthly (vendor, month, liters, spend, fills) VALUES (NEW.vendor, substr(NEW.date, 1, 7), NEW.liters, NEW.liters * NEW.price_per_liter, 1) ON CONFLICT (vendor, month) DO UPDATE SET liters = liters + excluded.liters, spend = spend + excluded.spend, fills = fills + 1; '
+        'INSERT INTO spend_location_monthly (location, month, liters, spend, fills) VALUES (NEW.location, substr(NEW.date, 1, 7), NEW.liters, NEW.liters * NEW.price_per_liter, 1) ON CONFLICT (location, month) DO UPDATE SET liters = liters + excluded.liters, spend = spend + excluded.spend, fills = fills + 1; '
+        'END'
+    ),
+]
+
+BACKFILL = [
+    'INSERT INTO spend_truck_daily (truck_id, day, liters, spend, fills) SELECT fuel_logs.truck_id, fuel_logs.date, SUM(liters), SUM(liters * price_per_liter), COUNT(*) FROM fuel_logs GROUP BY fuel_logs.truck_id, fuel_logs.date',
+    'INSERT INTO spend_vendor_monthly (vendor, month, liters, spend, fills) SELECT fuel_logs.vendor, substr(fuel_logs.date, 1, 7), SUM(liters), SUM(liters * price_per_liter), COUNT(*) FROM fuel_logs GROUP BY fuel_logs.vendor, substr(fuel_logs.date, 1, 7)',
+    'INSERT INTO spend_location_monthly (location, month, liters, spend, fills) SELECT fuel_logs.location, substr(fuel_logs.date, 1, 7), SUM(liters), SUM(liters * price_per_liter), COUNT(*) FROM fuel_logs GROUP BY fuel_logs.location, substr(fuel_logs.date, 1, 7)',
+]
+
+
+def _spend_table(name, *keys):
+    op.create_table(name,
+    *keys,
+    sa.Column('liters', sa.Float(), nullable=False),
+    sa.Column('spend', sa.Float(), nullable=False),
+    sa.Column('fills', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint(*[k.name for k in keys])
+    )
+
+
+def upgrade() -> None:
+    _spend_table('spend_truck_daily',
+                 sa.Column('truck_id', sa.Integer(), nullable=False),
+                 sa.Column('day', sa.Date(), nullable=False))
+    _spend_table('spend_vendor_monthly',
+                 sa.Column('vendor', sa.String(), nullable=False),
+                 sa.Column('month', sa.String(), nullable=False))
+    _spend_table('spend_location_monthly',
+                 sa.Column('location', sa.String(), nullable=False),
+                 sa.Column('month', sa.String(), nullable=False))
+    for stmt in BACKFILL:
+        op.execute(stmt)
+    for stmt in TRIGGERS:
+        op.execute(stmt)
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER IF EXISTS fuel_logs_rollup_au')
+    op.execute('DROP TRIGGER IF EXISTS fuel_logs_rollup_ad')
+    op.execute('DROP TRIGGER IF EXISTS fuel_logs_rollup_ai')
+    op.drop_table('spend_location_monthly')
+    op.drop_table('spend_vendor_monthly')
+    op.drop_table('spend_truck_daily')
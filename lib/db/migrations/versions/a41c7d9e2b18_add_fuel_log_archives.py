@@ -0,0 +1,34 @@
+"""add fuel log archives
+
+Revision ID: a41c7d9e2b18
+Revises: e7b3c0a91f52
+Create Date: 2026-10-17 16:02:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41c7d9e2b18'
+down_revision: Union[str, None] = 'e7b3c0a91f52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('fuel_log_archives',
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('path', sa.String(), nullable=False),
+    sa.Column('first_day', sa.Date(), nullable=False),
+    sa.Column('last_day', sa.Date(), nullable=False),
+    sa.Column('rows', sa.Integer(), nullable=False),
+    sa.Column('archived_on', sa.Date(), nullable=False),
+    sa.PrimaryKeyConstraint('year')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('fuel_log_archives')
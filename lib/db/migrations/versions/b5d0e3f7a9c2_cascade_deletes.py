@@ -0,0 +1,54 @@
+"""cascade deletes
+
+Revision ID: b5d0e3f7a9c2
+Revises: a41c7d9e2b18
+Create Date: 2026-10-17 18:12:37.540918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d0e3f7a9c2'
+down_revision: Union[str, None] = 'a41c7d9e2b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQLite can't alter a foreign key in place: batch mode copies each table into a new one.
+# The original FKs are unnamed, so the naming convention gives batch mode a name to drop.
+NAMING = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+FKS = [
+    # table, column, referred table, ON DELETE after upgrade
+    ('drivers', 'assigned_truck_id', 'trucks', 'SET NULL'),
+    ('fuel_logs', 'truck_id', 'trucks', 'CASCADE'),
+    ('fuel_log_anomalies', 'fuel_log_id', 'fuel_logs', 'CASCADE'),
+]
+
+
+def _set_ondelete(ondelete):
+    bind = op.get_bind()
+    # recreating a table drops its triggers (rollups, full-text index, findings) and batch mode
+    # can't reflect expression indexes (ix_fuel_logs_vendor_lower); put back whatever went missing
+    schema = "SELECT name, sql FROM sqlite_master WHERE type IN ('trigger', 'index') AND sql IS NOT NULL"
+    before = dict(bind.exec_driver_sql(schema).all())
+    for table, column, referred, action in FKS:
+        name = f"fk_{table}_{column}_{referred}"
+        with op.batch_alter_table(table, naming_convention=NAMING) as batch_op:
+            batch_op.drop_constraint(name, type_='foreignkey')
+            batch_op.create_foreign_key(name, referred, [column], ['id'],
+                                        ondelete=action if ondelete else None)
+    after = dict(bind.exec_driver_sql(schema).all())
+    for name, sql in before.items():
+        if name not in after:
+            bind.exec_driver_sql(sql)
+
+
+def upgrade() -> None:
+    _set_ondelete(True)
+
+
+def downgrade() -> None:
+    _set_ondelete(False)
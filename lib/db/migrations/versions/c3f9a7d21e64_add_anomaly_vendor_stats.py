@@ -0,0 +1,51 @@
+"""add anomaly vendor stats
+
+Revision ID: c3f9a7d21e64
+Revises: b5d0e3f7a9c2
+Create Date: 2026-10-17 21:05:44.218906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f9a7d21e64'
+down_revision: Union[str, None] = 'b5d0e3f7a9c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of lib.db.models.VENDOR_STATS_TRIGGER_DDL at this revision.
+TRIGGERS = [
+    'CREATE TRIGGER IF NOT EXISTS fuel_logs_vendor_stats_ai AFTER INSERT ON fuel_logs WHEN NEW.id <= (SELECT last_fuel_log_id FROM anomaly_scan_state WHERE id = 1) BEGIN INSERT INTO anomaly_vendor_stats (vendor, fills, price_sum, price_sq_sum) VALUES (lower(NEW.vendor), 1, NEW.price_per_liter, NEW.price_per_liter * NEW.price_per_liter) ON CONFLICT (vendor) DO UPDATE SET fills = fills + 1, price_sum = price_sum + excluded.price_sum, price_sq_sum = price_sq_sum + excluded.price_sq_sum; END',
+    'CREATE TRIGGER IF NOT EXISTS fuel_logs_vendor_stats_ad AFTER DELETE ON fuel_logs WHEN OLD.id <= (SELECT last_fuel_log_id FROM anomaly_scan_state WHERE id = 1) BEGIN UPDATE anomaly_vendor_stats SET fills = fills - 1, price_sum = price_sum - OLD.price_per_liter, price_sq_sum = price_sq_sum - OLD.price_per_liter * OLD.price_per_liter WHERE vendor = lower(OLD.vendor); DELETE FROM anomaly_vendor_stats WHERE vendor = lower(OLD.vendor) AND fills <= 0; END',
+    'CREATE TRIGGER IF NOT EXISTS fuel_logs_vendor_stats_au AFTER UPDATE OF vendor, price_per_liter ON fuel_logs WHEN OLD.id <= (SELECT last_fuel_log_id FROM anomaly_scan_state WHERE id = 1) BEGIN UPDATE anomaly_vendor_stats SET fills = fills - 1, price_sum = price_sum - OLD.price_per_liter, price_sq_sum = price_sq_sum - OLD.price_per_liter * OLD.price_per_liter WHERE vendor = lower(OLD.vendor); DELETE FROM anomaly_vendor_stats WHERE vendor = lower(OLD.vendor) AND fills <= 0; INSERT INTO anomaly_vendor_stats (vendor, fills, price_sum, price_sq_sum) VALUES (lower(NEW.vendor), 1, NEW.price_per_liter, NEW.price_per_liter * NEW.price_per_liter) ON CONFLICT (vendor) DO UPDATE SET fills = fills + 1, price_sum = price_sum + excluded.price_sum, price_sq_sum = price_sq_sum + excluded.price_sq_sum; END',
+]
+
+
+def upgrade() -> None:
+    op.create_table('anomaly_vendor_stats',
+    sa.Column('vendor', sa.String(), nullable=False),
+    sa.Column('fills', sa.Integer(), nullable=False),
+    sa.Column('price_sum', sa.Float(), nullable=False),
+    sa.Column('price_sq_sum', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('vendor')
+    )
+    # start from the logs the last scan already covered
+    op.execute(
+        'INSERT INTO anomaly_vendor_stats (vendor, fills, price_sum, price_sq_sum) '
+        'SELECT lower(vendor), count(*), total(price_per_liter), total(price_per_liter * price_per_liter) '
+        'FROM fuel_logs WHERE id <= (SELECT last_fuel_log_id FROM anomaly_scan_state WHERE id = 1) '
+        'GROUP BY lower(vendor)'
+    )
+    for stmt in TRIGGERS:
+        op.execute(stmt)
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER IF EXISTS fuel_logs_vendor_stats_au')
+    op.execute('DROP TRIGGER IF EXISTS fuel_logs_vendor_stats_ad')
+    op.execute('DROP TRIGGER IF EXISTS fuel_logs_vendor_stats_ai')
+    op.drop_table('anomaly_vendor_stats')
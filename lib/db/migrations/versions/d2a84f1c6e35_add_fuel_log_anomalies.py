@@ -0,0 +1,50 @@
+"""add fuel log anomalies
+
+Revision ID: d2a84f1c6e35
+Revises: 9c1f5a2e7b64
+Create Date: 2026-10-17 14:26:09.771532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a84f1c6e35'
+down_revision: Union[str, None] = '9c1f5a2e7b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('fuel_log_anomalies',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('fuel_log_id', sa.Integer(), nullable=False),
+    sa.Column('truck_id', sa.Integer(), nullable=False),
+    sa.Column('rule', sa.String(), nullable=False),
+    sa.Column('detail', sa.String(), nullable=False),
+    sa.Column('detected_on', sa.Date(), nullable=False),
+    sa.ForeignKeyConstraint(['fuel_log_id'], ['fuel_logs.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('fuel_log_id', 'rule', name='uq_fuel_log_anomalies_log_rule')
+    )
+    op.create_index('ix_fuel_log_anomalies_truck_id', 'fuel_log_anomalies', ['truck_id'], unique=False)
+    op.create_table('anomaly_scan_state',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('last_fuel_log_id', sa.Integer(), nullable=False),
+    sa.Column('scanned_on', sa.Date(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(
+        'CREATE TRIGGER IF NOT EXISTS fuel_logs_anomalies_ad AFTER DELETE ON fuel_logs '
+        'BEGIN DELETE FROM fuel_log_anomalies WHERE fuel_log_id = OLD.id; END'
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER IF EXISTS fuel_logs_anomalies_ad')
+    op.drop_table('anomaly_scan_state')
+    op.drop_index('ix_fuel_log_anomalies_truck_id', table_name='fuel_log_anomalies')
+    op.drop_table('fuel_log_anomalies')
@@ -0,0 +1,52 @@
+"""add fuel logs full-text index
+
+Revision ID: e7b3c0a91f52
+Revises: d2a84f1c6e35
+Create Date: 2026-10-17 15:48:52.120387
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3c0a91f52'
+down_revision: Union[str, None] = 'd2a84f1c6e35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS fuel_logs_fts USING fts5("
+        "vendor, location, note, content='fuel_logs', content_rowid='id', prefix='2 3')"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS fuel_logs_fts_ai AFTER INSERT ON fuel_logs BEGIN "
+        "INSERT INTO fuel_logs_fts(rowid, vendor, location, note) VALUES (NEW.id, NEW.vendor, NEW.location, NEW.note); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS fuel_logs_fts_ad AFTER DELETE ON fuel_logs BEGIN "
+        "INSERT INTO fuel_logs_fts(fuel_logs_fts, rowid, vendor, location, note) "
+        "VALUES ('delete', OLD.id, OLD.vendor, OLD.location, OLD.note); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS fuel_logs_fts_au AFTER UPDATE OF vendor, location, note ON fuel_logs BEGIN "
+        "INSERT INTO fuel_logs_fts(fuel_logs_fts, rowid, vendor, location, note) "
+        "VALUES ('delete', OLD.id, OLD.vendor, OLD.location, OLD.note); "
+        "INSERT INTO fuel_logs_fts(rowid, vendor, location, note) VALUES (NEW.id, NEW.vendor, NEW.location, NEW.note); "
+        "END"
+    )
+    # index the existing rows
+    op.execute("INSERT INTO fuel_logs_fts(fuel_logs_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER IF EXISTS fuel_logs_fts_au')
+    op.execute('DROP TRIGGER IF EXISTS fuel_logs_fts_ad')
+    op.execute('DROP TRIGGER IF EXISTS fuel_logs_fts_ai')
+    op.execute('DROP TABLE IF EXISTS fuel_logs_fts')
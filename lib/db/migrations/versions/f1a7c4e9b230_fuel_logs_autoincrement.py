@@ -0,0 +1,66 @@
+"""fuel logs autoincrement
+
+Revision ID: f1a7c4e9b230
+Revises: c3f9a7d21e64
+Create Date: 2026-10-17 23:41:09.163402
+
+"""
+import os
+import sqlite3
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a7c4e9b230'
+down_revision: Union[str, None] = 'c3f9a7d21e64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _recreate(autoincrement):
+    bind = op.get_bind()
+    # recreating the table drops its triggers and batch mode can't reflect the expression
+    # index (see b5d0e3f7a9c2); put back whatever went missing
+    schema = "SELECT name, sql FROM sqlite_master WHERE type IN ('trigger', 'index') AND sql IS NOT NULL"
+    before = dict(bind.exec_driver_sql(schema).all())
+    with op.batch_alter_table('fuel_logs', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': autoincrement}):
+        pass
+    after = dict(bind.exec_driver_sql(schema).all())
+    for name, sql in before.items():
+        if name not in after:
+            bind.exec_driver_sql(sql)
+
+
+def _archived_max_id(bind):
+    """Highest id in the archive files listed in the catalog (paths are relative to the database)."""
+    base = os.path.dirname(os.path.abspath(bind.engine.url.database or ''))
+    high = 0
+    for (path,) in bind.exec_driver_sql('SELECT DISTINCT path FROM fuel_log_archives').all():
+        full = os.path.join(base, path)
+        if not os.path.exists(full):
+            continue
+        archive = sqlite3.connect(full)
+        try:
+            high = max(high, archive.execute('SELECT coalesce(max(id), 0) FROM fuel_logs').fetchone()[0])
+        finally:
+            archive.close()
+    return high
+
+
+def upgrade() -> None:
+    _recreate(True)
+    # the copy set the sequence to the highest hot id; archived ids must not come back either
+    bind = op.get_bind()
+    high = _archived_max_id(bind)
+    bind.exec_driver_sql(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'fuel_logs', 0 "
+        "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'fuel_logs')")
+    bind.exec_driver_sql("UPDATE sqlite_sequence SET seq = max(seq, ?) WHERE name = 'fuel_logs'", (high,))
+
+
+def downgrade() -> None:
+    _recreate(False)
@@ -1,28 +1,182 @@
 # lib/db/models.py
+import math
+from contextlib import contextmanager
 from datetime import date
-from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Index, func
+from sqlalchemy import DDL, UniqueConstraint, delete, event, select, update
 from sqlalchemy.orm import declarative_base, relationship, validates
 
+from lib.db.cache import entity_cache
+
 Base = declarative_base()
 
+
+# ---------- unit of work ----------
+# CRUDMixin.create/delete commit (and create refreshes) per call. Inside `with deferred(session):`
+# they only flush, and the whole block commits once at the end (or rolls back on an error).
+# The *_many methods write a batch with one flush and one commit; a row that fails is
+# retried alone in a savepoint so it can be reported and skipped without losing the rest.
+
+@contextmanager
+def deferred(session):
+    """Unit of work: CRUDMixin writes inside the block share one transaction and one commit."""
+    outer = not session.info.get("deferred")
+    session.info["deferred"] = True
+    try:
+        yield session
+        if outer:
+            session.commit()
+    except Exception:
+        if outer:
+            session.rollback()
+        raise
+    finally:
+        if outer:
+            session.info.pop("deferred", None)
+
+
+def _commit(session):
+    if not session.info.get("deferred"):
+        session.commit()
+
+
+def _rollback(session):
+    # in a caller-owned transaction the caller rolls back (a batch only undoes the command's savepoint)
+    if not session.info.get("deferred"):
+        session.rollback()
+
+
+def _load_ids(session, cls, ids, chunk=10_000):
+    """Rows of cls with these ids, in IN (...) chunks under SQLite's bound-parameter limit."""
+    ids = list(ids)
+    objs = []
+    for i in range(0, len(ids), chunk):
+        objs += session.scalars(select(cls).where(cls.id.in_(ids[i:i + chunk]))).all()
+    return objs
+
+
+def _batch(session, items, apply, skip_errors):
+    """
+    apply(item) for every item and flush once, all in a savepoint. If that fails, redo it
+    one savepoint per item and collect the (index, error) of the items that fail.
+    """
+    done, failed = [], []
+    try:
+        with session.begin_nested():
+            done = [apply(item) for item in items]
+            session.flush()
+        return done, failed
+    except Exception:
+        if not skip_errors:
+            raise
+    done = []
+    for i, item in enumerate(items):
+        try:
+            with session.begin_nested():
+                obj = apply(item)
+                session.flush()
+            done.append(obj)
+        except Exception as e:
+            failed.append((i, e))
+    return done, failed
+
+
 # Mixin for CRUD operations to avoid repetition
 from sqlalchemy.orm import Session
 
 class CRUDMixin:
+    # natural keys for lib/db/cache.py; None = not cached
+    __cache_keys__ = None
+
     @classmethod
     def create(cls, session: Session, **kwargs):
         obj = cls(**kwargs)  # kwargs is keyword arguments for the model
         session.add(obj)
+        if session.info.get("deferred"):
+            session.flush()  # assigns the id; the commit comes at the end of the deferred() block
+            return obj
         session.commit()
         session.refresh(obj)
+        if cls.__cache_keys__ is not None:
+            entity_cache.put(session, obj)  # write-through
         return obj
 
+    @classmethod
+    def create_many(cls, session: Session, rows, refresh=False, skip_errors=True):
+        """
+        Create one object per dict in `rows` with a single flush and commit.
+        Returns (created objects, [(row index, error)] for rows that failed).
+        refresh=True reloads the created rows in one SELECT after the commit.
+        """
+        def add(kwargs):
+            obj = cls(**kwargs)
+            session.add(obj)
+            return obj
+
+        rows = list(rows)
+        objs, failed = _batch(session, rows, add, skip_errors)
+        ids = [o.id for o in objs]  # before the commit expires them
+        _commit(session)
+        if refresh and objs and not session.info.get("deferred"):
+            _load_ids(session, cls, ids)  # repopulates the expired objects in one SELECT per chunk
+            if cls.__cache_keys__ is not None:
+                for obj in objs:
+                    entity_cache.put(session, obj)
+        return objs, failed
+
+    @classmethod
+    def update_many(cls, session: Session, changes, skip_errors=True):
+        """
+        Apply {id: {field: value}} in one flush and commit; validators run as usual.
+        Returns (updated objects, [(id, error)]); ids that don't exist are reported as errors.
+        """
+        changes = dict(changes)
+        found = {o.id: o for o in _load_ids(session, cls, changes)}
+
+        def apply(id_):
+            obj = found.get(id_)
+            if obj is None:
+                raise LookupError(f"{cls.__name__} {id_} not found")
+            for k, v in changes[id_].items():
+                setattr(obj, k, v)
+            return obj
+
+        ids = list(changes)
+        objs, failed = _batch(session, ids, apply, skip_errors)
+        _commit(session)
+        return objs, [(ids[i], e) for i, e in failed]
+
     @classmethod
     def get_all(cls, session: Session):
         return session.query(cls).all()
 
+    @classmethod
+    def iter_all(cls, session: Session, page_size=1000, after_id=None, limit=None):
+        """
+        Yield rows in id order using keyset pagination (WHERE id > last_id LIMIT n),
+        so only one page is held in memory no matter how big the table is.
+        """
+        last_id = after_id
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            stmt = select(cls).order_by(cls.id).limit(size)
+            if last_id is not None:
+                stmt = stmt.where(cls.id > last_id)
+            page = session.scalars(stmt).all()
+            if not page:
+                return
+            yield from page
+            last_id = page[-1].id
+            if remaining is not None:
+                remaining -= len(page)
+            if len(page) < size:
+                return
+
     @classmethod
     def find_by_id(cls, session: Session, id_):
+        if cls.__cache_keys__ is not None:
+            return entity_cache.get(session, cls, "id", id_, lambda: session.get(cls, id_))
         return session.get(cls, id_)
 
     @classmethod
@@ -31,20 +185,32 @@ class CRUDMixin:
         if not obj:
             return False
         session.delete(obj)
-        session.commit()
+        _commit(session)
         return True
 
+    @classmethod
+    def delete_many(cls, session: Session, ids):
+        """Delete the rows with these ids (ORM cascades apply) in one flush and commit; returns how many."""
+        objs = _load_ids(session, cls, ids)
+        for obj in objs:
+            session.delete(obj)
+        _commit(session)
+        return len(objs)
+
 
 class Truck(Base, CRUDMixin):
     __tablename__ = "trucks"
+    __cache_keys__ = ("plate",)
 # defining truck table
     id = Column(Integer, primary_key=True)
     plate = Column(String, unique=True, nullable=False)
     capacity_liters = Column(Float, nullable=False)
     status = Column(String, nullable=False, default="active")
 
-    fuel_logs = relationship("FuelLog", back_populates="truck", cascade="all, delete-orphan") # one-to-many with FuelLog
-    drivers = relationship("Driver", back_populates="assigned_truck") # one-to-many with Driver (reverse relationship to trucks)
+    # passive_deletes: deleting a truck is one DELETE; the database's ON DELETE CASCADE / SET NULL
+    # (foreign_keys=ON, see lib/db/database.py) handles the fuel logs and drivers without loading them
+    fuel_logs = relationship("FuelLog", back_populates="truck", cascade="all, delete-orphan", passive_deletes=True) # one-to-many with FuelLog
+    drivers = relationship("Driver", back_populates="assigned_truck", passive_deletes=True) # one-to-many with Driver (reverse relationship to trucks)
 
 # Validations for Truck fields
     @validates("plate")
@@ -69,12 +235,85 @@ class Truck(Base, CRUDMixin):
             raise ValueError(f"Status must be one of {allowed}.")
         return v
 
+    # ---- set-based fleet maintenance ----
+    @classmethod
+    def retire_many(cls, session: Session, ids):
+        """Mark these trucks retired and unassign their drivers, in two UPDATEs; returns trucks retired."""
+        ids = list(ids)
+        n = 0
+        for i in range(0, len(ids), 10_000):
+            chunk = ids[i:i + 10_000]
+            n += session.execute(update(cls).where(cls.id.in_(chunk)).values(status="retired")).rowcount
+            session.execute(update(Driver).where(Driver.assigned_truck_id.in_(chunk)).values(assigned_truck_id=None))
+        _commit(session)
+        return n
+
+    @classmethod
+    def purge_retired(cls, session: Session, ids=None):
+        """
+        Delete retired trucks (all of them, or those among `ids`) with one DELETE; the database
+        cascades to their fuel logs and unassigns their drivers, and their archived logs go too
+        (lib/db/archive.py). Returns (trucks, fuel logs) deleted, archived logs included.
+        """
+        from lib.db.archive import purge_trucks
+
+        where = [cls.status == "retired"]
+        if ids is not None:
+            where.append(cls.id.in_(list(ids)))
+        logs = session.execute(
+            select(func.count()).select_from(FuelLog).join(cls, cls.id == FuelLog.truck_id).where(*where)
+        ).scalar()
+        purged = session.execute(select(cls.id).where(*where)).scalars().all()
+        logs += purge_trucks(session.connection(), purged)
+        trucks = session.execute(delete(cls).where(*where)).rowcount
+        _commit(session)
+        return trucks, logs
+
+
+@event.listens_for(Session, "before_flush")
+def _purge_archived_logs(session, flush_context, instances):
+    # the database cascade only reaches hot fuel logs; archived ones go with their truck too
+    trucks = [obj.id for obj in session.deleted if isinstance(obj, Truck)]
+    if trucks:
+        from lib.db.archive import purge_trucks
+        purge_trucks(session.connection(), trucks)
+
+
+# FuelLog field rules, shared by the model validators and lib/db/importer.py
+def _finite(k, v):
+    # float() accepts "nan" and "inf" (and 1e400 overflows to inf); none of them is a reading
+    v = float(v)
+    if not math.isfinite(v):
+        raise ValueError(f"{k} must be a finite number")
+    return v
+
+
+def check_positive(k, v):
+    v = _finite(k, v)
+    if v <= 0:
+        raise ValueError(f"{k} must be > 0")
+    return v
+
+
+def check_nonempty(k, v):
+    v = (v or "").strip()
+    if not v:
+        raise ValueError(f"{k} cannot be empty")
+    return v
+
+
+def check_odometer(k, v):
+    v = _finite(k, v)
+    if v < 0:
+        raise ValueError("odometer must be >= 0")
+    return v
+
 
 class FuelLog(Base, CRUDMixin):
     __tablename__ = "fuel_logs"
 # defining fuel log table
     id = Column(Integer, primary_key=True)
-    truck_id = Column(Integer, ForeignKey("trucks.id"), nullable=False)
+    truck_id = Column(Integer, ForeignKey("trucks.id", ondelete="CASCADE"), nullable=False)
     date = Column(Date, nullable=False, default=date.today)
     liters = Column(Float, nullable=False)
     price_per_liter = Column(Float, nullable=False)
@@ -85,27 +324,28 @@ class FuelLog(Base, CRUDMixin):
 
     truck = relationship("Truck", back_populates="fuel_logs")
 
-# Validations for FuelLog fields
+    # indexes for the CLI query patterns (per-truck history, date ranges, vendor lookup);
+    # AUTOINCREMENT so an id is never handed out twice, even after the newest log is deleted
+    # (archived logs and the anomaly scan watermark rely on that)
+    __table_args__ = (
+        Index("ix_fuel_logs_truck_id_date", "truck_id", "date"),
+        Index("ix_fuel_logs_date", "date"),
+        Index("ix_fuel_logs_vendor_lower", func.lower(vendor)),
+        {"sqlite_autoincrement": True},
+    )
+
+# Validations for FuelLog fields (rules live in the check_* functions above)
     @validates("liters", "price_per_liter")
     def _positive(self, k, v):
-        v = float(v)
-        if v <= 0:
-            raise ValueError(f"{k} must be > 0")
-        return v
+        return check_positive(k, v)
 
     @validates("vendor", "location")
     def _nonempty(self, k, v):
-        v = (v or "").strip()
-        if not v:
-            raise ValueError(f"{k} cannot be empty")
-        return v
+        return check_nonempty(k, v)
 
     @validates("odometer")
     def _odo(self, k, v):
-        v = float(v)
-        if v < 0:
-            raise ValueError("odometer must be >= 0")
-        return v
+        return check_odometer(k, v)
 
 
 
@@ -113,6 +353,7 @@ class FuelLog(Base, CRUDMixin):
 
 class Driver(Base, CRUDMixin):
     __tablename__ = "drivers"
+    __cache_keys__ = ("license_number",)
 
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
@@ -121,7 +362,7 @@ class Driver(Base, CRUDMixin):
     status = Column(String, nullable=False, default="active")
 
     # I added optional assignment to a truck where many drivers → one truck.
-    assigned_truck_id = Column(Integer, ForeignKey("trucks.id"), nullable=True)
+    assigned_truck_id = Column(Integer, ForeignKey("trucks.id", ondelete="SET NULL"), nullable=True, index=True)
     assigned_truck = relationship("Truck", back_populates="drivers")
 
 # Validations for Driver fields
@@ -146,3 +387,232 @@ class Driver(Base, CRUDMixin):
         if v not in allowed:
             raise ValueError(f"Status must be one of {allowed}.")
         return v
+
+
+
+# ---------- spend rollups ----------
+# Pre-aggregated liters/spend/fill counts, kept in step with fuel_logs by the
+# SQLite triggers below so spend reports never rescan the whole log table.
+
+class TruckDailySpend(Base):
+    __tablename__ = "spend_truck_daily"
+
+    truck_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    liters = Column(Float, nullable=False, default=0.0)
+    spend = Column(Float, nullable=False, default=0.0)
+    fills = Column(Integer, nullable=False, default=0)
+
+
+class VendorMonthlySpend(Base):
+    __tablename__ = "spend_vendor_monthly"
+
+    vendor = Column(String, primary_key=True)
+    month = Column(String, primary_key=True)  # YYYY-MM
+    liters = Column(Float, nullable=False, default=0.0)
+    spend = Column(Float, nullable=False, default=0.0)
+    fills = Column(Integer, nullable=False, default=0)
+
+
+class LocationMonthlySpend(Base):
+    __tablename__ = "spend_location_monthly"
+
+    location = Column(String, primary_key=True)
+    month = Column(String, primary_key=True)  # YYYY-MM
+    liters = Column(Float, nullable=False, default=0.0)
+    spend = Column(Float, nullable=False, default=0.0)
+    fills = Column(Integer, nullable=False, default=0)
+
+
+# rollup table -> (key column, expression over a fuel_logs row) pairs; {row} is NEW or OLD
+ROLLUP_KEYS = {
+    "spend_truck_daily": (("truck_id", "{row}.truck_id"), ("day", "{row}.date")),
+    "spend_vendor_monthly": (("vendor", "{row}.vendor"), ("month", "substr({row}.date, 1, 7)")),
+    "spend_location_monthly": (("location", "{row}.location"), ("month", "substr({row}.date, 1, 7)")),
+}
+
+
+def _rollup_add(table, keys, row):
+    cols = ", ".join(k for k, _ in keys)
+    vals = ", ".join(expr.format(row=row) for _, expr in keys)
+    return (
+        f"INSERT INTO {table} ({cols}, liters, spend, fills) "
+        f"VALUES ({vals}, {row}.liters, {row}.liters * {row}.price_per_liter, 1) "
+        f"ON CONFLICT ({cols}) DO UPDATE SET liters = liters + excluded.liters, "
+        f"spend = spend + excluded.spend, fills = fills + 1;"
+    )
+
+
+def _rollup_sub(table, keys, row):
+    where = " AND ".join(f"{k} = {expr.format(row=row)}" for k, expr in keys)
+    return (
+        f"UPDATE {table} SET liters = liters - {row}.liters, "
+        f"spend = spend - {row}.liters * {row}.price_per_liter, fills = fills - 1 WHERE {where}; "
+        f"DELETE FROM {table} WHERE {where} AND fills <= 0;"
+    )
+
+
+def rollup_trigger_ddl():
+    """CREATE TRIGGER statements that maintain the spend rollups on insert, update and delete."""
+    adds = " ".join(_rollup_add(t, k, "NEW") for t, k in ROLLUP_KEYS.items())
+    subs = " ".join(_rollup_sub(t, k, "OLD") for t, k in ROLLUP_KEYS.items())
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS fuel_logs_rollup_ai AFTER INSERT ON fuel_logs BEGIN {adds} END",
+        f"CREATE TRIGGER IF NOT EXISTS fuel_logs_rollup_ad AFTER DELETE ON fuel_logs BEGIN {subs} END",
+        "CREATE TRIGGER IF NOT EXISTS fuel_logs_rollup_au "
+        "AFTER UPDATE OF truck_id, date, liters, price_per_liter, vendor, location ON fuel_logs "
+        f"BEGIN {subs} {adds} END",
+    ]
+
+
+def rollup_rebuild_sql(source="fuel_logs"):
+    """
+    Statements that recompute every rollup table from scratch. `source` is a table or a
+    parenthesized subquery with fuel_logs' columns (lib/db/archive.py passes hot + archives).
+    """
+    stmts = []
+    for table in ROLLUP_KEYS:
+        stmts.append(f"DELETE FROM {table}")
+    return stmts + rollup_add_sql(source)
+
+
+def rollup_add_sql(source="fuel_logs", where="1", sign=""):
+    """Statements that add the rows of `source` matching `where` to the rollups (upserts)."""
+    stmts = []
+    for table, keys in ROLLUP_KEYS.items():
+        cols = ", ".join(k for k, _ in keys)
+        exprs = ", ".join(expr.format(row="src") for _, expr in keys)
+        stmts.append(
+            f"INSERT INTO {table} ({cols}, liters, spend, fills) "
+            f"SELECT {exprs}, {sign}SUM(liters), {sign}SUM(liters * price_per_liter), {sign}COUNT(*) "
+            f"FROM {source} AS src WHERE {where} GROUP BY {exprs} "
+            f"ON CONFLICT ({cols}) DO UPDATE SET liters = liters + excluded.liters, "
+            f"spend = spend + excluded.spend, fills = fills + excluded.fills"
+        )
+    return stmts
+
+
+def rollup_sub_sql(source="fuel_logs", where="1"):
+    """Statements that take the rows of `source` matching `where` out of the rollups."""
+    return rollup_add_sql(source, where, sign="-") + [f"DELETE FROM {table} WHERE fills <= 0" for table in ROLLUP_KEYS]
+
+
+# create the triggers whenever the schema is built with Base.metadata.create_all
+for _ddl in rollup_trigger_ddl():
+    event.listen(Base.metadata, "after_create", DDL(_ddl))
+
+
+# ---------- anomaly findings ----------
+# Written by lib/db/anomalies.py; one row per (fuel log, rule) that fired.
+
+class FuelLogAnomaly(Base):
+    __tablename__ = "fuel_log_anomalies"
+
+    id = Column(Integer, primary_key=True)
+    fuel_log_id = Column(Integer, ForeignKey("fuel_logs.id", ondelete="CASCADE"), nullable=False)
+    truck_id = Column(Integer, nullable=False, index=True)
+    rule = Column(String, nullable=False)  # overfill | odometer_regression | price_outlier
+    detail = Column(String, nullable=False)
+    detected_on = Column(Date, nullable=False, default=date.today)
+
+    __table_args__ = (UniqueConstraint("fuel_log_id", "rule", name="uq_fuel_log_anomalies_log_rule"),)
+
+
+class AnomalyScanState(Base):
+    __tablename__ = "anomaly_scan_state"
+
+    id = Column(Integer, primary_key=True)  # single row, id = 1
+    last_fuel_log_id = Column(Integer, nullable=False, default=0)  # watermark for incremental scans
+    scanned_on = Column(Date, nullable=True)
+
+
+class AnomalyVendorStats(Base):
+    # running price sums per lower(vendor) over the logs already scanned (id <= the watermark),
+    # so an incremental scan only aggregates its new rows; the triggers below follow inserts,
+    # deletes and edits at or below the watermark, and a --full scan recomputes it
+    __tablename__ = "anomaly_vendor_stats"
+
+    vendor = Column(String, primary_key=True)
+    fills = Column(Integer, nullable=False, default=0)
+    price_sum = Column(Float, nullable=False, default=0.0)
+    price_sq_sum = Column(Float, nullable=False, default=0.0)
+
+
+# findings go away with the fuel log they point at (the FK cascades too, but only on
+# connections with foreign_keys=ON; the trigger also covers other tools)
+ANOMALY_TRIGGER_DDL = (
+    "CREATE TRIGGER IF NOT EXISTS fuel_logs_anomalies_ad AFTER DELETE ON fuel_logs "
+    "BEGIN DELETE FROM fuel_log_anomalies WHERE fuel_log_id = OLD.id; END"
+)
+event.listen(Base.metadata, "after_create", DDL(ANOMALY_TRIGGER_DDL))
+
+
+def _vendor_stats_sub(row):
+    return (
+        f"UPDATE anomaly_vendor_stats SET fills = fills - 1, price_sum = price_sum - {row}.price_per_liter, "
+        f"price_sq_sum = price_sq_sum - {row}.price_per_liter * {row}.price_per_liter "
+        f"WHERE vendor = lower({row}.vendor); "
+        f"DELETE FROM anomaly_vendor_stats WHERE vendor = lower({row}.vendor) AND fills <= 0;"
+    )
+
+
+def _vendor_stats_add(row):
+    return (
+        "INSERT INTO anomaly_vendor_stats (vendor, fills, price_sum, price_sq_sum) "
+        f"VALUES (lower({row}.vendor), 1, {row}.price_per_liter, {row}.price_per_liter * {row}.price_per_liter) "
+        "ON CONFLICT (vendor) DO UPDATE SET fills = fills + 1, price_sum = price_sum + excluded.price_sum, "
+        "price_sq_sum = price_sq_sum + excluded.price_sq_sum;"
+    )
+
+
+# only logs at or below the scan watermark are in the running stats (an insert only lands
+# there with an explicit id, fuel_logs.id being AUTOINCREMENT)
+_SCANNED = "(SELECT last_fuel_log_id FROM anomaly_scan_state WHERE id = 1)"
+VENDOR_STATS_TRIGGER_DDL = [
+    "CREATE TRIGGER IF NOT EXISTS fuel_logs_vendor_stats_ai AFTER INSERT ON fuel_logs "
+    f"WHEN NEW.id <= {_SCANNED} BEGIN {_vendor_stats_add('NEW')} END",
+    "CREATE TRIGGER IF NOT EXISTS fuel_logs_vendor_stats_ad AFTER DELETE ON fuel_logs "
+    f"WHEN OLD.id <= {_SCANNED} BEGIN {_vendor_stats_sub('OLD')} END",
+    "CREATE TRIGGER IF NOT EXISTS fuel_logs_vendor_stats_au AFTER UPDATE OF vendor, price_per_liter ON fuel_logs "
+    f"WHEN OLD.id <= {_SCANNED} BEGIN {_vendor_stats_sub('OLD')} {_vendor_stats_add('NEW')} END",
+]
+for _ddl in VENDOR_STATS_TRIGGER_DDL:
+    event.listen(Base.metadata, "after_create", DDL(_ddl))
+
+
+# ---------- archive catalog ----------
+# One row per archived year written by lib/db/archive.py, all pointing at the archive file;
+# the query router only ATTACHes it when some [first_day, last_day] overlaps the requested dates.
+
+class FuelLogArchive(Base):
+    __tablename__ = "fuel_log_archives"
+
+    year = Column(Integer, primary_key=True)
+    path = Column(String, nullable=False)  # relative to the main database's directory
+    first_day = Column(Date, nullable=False)
+    last_day = Column(Date, nullable=False)
+    rows = Column(Integer, nullable=False, default=0)
+    archived_on = Column(Date, nullable=False, default=date.today)
+
+
+# ---------- full-text search ----------
+# External-content FTS5 index over fuel_logs(vendor, location, note); the triggers keep it
+# in sync and lib/db/search.py queries it. prefix='2 3' speeds up short prefix searches.
+FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS fuel_logs_fts USING fts5("
+    "vendor, location, note, content='fuel_logs', content_rowid='id', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS fuel_logs_fts_ai AFTER INSERT ON fuel_logs BEGIN "
+    "INSERT INTO fuel_logs_fts(rowid, vendor, location, note) VALUES (NEW.id, NEW.vendor, NEW.location, NEW.note); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS fuel_logs_fts_ad AFTER DELETE ON fuel_logs BEGIN "
+    "INSERT INTO fuel_logs_fts(fuel_logs_fts, rowid, vendor, location, note) "
+    "VALUES ('delete', OLD.id, OLD.vendor, OLD.location, OLD.note); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS fuel_logs_fts_au AFTER UPDATE OF vendor, location, note ON fuel_logs BEGIN "
+    "INSERT INTO fuel_logs_fts(fuel_logs_fts, rowid, vendor, location, note) "
+    "VALUES ('delete', OLD.id, OLD.vendor, OLD.location, OLD.note); "
+    "INSERT INTO fuel_logs_fts(rowid, vendor, location, note) VALUES (NEW.id, NEW.vendor, NEW.location, NEW.note); "
+    "END",
+]
+for _ddl in FTS_DDL:
+    event.listen(Base.metadata, "after_create", DDL(_ddl))
@@ -0,0 +1,151 @@
+# lib/db/parallel.py
+"""
+Run the per-truck fleet reports in worker processes.
+
+Every report here is partitioned by truck: the truck id space is cut into
+contiguous ranges holding roughly the same number of fuel logs (sized from the
+spend_truck_daily rollup, so planning doesn't scan fuel_logs), and each range is
+computed by a worker process on its own read-only connection (the
+readonly-analytics profile). A truck never spans two ranges, so each partial
+result is already final for its trucks and the merge is a concatenation in range
+order (plus the spend sort for spend_by_truck), giving exactly the serial output.
+
+    python -m lib.db.parallel fleet_efficiency --workers 4 --check
+    python -m lib.db.parallel efficiency_by_fill --workers 8
+
+The database has to be a file; workers can't see an in-memory database.
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from lib.db import reports
+from lib.db.models import TruckDailySpend
+
+# name -> (report function, merge of the per-range results in range order)
+REPORTS = {
+    "fleet_efficiency": (reports.fleet_efficiency, None),
+    "efficiency_by_fill": (reports.efficiency_by_fill, None),
+    # serial order is spend desc, truck id asc; sort is stable and the ranges are in id order
+    "spend_by_truck": (reports.spend_by_truck, lambda rows: sorted(rows, key=lambda r: (-r.spend, r.truck_id))),
+}
+PARTITIONS_PER_WORKER = 4  # more ranges than workers evens out skewed fleets
+
+
+def _url(session):
+    url = session.get_bind().url
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        raise RuntimeError("Parallel reports need a file-backed SQLite database.")
+    return url.render_as_string(hide_password=False)
+
+
+def truck_ranges(session, n):
+    """Split the truck ids into at most n inclusive (first, last) ranges of about equal fuel-log counts."""
+    rows = session.execute(
+        select(TruckDailySpend.truck_id, func.sum(TruckDailySpend.fills))
+        .group_by(TruckDailySpend.truck_id).order_by(TruckDailySpend.truck_id)
+    ).all()
+    if not rows:
+        return []
+    target = sum(c for _, c in rows) / n
+    cuts, acc = [], 0  # last truck id of every range but the final one
+    for truck_id, count in rows[:-1]:
+        acc += count
+        if acc >= target * (len(cuts) + 1):
+            cuts.append(truck_id)
+    # the outer bounds are open-ended so trucks without fuel logs still fall in a range
+    starts = [0] + [c + 1 for c in cuts]
+    ends = cuts + [2 ** 62]
+    return list(zip(starts, ends))
+
+
+# ---- worker side ----
+_engines = {}
+
+
+def _session(url):
+    from lib.db.database import make_engine
+
+    engine = _engines.get(url)
+    if engine is None:  # one read-only engine per worker process, reused across ranges
+        engine = _engines[url] = make_engine(url, profile="readonly-analytics")
+    return Session(engine)
+
+
+def _run_report(url, name, trucks, kwargs):
+    with _session(url) as session:
+        return REPORTS[name][0](session, trucks=trucks, **kwargs)
+
+
+def _run_anomalies(url, trucks, watermark, high, vendor_stats, chunk_size):
+    from lib.db.anomalies import find_anomalies
+
+    with _session(url) as session:
+        return list(find_anomalies(session, watermark, high, vendor_stats, chunk_size, trucks=trucks))
+
+
+# ---- parent side ----
+def _pool(workers):
+    # spawn, not fork: SQLite connections must not be carried into a child process
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def run_report(session, name, workers=None, **kwargs):
+    """Report `name` from REPORTS computed by `workers` processes; same rows as the serial call."""
+    workers = workers or os.cpu_count() or 1
+    fn, merge = REPORTS[name]
+    url = _url(session)
+    ranges = truck_ranges(session, workers * PARTITIONS_PER_WORKER)
+    if workers == 1 or len(ranges) <= 1:
+        return fn(session, **kwargs)
+    with _pool(workers) as pool:
+        parts = pool.map(_run_report, *zip(*[(url, name, r, kwargs) for r in ranges]))
+        rows = [row for part in parts for row in part]
+    return merge(rows) if merge else rows
+
+
+def parallel_anomalies(session, watermark, high, vendor_stats, workers, chunk_size=100_000):
+    """(rows scanned, findings) per chunk like anomalies.find_anomalies, one truck range per task."""
+    url = _url(session)
+    ranges = truck_ranges(session, workers * PARTITIONS_PER_WORKER) or [(0, 2 ** 62)]
+    with _pool(workers) as pool:
+        futures = [pool.submit(_run_anomalies, url, r, watermark, high, vendor_stats, chunk_size) for r in ranges]
+        for f in futures:  # in range order, so findings come out in the serial order
+            yield from f.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a fleet report in parallel worker processes.")
+    parser.add_argument("report", choices=sorted(REPORTS))
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--check", action="store_true", help="also run it serially, compare and time both")
+    args = parser.parse_args(argv)
+
+    from lib.db.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        started = time.perf_counter()
+        rows = run_report(session, args.report, workers=args.workers)
+        parallel_secs = time.perf_counter() - started
+        print(f"{args.report}: {len(rows)} rows with {args.workers} workers in {parallel_secs:.2f}s")
+        if args.check:
+            started = time.perf_counter()
+            serial = REPORTS[args.report][0](session)
+            serial_secs = time.perf_counter() - started
+            same = [tuple(r) for r in serial] == [tuple(r) for r in rows]
+            print(f"serial: {serial_secs:.2f}s, speedup {serial_secs / parallel_secs:.2f}x, "
+                  f"output {'identical' if same else 'DIFFERENT'}")
+            return 0 if same else 1
+    finally:
+        session.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
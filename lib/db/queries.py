@@ -0,0 +1,44 @@
+# lib/db/queries.py
+# Read queries for the CLI views, each issuing a fixed number of statements however many
+# rows it prints (no lazy N+1 loads); lib/bench/querycount.py checks that this stays true.
+# Listings return the row tuples from lib/db/rows.py (the long ones yield them as the cursor
+# is read), point lookups go through the entity cache.
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+from lib.db.cache import entity_cache
+from lib.db.models import Driver, FuelLog, Truck
+from lib.db.rows import DriverRow, FuelLogRow, fetch, select_rows, stream
+
+
+def drivers_with_trucks(session):
+    """All drivers as DriverRows with their truck's plate joined in, streamed (1 statement)."""
+    yield from stream(session, select_rows(Driver).order_by(Driver.id), DriverRow)
+
+
+def driver_by_license(session, license_number):
+    """One driver by license with the assigned truck joined in (1 statement, 0 when cached)."""
+    lic = license_number.strip().upper()
+    stmt = select(Driver).options(joinedload(Driver.assigned_truck)).where(Driver.license_number == lic)
+    d = entity_cache.get(session, Driver, "license_number", lic, lambda: session.scalars(stmt).first())
+    if d is not None and d.assigned_truck_id is not None:
+        Truck.find_by_id(session, d.assigned_truck_id)  # puts the truck in the identity map for d.assigned_truck
+    return d
+
+
+def truck_by_plate(session, plate):
+    plate = plate.strip().upper()
+    return entity_cache.get(session, Truck, "plate", plate,
+                            lambda: session.scalars(select(Truck).where(Truck.plate == plate)).first())
+
+
+def truck_fuel_logs(session, truck_id):
+    """A truck's fuel logs oldest first as FuelLogRows, streamed (1 statement)."""
+    stmt = select_rows(FuelLog).where(FuelLog.truck_id == truck_id).order_by(FuelLog.date, FuelLog.id)
+    yield from stream(session, stmt, FuelLogRow)
+
+
+def truck_drivers(session, truck_id):
+    """DriverRows of the drivers assigned to a truck (1 statement)."""
+    stmt = select_rows(Driver).where(Driver.assigned_truck_id == truck_id).order_by(Driver.id)
+    return fetch(session, stmt, DriverRow)
@@ -0,0 +1,131 @@
+# lib/db/reports.py
+# Fleet reports computed in SQL: efficiency in one pass over fuel_logs, spend from the rollup tables.
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from lib.db.archive import fuel_logs_source
+from lib.db.models import Truck, TruckDailySpend, VendorMonthlySpend, LocationMonthlySpend
+
+
+def _in_range(column, trucks):
+    """trucks is an inclusive (first id, last id) pair; lib/db/parallel.py runs one report per range."""
+    return column.between(*trucks)
+
+
+def _fills(session, truck_id=None, trucks=None):
+    """
+    One row per fuel log with the distance driven since the previous fill of the same truck.
+    Fills are ordered by (date, odometer); a non-increasing odometer gives NULL distance.
+    Archived logs are included (lib/db/archive.py), so the first fill after a cutoff still gets its distance.
+    """
+    logs = fuel_logs_source(session)
+    prev_odo = func.lag(logs.c.odometer).over(
+        partition_by=logs.c.truck_id,
+        order_by=(logs.c.date, logs.c.odometer, logs.c.id),
+    )
+    delta = logs.c.odometer - prev_odo
+    stmt = select(
+        logs.c.id,
+        logs.c.truck_id,
+        logs.c.date,
+        logs.c.odometer,
+        logs.c.liters,
+        (logs.c.liters * logs.c.price_per_liter).label("cost"),
+        case((delta > 0, delta), else_=None).label("distance"),
+    )
+    if truck_id is not None:
+        stmt = stmt.where(logs.c.truck_id == truck_id)
+    if trucks is not None:
+        stmt = stmt.where(_in_range(logs.c.truck_id, trucks))
+    return stmt.subquery("fills")
+
+
+def efficiency_by_fill(session: Session, truck_id=None, window=3, trucks=None):
+    """
+    Per-fill efficiency: distance since the last fill, km/L, cost/km and the
+    rolling km/L over the last `window` fills of that truck.
+    """
+    fills = _fills(session, truck_id, trucks)
+    km_per_liter = (fills.c.distance / fills.c.liters)
+    per_fill = select(
+        fills,
+        km_per_liter.label("km_per_liter"),
+        (fills.c.cost / fills.c.distance).label("cost_per_km"),
+    ).subquery("per_fill")
+    rolling = func.avg(per_fill.c.km_per_liter).over(
+        partition_by=per_fill.c.truck_id,
+        order_by=(per_fill.c.date, per_fill.c.odometer, per_fill.c.id),
+        rows=(-(window - 1), 0),
+    )
+    stmt = (select(per_fill, rolling.label("rolling_km_per_liter"))
+            .order_by(per_fill.c.truck_id, per_fill.c.date, per_fill.c.odometer, per_fill.c.id))
+    return session.execute(stmt).all()
+
+
+def fleet_efficiency(session: Session, truck_id=None, trucks=None):
+    """
+    Per-truck totals: fills, distance, liters and spend, with km/L and cost/km
+    over the fills that have a known distance (the first fill of a truck has none).
+    """
+    fills = _fills(session, truck_id, trucks)
+    measured = fills.c.distance.isnot(None)
+    liters_measured = func.sum(case((measured, fills.c.liters), else_=0))
+    cost_measured = func.sum(case((measured, fills.c.cost), else_=0))
+    distance = func.sum(fills.c.distance)
+    stmt = (
+        select(
+            fills.c.truck_id,
+            Truck.plate,
+            func.count().label("fills"),
+            func.coalesce(distance, 0).label("distance"),
+            func.sum(fills.c.liters).label("liters"),
+            func.sum(fills.c.cost).label("spend"),
+            (distance / func.nullif(liters_measured, 0)).label("km_per_liter"),
+            (cost_measured / func.nullif(distance, 0)).label("cost_per_km"),
+        )
+        .join(Truck, Truck.id == fills.c.truck_id)
+        .group_by(fills.c.truck_id, Truck.plate)
+        .order_by(fills.c.truck_id)
+    )
+    return session.execute(stmt).all()
+
+
+# ---------- spend (read from the rollup tables, not fuel_logs) ----------
+def spend_by_truck(session: Session, start=None, end=None, trucks=None):
+    """Liters, spend and fills per truck, optionally for an inclusive date range."""
+    stmt = (
+        select(
+            TruckDailySpend.truck_id,
+            Truck.plate,
+            func.sum(TruckDailySpend.fills).label("fills"),
+            func.sum(TruckDailySpend.liters).label("liters"),
+            func.sum(TruckDailySpend.spend).label("spend"),
+        )
+        .join(Truck, Truck.id == TruckDailySpend.truck_id)
+        .group_by(TruckDailySpend.truck_id, Truck.plate)
+        .order_by(func.sum(TruckDailySpend.spend).desc(), TruckDailySpend.truck_id)
+    )
+    if start is not None:
+        stmt = stmt.where(TruckDailySpend.day >= start)
+    if end is not None:
+        stmt = stmt.where(TruckDailySpend.day <= end)
+    if trucks is not None:
+        stmt = stmt.where(_in_range(TruckDailySpend.truck_id, trucks))
+    return session.execute(stmt).all()
+
+
+def _monthly(session, model, key, month=None):
+    stmt = select(key, model.month, model.fills, model.liters, model.spend)
+    if month is not None:
+        stmt = stmt.where(model.month == month)
+    return session.execute(stmt.order_by(model.month.desc(), model.spend.desc())).all()
+
+
+def spend_by_vendor(session: Session, month=None):
+    """Liters, spend and fills per vendor per month (YYYY-MM), newest month first."""
+    return _monthly(session, VendorMonthlySpend, VendorMonthlySpend.vendor, month)
+
+
+def spend_by_location(session: Session, month=None):
+    """Liters, spend and fills per location per month (YYYY-MM), newest month first."""
+    return _monthly(session, LocationMonthlySpend, LocationMonthlySpend.location, month)
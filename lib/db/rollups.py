@@ -0,0 +1,37 @@
+# lib/db/rollups.py
+# Full rebuild of the spend rollup tables. Day-to-day they are maintained by the
+# fuel_logs triggers defined in lib/db/models.py; rebuild after restoring a backup,
+# fixing data by hand, or to clear accumulated float drift.
+import time
+
+from sqlalchemy import text
+
+from lib.db.archive import source_sql
+from lib.db.models import _commit, _rollback, rollup_rebuild_sql
+
+
+def rebuild_rollups(session):
+    """Recompute every rollup table from fuel_logs (and its archive files) in one transaction."""
+    try:
+        for stmt in rollup_rebuild_sql(source_sql(session)):
+            session.execute(text(stmt))
+        _commit(session)
+    except Exception:
+        _rollback(session)
+        raise
+
+
+def main():
+    from lib.db.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        started = time.perf_counter()
+        rebuild_rollups(session)
+        print(f"Rebuilt spend rollups in {time.perf_counter() - started:.2f}s.")
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
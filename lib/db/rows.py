@@ -0,0 +1,110 @@
+# lib/db/rows.py
+"""
+Read-only row types for the listing and search views.
+
+A view that only prints a few fields doesn't need FuelLog/Truck/Driver
+instances: the ORM builds each one with instance state, an attribute dict and
+an identity-map entry. These are NamedTuples filled straight from Core
+select() rows: no __dict__, no change tracking, and they can be dropped as soon
+as they're printed. Field names match the model attributes, so view code reads
+the same either way.
+
+Point lookups by id, plate or license stay on the ORM (CRUDMixin.find_by_id,
+queries.truck_by_plate/driver_by_license) because lib/db/cache.py answers
+those without SQL, and the write paths need real instances anyway.
+
+lib/bench/rows.py compares per-row CPU and memory with ORM hydration.
+"""
+from datetime import date
+from typing import NamedTuple, Optional
+
+from sqlalchemy import select
+
+from lib.db.models import Driver, FuelLog, Truck
+
+
+class TruckRow(NamedTuple):
+    id: int
+    plate: str
+    capacity_liters: float
+    status: str
+
+
+class FuelLogRow(NamedTuple):
+    id: int
+    truck_id: int
+    date: date
+    liters: float
+    price_per_liter: float
+    vendor: str
+    location: str
+    odometer: float
+    note: Optional[str]
+
+    @property
+    def cost(self):
+        return self.liters * self.price_per_liter
+
+
+class DriverRow(NamedTuple):
+    id: int
+    name: str
+    license_number: str
+    phone: Optional[str]
+    status: str
+    assigned_truck_id: Optional[int]
+    truck_plate: Optional[str]  # plate of the assigned truck (outer join)
+
+
+ROW_TYPES = {Truck: TruckRow, FuelLog: FuelLogRow, Driver: DriverRow}
+
+
+def columns(model, source=None):
+    """
+    The columns of `source` (default: the model's table) in the field order of the model's
+    row type; fields that aren't table columns (DriverRow.truck_plate) are left to the caller.
+    """
+    table = model.__table__ if source is None else source
+    return [table.c[name] for name in ROW_TYPES[model]._fields if name in table.c]
+
+
+def select_rows(model):
+    if model is Driver:
+        return (select(*columns(Driver), Truck.__table__.c.plate)
+                .outerjoin(Truck.__table__, Truck.__table__.c.id == Driver.__table__.c.assigned_truck_id))
+    return select(*columns(model))
+
+
+def fetch(session, stmt, row_type):
+    """Run a Core select whose columns are in row_type's field order; list of row_type."""
+    make = row_type._make
+    return [make(r) for r in session.execute(stmt)]
+
+
+def stream(session, stmt, row_type, chunk_size=1000):
+    """Like fetch, but yields row_type tuples as the cursor is read, chunk_size rows at a time."""
+    yield from map(row_type._make, session.execute(stmt.execution_options(yield_per=chunk_size)))
+
+
+def iter_rows(session, model, page_size=1000, after_id=None, limit=None):
+    """
+    Like CRUDMixin.iter_all (keyset pages in id order, one page in memory at a time)
+    but yielding row tuples instead of ORM instances.
+    """
+    row_type, table = ROW_TYPES[model], model.__table__
+    base = select_rows(model).order_by(table.c.id)
+    last_id, remaining = after_id, limit
+    while remaining is None or remaining > 0:
+        size = page_size if remaining is None else min(page_size, remaining)
+        stmt = base.limit(size)
+        if last_id is not None:
+            stmt = stmt.where(table.c.id > last_id)
+        page = fetch(session, stmt, row_type)
+        if not page:
+            return
+        yield from page
+        last_id = page[-1].id
+        if remaining is not None:
+            remaining -= len(page)
+        if len(page) < size:
+            return
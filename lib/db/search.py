@@ -0,0 +1,44 @@
+# lib/db/search.py
+# Full-text search over fuel log vendor/location/note through the fuel_logs_fts FTS5 index.
+from sqlalchemy import text
+
+from lib.db.models import FuelLog
+from lib.db.rows import FuelLogRow, columns
+
+FIELDS = ("vendor", "location", "note")
+
+
+def fts_query(terms, fields=FIELDS):
+    """
+    Turn free text into an FTS5 MATCH expression: every word must match as a prefix,
+    restricted to `fields`. Words are quoted so punctuation can't break the syntax.
+    """
+    words = [w.replace('"', '""') for w in str(terms).split()]
+    if not words:
+        raise ValueError("Search text cannot be empty.")
+    unknown = set(fields) - set(FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown search field(s) {sorted(unknown)}; choose from {FIELDS}.")
+    return "{" + " ".join(fields) + "} : (" + " ".join(f'"{w}"*' for w in words) + ")"
+
+
+def search_fuel_logs(session, terms, fields=FIELDS, limit=100):
+    """FuelLogRows matching `terms`, best bm25 rank first."""
+    cols = ", ".join(f"fuel_logs.{name}" for name in FuelLogRow._fields)
+    sql = (
+        f"SELECT {cols} FROM fuel_logs_fts "
+        "JOIN fuel_logs ON fuel_logs.id = fuel_logs_fts.rowid "
+        "WHERE fuel_logs_fts MATCH :q ORDER BY fuel_logs_fts.rank"
+    )
+    params = {"q": fts_query(terms, fields)}
+    if limit:
+        sql += " LIMIT :limit"
+        params["limit"] = limit
+    stmt = text(sql).columns(*columns(FuelLog))  # typed result columns, so dates come back as dates
+    return [FuelLogRow._make(r) for r in session.execute(stmt, params)]
+
+
+def rebuild_index(session):
+    """Re-index every fuel log (after restoring a backup or bulk edits with triggers off)."""
+    session.execute(text("INSERT INTO fuel_logs_fts(fuel_logs_fts) VALUES ('rebuild')"))
+    session.commit()
@@ -1,51 +1,96 @@
 # lib/db/seed.py
 from datetime import date, timedelta
+import argparse
 import random
+import time
 from typing import Set
 
-from faker import Faker
+from sqlalchemy import delete, func, select, text
 
 from lib.db.database import SessionLocal
-from lib.db.models import Truck, FuelLog, Driver
+from lib.db.models import Truck, FuelLog, Driver, AnomalyScanState, AnomalyVendorStats, ROLLUP_KEYS
 
-fake = Faker()
-random.seed(42)
-Faker.seed(42)
+SEED = 42
+random.seed(SEED)
+_fake = None  # Faker is slow to import, so it is created on first use (see get_fake)
 
 COMMON_VENDORS = ["Total", "Shell", "Oryx", "Gulf", "Lake Oil", "Puma", "Engen"]
 COMMON_LOCATIONS = ["Depot A", "Depot B", "Main Yard", "Dar es Salaam", "Arusha", "Mwanza", "Dodoma"]
 
 
 # ---------- helpers ----------
+def get_fake():
+    """The shared Faker instance, imported and seeded on first use."""
+    global _fake
+    if _fake is None:
+        from faker import Faker
+        Faker.seed(SEED)
+        _fake = Faker()
+    return _fake
+
+
+def reset_seed(seed=SEED):
+    """Reseed random and Faker so the next seeding run produces the same data again."""
+    from faker import Faker
+    random.seed(seed)
+    Faker.seed(seed)
+
+
 def clear_all(session):
-    """Delete rows in FK-safe order so you can reseed anytime."""
-    session.query(FuelLog).delete()
-    session.query(Driver).delete()
-    session.query(Truck).delete()
+    """
+    Delete everything so you can reseed anytime: set-based DELETEs, the database cascades
+    from trucks to their fuel logs and from those to their anomaly findings. Archived logs
+    and the archive catalog are emptied too, or reseeded trucks would inherit their history.
+
+    The fuel_logs triggers would update the rollups and the full-text index once per row
+    only to end up empty, so they are dropped for the delete and recreated in the same
+    transaction, and the derived tables are emptied directly.
+    """
+    from lib.db.archive import clear_archive
+
+    clear_archive(session.connection())
+    triggers = session.execute(text(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'fuel_logs'")).all()
+    for name, _ in triggers:
+        session.execute(text(f"DROP TRIGGER {name}"))
+    for table in ROLLUP_KEYS:
+        session.execute(text(f"DELETE FROM {table}"))
+    session.execute(text("INSERT INTO fuel_logs_fts(fuel_logs_fts) VALUES ('delete-all')"))
+    session.execute(delete(AnomalyScanState))
+    session.execute(delete(AnomalyVendorStats))
+    session.execute(delete(Driver))
+    session.execute(delete(Truck))
+    for _, sql in triggers:
+        session.execute(text(sql))
     session.commit()
 
 
 def make_plate(existing: Set[str]) -> str:
     """Generate a unique plate like T-123-ABC."""
     while True:
-        plate = f"T-{random.randint(100, 999)}-{fake.pystr(min_chars=3, max_chars=3).upper()}"
+        plate = f"T-{random.randint(100, 999)}-{get_fake().pystr(min_chars=3, max_chars=3).upper()}"
         if plate not in existing:
             existing.add(plate)
             return plate
 
 
+def _taken(session, column) -> Set[str]:
+    """Values already in a unique column, so --keep runs don't generate a duplicate."""
+    return set(session.execute(select(column)).scalars())
+
+
 # ---------- seeders ----------
 def seed_trucks(session, n_trucks=4):
-    plates: Set[str] = set()
+    plates = _taken(session, Truck.plate)
     statuses = ["active", "maintenance", "retired"]
-    trucks = []
+    rows = []
 
     for _ in range(n_trucks):
         plate = make_plate(plates)
         capacity = random.choice([8000, 10000, 12000, 15000, 20000])
         status = random.choice(statuses)
-        t = Truck.create(session, plate=plate, capacity_liters=float(capacity), status=status)
-        trucks.append(t)
+        rows.append(dict(plate=plate, capacity_liters=float(capacity), status=status))
+    trucks, _ = Truck.create_many(session, rows, refresh=True, skip_errors=False)  # one commit for all of them
 
     print(f"Seeded {len(trucks)} trucks.")
     return trucks
@@ -54,8 +99,8 @@ def seed_trucks(session, n_trucks=4):
 def seed_drivers(session, n=5, trucks=None, assign_prob=0.6):
     """Create drivers; some are assigned to random trucks."""
     names = ["Asha Yusuf", "John Mkapa", "Neema Ally", "Peter Kim", "Zainab Juma", "David Mwangi"]
-    created = []
-    used_licenses: Set[str] = set()
+    rows = []
+    used_licenses = _taken(session, Driver.license_number)
 
     for _ in range(n):
         name = random.choice(names)
@@ -68,14 +113,14 @@ def seed_drivers(session, n=5, trucks=None, assign_prob=0.6):
         phone = f"+2557{random.randint(0, 99999999):08d}"
         status = random.choice(["active", "active", "suspended", "inactive"])
 
-        d = Driver.create(session, name=name, license_number=lic, phone=phone, status=status)
+        row = dict(name=name, license_number=lic, phone=phone, status=status)
 
         # optionally attach to a truck
         if trucks and random.random() < assign_prob:
-            d.assigned_truck = random.choice(trucks)
-            session.commit()
+            row["assigned_truck_id"] = random.choice(trucks).id
 
-        created.append(d)
+        rows.append(row)
+    created, _ = Driver.create_many(session, rows, refresh=True, skip_errors=False)
 
     print(f"Seeded {len(created)} drivers.")
     return created
@@ -83,7 +128,7 @@ def seed_drivers(session, n=5, trucks=None, assign_prob=0.6):
 
 def seed_fuel_logs(session, trucks, logs_per_truck_range=(3, 6)):
     """Create several fuel logs per truck with reasonable values."""
-    count = 0
+    rows = []
     today = date.today()
 
     for t in trucks:
@@ -95,13 +140,12 @@ def seed_fuel_logs(session, trucks, logs_per_truck_range=(3, 6)):
             d = today - timedelta(days=random.randint(0, 30))
             liters = round(random.uniform(50.0, 500.0), 1)
             price = round(random.uniform(2.0, 4.5), 2)
-            vendor = random.choice(COMMON_VENDORS + [fake.company()])
-            location = random.choice(COMMON_LOCATIONS + [fake.city()])
+            vendor = random.choice(COMMON_VENDORS + [get_fake().company()])
+            location = random.choice(COMMON_LOCATIONS + [get_fake().city()])
             odo += random.uniform(50.0, 600.0)
             note = random.choice(["", "", "top-up", "full tank", "promo price"]) or None
 
-            FuelLog.create(
-                session,
+            rows.append(dict(
                 truck_id=t.id,
                 date=d,
                 liters=liters,
@@ -110,21 +154,158 @@ def seed_fuel_logs(session, trucks, logs_per_truck_range=(3, 6)):
                 location=location,
                 odometer=round(odo, 1),
                 note=note,
-            )
-            count += 1
+            ))
+    logs, _ = FuelLog.create_many(session, rows, skip_errors=False)
+    count = len(logs)
 
     print(f"Seeded {count} fuel logs.")
     return count
 
 
+# ---------- bulk seeding ----------
+def _insert_batches(session, table, rows, batch_size):
+    """Insert an iterable of row dicts in executemany batches; returns row count."""
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            session.execute(table.insert(), batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        session.execute(table.insert(), batch)
+        count += len(batch)
+    return count
+
+
+def _next_id(session, model):
+    return (session.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def _report(label, count, started):
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed > 0 else float("inf")
+    print(f"Seeded {count} {label} in {elapsed:.2f}s ({rate:,.0f} rows/sec).")
+
+
+def seed_bulk(session, n_trucks=10_000, n_drivers=2_000, logs_per_truck=1_000,
+              batch_size=50_000, assign_prob=0.6, days=30):
+    """
+    Seed a fleet-scale dataset with Core executemany inserts in one transaction.
+    Values are drawn from the same seeded random/Faker generators as the
+    per-row seeders, so a given set of arguments always produces the same data.
+    """
+    statuses = ["active", "maintenance", "retired"]
+    today = date.today()
+    # Faker is slow per call, so draw a fixed pool of extra names up front
+    fake = get_fake()
+    vendors = COMMON_VENDORS + [fake.company() for _ in range(50)]
+    locations = COMMON_LOCATIONS + [fake.city() for _ in range(50)]
+    notes = [None, None, "top-up", "full tank", "promo price"]
+
+    # explicit ids let drivers and fuel logs reference trucks without a read-back
+    first_truck_id = _next_id(session, Truck)
+    truck_ids = range(first_truck_id, first_truck_id + n_trucks)
+    # with --keep the tables aren't empty; new plates and licenses must not collide with the old ones
+    taken_plates = _taken(session, Truck.plate)
+    taken_licenses = _taken(session, Driver.license_number)
+
+    def truck_rows():
+        plates = taken_plates
+        for tid in truck_ids:
+            yield {
+                "id": tid,
+                "plate": make_plate(plates),
+                "capacity_liters": float(random.choice([8000, 10000, 12000, 15000, 20000])),
+                "status": random.choice(statuses),
+            }
+
+    def driver_rows():
+        names = ["Asha Yusuf", "John Mkapa", "Neema Ally", "Peter Kim", "Zainab Juma", "David Mwangi"]
+        used_licenses = taken_licenses
+        upper = max(9999, (n_drivers + len(taken_licenses)) * 10)
+        for _ in range(n_drivers):
+            while True:
+                lic = f"LIC-{random.randint(1000, upper)}"
+                if lic not in used_licenses:
+                    used_licenses.add(lic)
+                    break
+            assigned = random.choice(truck_ids) if truck_ids and random.random() < assign_prob else None
+            yield {
+                "name": random.choice(names),
+                "license_number": lic,
+                "phone": f"+2557{random.randint(0, 99999999):08d}",
+                "status": random.choice(["active", "active", "suspended", "inactive"]),
+                "assigned_truck_id": assigned,
+            }
+
+    def fuel_log_rows():
+        for tid in truck_ids:
+            odo = random.uniform(10_000, 600_000)
+            # oldest fill first so dates and odometer readings move forward together
+            offsets = sorted((random.randint(0, days) for _ in range(logs_per_truck)), reverse=True)
+            for offset in offsets:
+                odo += random.uniform(50.0, 600.0)
+                yield {
+                    "truck_id": tid,
+                    "date": today - timedelta(days=offset),
+                    "liters": round(random.uniform(50.0, 500.0), 1),
+                    "price_per_liter": round(random.uniform(2.0, 4.5), 2),
+                    "vendor": random.choice(vendors),
+                    "location": random.choice(locations),
+                    "odometer": round(odo, 1),
+                    "note": random.choice(notes),
+                }
+
+    try:
+        started = time.perf_counter()
+        _report("trucks", _insert_batches(session, Truck.__table__, truck_rows(), batch_size), started)
+        started = time.perf_counter()
+        _report("drivers", _insert_batches(session, Driver.__table__, driver_rows(), batch_size), started)
+        started = time.perf_counter()
+        n_logs = _insert_batches(session, FuelLog.__table__, fuel_log_rows(), batch_size)
+        session.commit()
+        _report("fuel logs", n_logs, started)
+    except Exception:
+        session.rollback()
+        raise
+    return n_logs
+
+
 # ---------- entry ----------
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Seed the logistics database with fake data.")
+    parser.add_argument("--bulk", action="store_true",
+                        help="fleet-scale mode: batched Core inserts in a single transaction")
+    parser.add_argument("--trucks", type=int, default=10_000)
+    parser.add_argument("--drivers", type=int, default=2_000)
+    parser.add_argument("--logs-per-truck", type=int, default=1_000)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--days", type=int, default=30, help="spread fuel log dates over this many past days")
+    parser.add_argument("--keep", action="store_true", help="do not clear existing rows first")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
     session = SessionLocal()
     try:
-        clear_all(session)
-        trucks = seed_trucks(session, n_trucks=4)
-        seed_drivers(session, n=6, trucks=trucks, assign_prob=0.7)
-        seed_fuel_logs(session, trucks, logs_per_truck_range=(3, 5))
+        if not args.keep:
+            clear_all(session)
+        if args.bulk:
+            seed_bulk(
+                session,
+                n_trucks=args.trucks,
+                n_drivers=args.drivers,
+                logs_per_truck=args.logs_per_truck,
+                batch_size=args.batch_size,
+                days=args.days,
+            )
+        else:
+            trucks = seed_trucks(session, n_trucks=4)
+            seed_drivers(session, n=6, trucks=trucks, assign_prob=0.7)
+            seed_fuel_logs(session, trucks, logs_per_truck_range=(3, 5))
         print("✅ Seeding complete.")
     finally:
         session.close()